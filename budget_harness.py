@@ -0,0 +1,283 @@
+"""
+Fixed-budget algorithm comparison.
+
+Every algorithm gets the same budget of environment steps or CPU seconds
+(per seed, measured in its own worker process). The greedy score is
+recorded against the budget consumed so far, seeds run in parallel, and
+the result is a set of efficiency curves plus a leaderboard ranked by the
+area under the curve (mean greedy score over the whole budget).
+
+    python budget_harness.py --budget steps --limit 1000000 --seeds 0 1 2
+    python budget_harness.py --budget cpu --limit 120
+"""
+import io
+import os
+import json
+import time
+import random
+import argparse
+import contextlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from flappybird_env import FlappyBirdEnv
+from agents.q_learning import QAgent
+from agents.sarsa import SarsaAgent
+from agents.mc import MCAgent
+from agents.model_base import TransitionStats, PolicyAgent, value_iteration, policy_iteration
+from utils.discretize import discretize_state
+from utils.dataset import evaluate_policy
+from train import run_training_episode
+
+MODEL_FREE = {
+    "Q-Learning": QAgent,
+    "SARSA": SarsaAgent,
+    "Monte Carlo": MCAgent,
+}
+MODEL_BASED = {
+    "VI": value_iteration,
+    "PI": policy_iteration,
+}
+EVAL_SEED = 10_000
+
+
+class BudgetMeter:
+    """
+    Env steps and process CPU seconds consumed by one run.
+    Time spent inside paused() (greedy evaluation) is not charged.
+    """
+    def __init__(self, kind, limit):
+        if kind not in ("steps", "cpu"):
+            raise ValueError(f"unknown budget kind {kind!r} (use 'steps' or 'cpu')")
+        self.kind = kind
+        self.limit = limit
+        self.steps = 0
+        self._cpu = 0.0
+        self._t0 = time.process_time()
+
+    def cpu(self):
+        return self._cpu + (time.process_time() - self._t0)
+
+    def used(self):
+        return self.steps if self.kind == "steps" else self.cpu()
+
+    def exhausted(self):
+        return self.used() >= self.limit
+
+    def steps_left(self):
+        """Env steps left under a step budget (None under a CPU budget)."""
+        return max(0, int(self.limit - self.steps)) if self.kind == "steps" else None
+
+    @contextlib.contextmanager
+    def paused(self):
+        self._cpu += time.process_time() - self._t0
+        try:
+            yield
+        finally:
+            self._t0 = time.process_time()
+
+
+class _Checkpoints:
+    """Greedy evaluation every limit/points of consumed budget."""
+    def __init__(self, meter, points, eval_episodes, frame_skip=1):
+        self.meter = meter
+        self.every = meter.limit / points
+        self.next = self.every
+        self.eval_episodes = eval_episodes
+        self.env = FlappyBirdEnv(render_mode=False, frame_skip=frame_skip)
+        self.curve = []
+
+    def due(self):
+        return self.meter.used() >= self.next or self.meter.exhausted()
+
+    def record(self, policy, bins):
+        with self.meter.paused():
+            mean, _, _ = evaluate_policy(self.env, policy, self.eval_episodes, bins=bins, seed=EVAL_SEED)
+            self.curve.append({"steps": self.meter.steps, "cpu": self.meter.cpu(), "score": float(mean)})
+        while self.next <= self.meter.used():
+            self.next += self.every
+
+
+def _run_model_free(agent_class, env, meter, checkpoints):
+    agent = agent_class()
+
+    while not meter.exhausted():
+        _, steps = run_training_episode(env, agent, max_steps=meter.steps_left())
+        agent.decay()
+        meter.steps += steps
+
+        if checkpoints.due():
+            eps, agent.eps = agent.eps, 0.0
+            checkpoints.record(agent, agent.bins)
+            agent.eps = eps
+
+
+def _run_model_based(planner, env, meter, checkpoints, bins=(8, 8, 8), explore=0.1):
+    """
+    Collect with the current plan (eps-greedy, random before the first plan),
+    aggregate into TransitionStats and re-plan at every checkpoint.
+    Planning is charged to the CPU budget, not to the step budget.
+    """
+    stats = TransitionStats(bins)
+    policy = {}
+
+    while not meter.exhausted():
+        s = env.reset()
+        s_disc = discretize_state(s, bins)
+        done = False
+        max_steps = meter.steps_left()
+        steps = 0
+        while not done and (max_steps is None or steps < max_steps):
+            if random.random() < explore or not policy:
+                a = random.randint(0, 1)
+            else:
+                a = policy.get(s_disc, 0)
+            s, r, done, _ = env.step(a)
+            s2_disc = discretize_state(s, bins)
+            stats.add(s_disc, a, s2_disc, r, done)
+            s_disc = s2_disc
+            steps += 1
+            meter.steps += 1
+
+        if checkpoints.due():
+            model, states = stats.to_model()
+            with contextlib.redirect_stdout(io.StringIO()):
+                _, policy = planner(states, model)
+            checkpoints.record(PolicyAgent(policy, bins=bins), bins)
+
+
+def run_budgeted(name, kind, limit, seed, points=20, eval_episodes=20, frame_skip=1):
+    """
+    Run one algorithm/seed under a budget and return its efficiency curve.
+    The seed fixes exploration (random, np.random) and the training tube
+    layouts (env.rng); a step budget is never exceeded, the last episode is cut.
+    Steps are env.step() calls, i.e. frame_skip physics ticks each.
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    env = FlappyBirdEnv(render_mode=False, frame_skip=frame_skip)
+    env.rng.seed(seed)
+
+    meter = BudgetMeter(kind, limit)
+    checkpoints = _Checkpoints(meter, points, eval_episodes, frame_skip)
+    if name in MODEL_FREE:
+        _run_model_free(MODEL_FREE[name], env, meter, checkpoints)
+    else:
+        _run_model_based(MODEL_BASED[name], env, meter, checkpoints)
+
+    return {"algo": name, "seed": seed, "kind": kind, "limit": limit, "frame_skip": frame_skip,
+            "curve": checkpoints.curve}
+
+
+def _run_task(task):
+    return run_budgeted(*task)
+
+
+def summarize(runs, grid_points=100):
+    """
+    Leaderboard rows per algorithm, best first:
+    auc = mean greedy score over the budget (curves interpolated on a common grid),
+    final = score at the end of the budget, both averaged over seeds.
+    """
+    by_algo = {}
+    for run in runs:
+        by_algo.setdefault(run["algo"], []).append(run)
+
+    rows = []
+    for name, algo_runs in by_algo.items():
+        kind, limit = algo_runs[0]["kind"], algo_runs[0]["limit"]
+        grid = np.linspace(0, limit, grid_points)
+        curves = np.array([
+            np.interp(grid, [0] + [p[kind] for p in r["curve"]], [0.0] + [p["score"] for p in r["curve"]])
+            for r in algo_runs
+        ])
+        finals = np.array([r["curve"][-1]["score"] for r in algo_runs])
+        rows.append({
+            "algo": name,
+            "auc": float(curves.mean()),
+            "final": float(finals.mean()),
+            "final_std": float(finals.std()),
+            "seeds": len(algo_runs),
+            "grid": grid.tolist(),
+            "mean_curve": curves.mean(axis=0).tolist(),
+            "std_curve": curves.std(axis=0).tolist(),
+        })
+
+    return sorted(rows, key=lambda row: row["auc"], reverse=True)
+
+
+def print_leaderboard(rows, kind, limit):
+    unit = "env steps" if kind == "steps" else "CPU seconds"
+    print(f"\n=== Leaderboard ({limit:g} {unit} per seed) ===")
+    print(f"  {'#':<3}{'Algorithm':<14}{'AUC':>8}{'Final':>16}{'Seeds':>7}")
+    for i, row in enumerate(rows, 1):
+        final = f"{row['final']:.2f} ± {row['final_std']:.2f}"
+        print(f"  {i:<3}{row['algo']:<14}{row['auc']:8.2f}{final:>16}{row['seeds']:7d}")
+
+
+def plot_efficiency_curves(rows, kind, save_path):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 7))
+    for row in rows:
+        grid = np.array(row["grid"])
+        mean, std = np.array(row["mean_curve"]), np.array(row["std_curve"])
+        plt.plot(grid, mean, linewidth=2, label=f"{row['algo']} (AUC {row['auc']:.2f})")
+        plt.fill_between(grid, mean - std, mean + std, alpha=0.15)
+
+    plt.xlabel("Environment steps consumed" if kind == "steps" else "CPU seconds consumed")
+    plt.ylabel("Greedy evaluation score")
+    plt.title("Score vs Consumed Budget", fontweight='bold')
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def run_harness(kind="steps", limit=None, algos=None, seeds=(0, 1, 2), workers=None,
+                points=20, eval_episodes=20, out_dir="results", frame_skip=1):
+    limit = limit or (1_000_000 if kind == "steps" else 120.0)
+    algos = algos or list(MODEL_FREE) + list(MODEL_BASED)
+    unknown = set(algos) - set(MODEL_FREE) - set(MODEL_BASED)
+    if unknown:
+        raise ValueError(f"unknown algorithms: {sorted(unknown)}")
+
+    tasks = [(name, kind, limit, seed, points, eval_episodes, frame_skip) for name in algos for seed in seeds]
+    print(f"Running {len(tasks)} budgeted runs ({len(algos)} algorithms x {len(seeds)} seeds)...")
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        runs = list(pool.map(_run_task, tasks))
+    print(f"Done in {time.time() - start:.1f}s")
+
+    rows = summarize(runs)
+    print_leaderboard(rows, kind, limit)
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, f"budget_{kind}.json"), "w") as f:
+        json.dump({"kind": kind, "limit": limit, "frame_skip": frame_skip, "runs": runs, "leaderboard": rows}, f)
+    plot_efficiency_curves(rows, kind, os.path.join(out_dir, f"budget_curves_{kind}.png"))
+    print(f"✓ Saved {out_dir}/budget_{kind}.json and {out_dir}/budget_curves_{kind}.png")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare algorithms under an equal compute budget")
+    parser.add_argument('--budget', choices=['steps', 'cpu'], default='steps')
+    parser.add_argument('--limit', type=float, default=None,
+                        help="env steps or CPU seconds per seed (default 1e6 steps / 120 s)")
+    parser.add_argument('--algos', nargs='+', default=None,
+                        help=f"subset of: {', '.join(list(MODEL_FREE) + list(MODEL_BASED))}")
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0, 1, 2])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--points', type=int, default=20, help="greedy evaluations per run")
+    parser.add_argument('--eval-episodes', type=int, default=20)
+    parser.add_argument('--frame-skip', type=int, default=1, help="physics ticks per env step (action repeat)")
+    args = parser.parse_args()
+
+    run_harness(args.budget, args.limit, args.algos, tuple(args.seeds), args.workers,
+                args.points, args.eval_episodes, frame_skip=args.frame_skip)
+
+
+if __name__ == "__main__":
+    main()
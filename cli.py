@@ -0,0 +1,454 @@
+"""
+Single entry point for the Flappy Bird RL project.
+
+    python cli.py train --algo q --episodes 20000 --eval-every 1000
+    python cli.py plan --method pi
+    python cli.py evaluate results/policy_pi --episodes 200
+    python cli.py lookahead --depth 40 --budget-ms 5
+    python cli.py collect results/agent_q.pkl
+    python cli.py plot
+    python cli.py runs --algo "Policy Iteration" --param gamma=0.99 --best mean_score
+    python cli.py pbt --algo q --population 8
+    python cli.py budget --budget cpu --limit 120
+    python cli.py bench
+    python cli.py --profile-imports <command> ...
+
+Only the standard library is imported at startup. Each subcommand imports
+what it needs (numpy, pygame, matplotlib, seaborn) when it runs, so headless
+jobs never pay for plotting or rendering libraries.
+"""
+import sys
+import time
+import argparse
+import importlib
+
+_STARTUP_CPU = time.process_time()
+_IMPORT_TIMES = []
+
+ALGOS = {
+    'q': ('agents.q_learning', 'QAgent', 'Q-Learning'),
+    'sarsa': ('agents.sarsa', 'SarsaAgent', 'SARSA'),
+    'mc': ('agents.mc', 'MCAgent', 'Monte Carlo'),
+    'sparse-q': ('agents.sparse_q', 'SparseQAgent', 'Sparse Q-Learning'),
+    'tile': ('agents.tile_coding', 'TileCodingAgent', 'Tile Coding'),
+    'sarsa-lambda': ('agents.sarsa_lambda', 'SarsaLambdaAgent', 'SARSA(lambda)'),
+    'q-lambda': ('agents.sarsa_lambda', 'QLambdaAgent', 'Q(lambda)'),
+}
+
+
+def lazy_import(name):
+    """Import a module on first use and record how long it took."""
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _IMPORT_TIMES.append((name, time.perf_counter() - start))
+    return module
+
+
+def load_agent(path, bins=(8, 8, 8)):
+    """Exported policy directory, policy pickle ({'policy': ...}) or pickled agent."""
+    import os
+    import pickle
+
+    if os.path.isdir(path):
+        return lazy_import('utils.policy_export').ExportedPolicy(path)
+
+    with open(path, 'rb') as f:
+        obj = pickle.load(f)
+    if isinstance(obj, dict) and 'policy' in obj:
+        return lazy_import('agents.model_base').PolicyAgent(obj['policy'], bins=bins)
+    obj.eps = 0.0
+    return obj
+
+
+def make_env(args):
+    return lazy_import('flappybird_env').FlappyBirdEnv(render_mode=False, frame_skip=args.frame_skip)
+
+
+def cmd_train(args):
+    train = lazy_import('train')
+
+    if args.all:
+        train.main(trace_memory=args.trace_memory, frame_skip=args.frame_skip)
+        return
+
+    import os
+    import pickle
+
+    module, cls, name = ALGOS[args.algo]
+    agent_class = getattr(lazy_import(module), cls)
+    env = make_env(args)
+    os.makedirs('results', exist_ok=True)
+
+    publisher = None
+    if args.live_view:
+        live_viewer = lazy_import('live_viewer')
+        probe = agent_class()
+        publisher = live_viewer.QTablePublisher(live_viewer.q_array(probe).shape)
+        publisher.publish(live_viewer.q_array(probe))
+        live_viewer.start_viewer(publisher)
+
+    try:
+        agent, scores = train.train_agent(
+            env, agent_class, name, episodes=args.episodes, show_every=args.show_every,
+            log_path=train.metrics_path(name), eval_every=args.eval_every,
+            target_score=args.target_score, publisher=publisher)
+    finally:
+        if publisher is not None:
+            publisher.close()
+
+    out = args.out or f"results/agent_{args.algo.replace('-', '_')}.pkl"
+    with open(out, 'wb') as f:
+        pickle.dump(agent, f)
+    print(f"Saved agent → {out}")
+
+
+def cmd_plan(args):
+    if args.full:
+        lazy_import('train_vi_pi').main(trace_memory=args.trace_memory, frame_skip=args.frame_skip)
+        return
+
+    if args.method in ('multigrid', 'fqi') and (args.simulate or args.dataset.endswith('.npz')):
+        raise SystemExit(f"--method {args.method} needs a transition dataset (.pkl)")
+    if args.method == 'chunked-vi':
+        return plan_chunked(args)
+
+    import os
+    import pickle
+
+    model_base = lazy_import('agents.model_base')
+    dataset_mod = lazy_import('utils.dataset')
+    env = make_env(args)
+    bins = tuple(args.bins)
+
+    start = time.time()
+    if args.simulate:
+        model, states = lazy_import('utils.sim_model').build_model_by_simulation(env, bins, seed=args.seed)
+    elif args.dataset.endswith('.npz'):
+        model, states = model_base.TransitionStats.load(args.dataset).to_model()
+    else:
+        with open(args.dataset, 'rb') as f:
+            dataset = pickle.load(f)
+        if args.method == 'multigrid':
+            _, policy, _ = model_base.multigrid_value_iteration(dataset, bins, gamma=args.gamma)
+        elif args.method == 'fqi':
+            arrays_path = args.arrays or os.path.splitext(args.dataset)[0] + '_arrays.npy'
+            arrays = dataset_mod.save_dataset_arrays(dataset, arrays_path, bins)
+            _, policy = lazy_import('agents.fitted_q').fitted_q_iteration(arrays, bins, gamma=args.gamma)
+        else:
+            model, states = dataset_mod.build_model_from_dataset(dataset)
+
+    if args.method == 'vi':
+        _, policy = model_base.value_iteration(states, model, gamma=args.gamma)
+    elif args.method == 'pi':
+        _, policy = model_base.policy_iteration(states, model, gamma=args.gamma)
+    print(f"Planning done in {time.time() - start:.2f}s")
+
+    agent = model_base.PolicyAgent(policy, bins=bins)
+    mean, std, _ = dataset_mod.evaluate_policy(env, agent, episodes=args.episodes, bins=bins, seed=args.seed)
+    print(f"{args.method.upper()} mean score: {mean:.2f} ± {std:.2f}")
+
+    if args.export:
+        lazy_import('utils.policy_export').export_policy(args.export, agent)
+        print(f"Exported policy → {args.export}")
+
+
+def plan_chunked(args):
+    """Out-of-core VI: transition statistics -> CSR arrays on disk -> chunked sweeps."""
+    import pickle
+
+    model_base = lazy_import('agents.model_base')
+    csr_planning = lazy_import('agents.csr_planning')
+    dataset_mod = lazy_import('utils.dataset')
+    env = make_env(args)
+    bins = tuple(args.bins)
+
+    start = time.time()
+    if args.simulate:
+        stats = lazy_import('utils.sim_model').simulate_transition_stats(env, bins, seed=args.seed)
+    elif args.dataset.endswith('.npz'):
+        stats = model_base.TransitionStats.load(args.dataset)
+        bins = stats.bins
+    else:
+        with open(args.dataset, 'rb') as f:
+            dataset = pickle.load(f)
+        stats = model_base.TransitionStats(bins)
+        for item in dataset:
+            stats.add(*item)
+        del dataset
+
+    csr_planning.export_model_csr(args.model_dir, stats)
+    del stats
+    V, policy = csr_planning.chunked_value_iteration(
+        args.model_dir, gamma=args.gamma, block_nnz=args.block_nnz, workers=args.workers)
+    print(f"Planning done in {time.time() - start:.2f}s")
+
+    agent = model_base.PolicyAgent(csr_planning.policy_to_dict(policy, bins), bins=bins)
+    mean, std, _ = dataset_mod.evaluate_policy(env, agent, episodes=args.episodes, bins=bins, seed=args.seed)
+    print(f"CHUNKED-VI mean score: {mean:.2f} ± {std:.2f}")
+
+    if args.export:
+        lazy_import('utils.policy_export').export_policy(args.export, agent)
+        print(f"Exported policy → {args.export}")
+
+
+def cmd_evaluate(args):
+    dataset_mod = lazy_import('utils.dataset')
+    env = make_env(args)
+    agent = load_agent(args.policy, tuple(args.bins))
+
+    mean, std, scores = dataset_mod.evaluate_policy(
+        env, agent, episodes=args.episodes, bins=agent.bins, seed=args.seed)
+    print(f"Mean score over {len(scores)} episodes: {mean:.2f} ± {std:.2f} (max {max(scores)})")
+
+
+def cmd_lookahead(args):
+    dataset_mod = lazy_import('utils.dataset')
+    env = make_env(args)
+    rollout_policy = load_agent(args.rollout_policy) if args.rollout_policy else None
+
+    agent = lazy_import('agents.lookahead').LookaheadAgent(
+        env, depth=args.depth, rollouts=args.rollouts, latency_budget=args.budget_ms / 1000,
+        rollout_policy=rollout_policy, seed=args.seed)
+    mean, std, scores = dataset_mod.evaluate_policy(env, agent, episodes=args.episodes, seed=args.seed)
+    print(f"Lookahead mean score over {len(scores)} episodes: {mean:.2f} ± {std:.2f}")
+    print(agent.report())
+
+
+def cmd_collect(args):
+    import pickle
+
+    dataset_mod = lazy_import('utils.dataset')
+    env = make_env(args)
+    agent = load_agent(args.policy, tuple(args.bins)) if args.policy else None
+
+    if args.coverage is not None:
+        out = args.out if args.out.endswith('.npz') else 'results/model_stats.npz'
+        stats, _ = dataset_mod.collect_coverage(env, agent, tuple(args.bins), target=args.coverage,
+                                                min_count=args.min_count, seed=args.seed)
+        stats.save(out)
+        print(f"✓ Coverage aggregate: {stats.n_transitions} transitions → {out}")
+        return
+
+    if args.aggregate:
+        out = args.out if args.out.endswith('.npz') else 'results/model_stats.npz'
+        if args.workers > 1:
+            stats = dataset_mod.collect_model_parallel(agent, n_episodes=args.episodes, max_steps=args.max_steps,
+                                                       workers=args.workers, seed=args.seed, out=out,
+                                                       frame_skip=args.frame_skip)
+        else:
+            stats = dataset_mod.collect_model(env, agent, n_episodes=args.episodes,
+                                              max_steps=args.max_steps, out=out, seed=args.seed)
+        print(f"✓ Aggregate collected: {stats.n_transitions} transitions, "
+              f"{len(stats.counts)} unique → {out}")
+        return
+
+    dataset = dataset_mod.collect_dataset(env, agent, n_episodes=args.episodes, max_steps=args.max_steps)
+    with open(args.out, 'wb') as f:
+        pickle.dump(dataset, f)
+    print(f"✓ Dataset collected: {len(dataset)} transitions → {args.out}")
+
+
+def cmd_runs(args):
+    import json
+
+    params = {}
+    for item in args.param:
+        key, _, value = item.partition('=')
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+
+    registry = lazy_import('utils.run_registry').RunRegistry(args.root)
+    if args.best:
+        run = registry.best(args.best, kind=args.kind, algo=args.algo, **params)
+        print(json.dumps(run, indent=2) if run else "No matching runs")
+        return
+
+    for run in registry.runs(kind=args.kind, algo=args.algo, **params)[:args.limit]:
+        metrics = registry.metrics(run['id'])
+        shown = ", ".join(f"{k}={v:.4g}" for k, v in sorted(metrics.items()))
+        print(f"#{run['id']:<5} {run['kind']:<11} {run['algo']:<20} seed={run['seed']} | {shown}")
+
+
+def cmd_plot(args):
+    if args.tables:
+        lazy_import('parameter_tables').main()
+    else:
+        lazy_import('visualize_result').main()
+
+
+def cmd_bench(args):
+    np = lazy_import('numpy')
+    discretize = lazy_import('utils.discretize')
+    env = make_env(args)
+
+    rng = np.random.default_rng(0)
+    env.reset(seed=0)
+    states = []
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        s, r, done, info = env.step(int(rng.random() < 0.05))
+        states.append(s)
+        if done:
+            env.reset()
+    elapsed = time.perf_counter() - start
+    print(f"env.step:          {args.steps / elapsed:12,.0f} steps/s")
+
+    start = time.perf_counter()
+    for s in states:
+        discretize.discretize_state(s)
+    elapsed = time.perf_counter() - start
+    print(f"discretize_state:  {len(states) / elapsed:12,.0f} states/s")
+
+    batch = np.stack(states)
+    start = time.perf_counter()
+    discretize.discretize_batch(batch)
+    elapsed = time.perf_counter() - start
+    print(f"discretize_batch:  {len(states) / elapsed:12,.0f} states/s")
+
+
+def cmd_pbt(args):
+    lazy_import('pbt').run_pbt(args.algo, args.population, args.interval, args.rounds,
+                               args.truncation, args.eval_episodes, args.workers, args.seed,
+                               frame_skip=args.frame_skip)
+
+
+def cmd_budget(args):
+    lazy_import('budget_harness').run_harness(
+        args.budget, args.limit, args.algos, tuple(args.seeds), args.workers,
+        args.points, args.eval_episodes, frame_skip=args.frame_skip)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="Flappy Bird RL")
+    parser.add_argument('--frame-skip', type=int, default=1,
+                        help="physics ticks per env step (action repeat) for every command")
+    parser.add_argument('--profile-imports', action='store_true',
+                        help="report startup time and lazy import costs on exit "
+                             "(use `python -X importtime cli.py ...` for a per-module tree)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('train', help="train a model-free agent")
+    p.add_argument('--algo', choices=sorted(ALGOS), default='q')
+    p.add_argument('--episodes', type=int, default=50000)
+    p.add_argument('--show-every', type=int, default=1000)
+    p.add_argument('--eval-every', type=int, default=None)
+    p.add_argument('--target-score', type=float, default=None)
+    p.add_argument('--out', default=None, help="pickle path for the trained agent")
+    p.add_argument('--live-view', action='store_true', help="watch the agent in a separate viewer process")
+    p.add_argument('--all', action='store_true', help="run the full train.py pipeline")
+    p.add_argument('--trace-memory', action='store_true', help="tracemalloc snapshots per stage (--all)")
+    p.set_defaults(func=cmd_train)
+
+    p = sub.add_parser('plan', help="offline planning (VI / PI / multigrid VI / fitted Q-iteration / chunked VI)")
+    p.add_argument('--method', choices=['vi', 'pi', 'multigrid', 'fqi', 'chunked-vi'], default='vi')
+    p.add_argument('--dataset', default='results/dataset.pkl', help="dataset .pkl or aggregate .npz")
+    p.add_argument('--simulate', action='store_true', help="build the model by simulation instead")
+    p.add_argument('--bins', type=int, nargs=3, default=[8, 8, 8])
+    p.add_argument('--gamma', type=float, default=0.98)
+    p.add_argument('--episodes', type=int, default=100)
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--export', default=None, help="export the policy to this directory")
+    p.add_argument('--arrays', default=None,
+                   help="sorted transition array path (fqi; default: <dataset>_arrays.npy)")
+    p.add_argument('--model-dir', default='results/model_csr', help="CSR model directory (chunked-vi)")
+    p.add_argument('--block-nnz', type=int, default=1 << 20, help="transitions per streamed block (chunked-vi)")
+    p.add_argument('--workers', type=int, default=0, help="worker processes sharing V (chunked-vi)")
+    p.add_argument('--full', action='store_true', help="run the full train_vi_pi.py pipeline")
+    p.add_argument('--trace-memory', action='store_true', help="tracemalloc snapshots per stage (--full)")
+    p.set_defaults(func=cmd_plan)
+
+    p = sub.add_parser('evaluate', help="evaluate a saved policy or agent")
+    p.add_argument('policy', help="export directory, policy pickle or agent pickle")
+    p.add_argument('--bins', type=int, nargs=3, default=[8, 8, 8])
+    p.add_argument('--episodes', type=int, default=100)
+    p.add_argument('--seed', type=int, default=0)
+    p.set_defaults(func=cmd_evaluate)
+
+    p = sub.add_parser('lookahead', help="play with the batched rollout planner")
+    p.add_argument('--depth', type=int, default=40)
+    p.add_argument('--rollouts', type=int, default=32, help="rollouts per action")
+    p.add_argument('--budget-ms', type=float, default=5.0, help="per-decision latency budget")
+    p.add_argument('--rollout-policy', default=None, help="exported policy directory for rollouts")
+    p.add_argument('--episodes', type=int, default=10)
+    p.add_argument('--seed', type=int, default=0)
+    p.set_defaults(func=cmd_lookahead)
+
+    p = sub.add_parser('collect', help="collect a transition dataset")
+    p.add_argument('policy', nargs='?', default=None, help="behaviour policy (random if omitted)")
+    p.add_argument('--bins', type=int, nargs=3, default=[8, 8, 8])
+    p.add_argument('--episodes', type=int, default=5000)
+    p.add_argument('--max-steps', type=int, default=2000)
+    p.add_argument('--out', default='results/dataset.pkl')
+    p.add_argument('--aggregate', action='store_true',
+                   help="stream into deduplicated transition counts (.npz) instead of a dataset")
+    p.add_argument('--workers', type=int, default=1, help="worker processes (with --aggregate)")
+    p.add_argument('--coverage', type=float, default=None,
+                   help="coverage-driven collection until this fraction of (s, a) pairs is sampled")
+    p.add_argument('--min-count', type=int, default=5, help="samples per (s, a) pair counted as covered")
+    p.add_argument('--seed', type=int, default=None, help="per-episode seeding, needed for reproducible shards")
+    p.set_defaults(func=cmd_collect)
+
+    p = sub.add_parser('runs', help="query the run registry (metadata only)")
+    p.add_argument('--algo', default=None)
+    p.add_argument('--kind', default=None, choices=['planning', 'model_free', 'dataset'])
+    p.add_argument('--param', action='append', default=[], metavar='KEY=VALUE',
+                   help="config filter, e.g. --param gamma=0.99 (repeatable)")
+    p.add_argument('--best', default=None, metavar='METRIC', help="show only the best run by this metric")
+    p.add_argument('--limit', type=int, default=50)
+    p.add_argument('--root', default='results/runs')
+    p.set_defaults(func=cmd_runs)
+
+    p = sub.add_parser('plot', help="generate result charts")
+    p.add_argument('--tables', action='store_true', help="hyperparameter tables instead of charts")
+    p.set_defaults(func=cmd_plot)
+
+    p = sub.add_parser('pbt', help="population-based training with hyperparameter lineage")
+    p.add_argument('--algo', choices=['q', 'sarsa', 'mc'], default='q')
+    p.add_argument('--population', type=int, default=8)
+    p.add_argument('--interval', type=int, default=1000, help="episodes between exploit/explore steps")
+    p.add_argument('--rounds', type=int, default=20)
+    p.add_argument('--truncation', type=float, default=0.25)
+    p.add_argument('--eval-episodes', type=int, default=20)
+    p.add_argument('--workers', type=int, default=None)
+    p.add_argument('--seed', type=int, default=0)
+    p.set_defaults(func=cmd_pbt)
+
+    p = sub.add_parser('budget', help="compare algorithms under an equal step / CPU budget")
+    p.add_argument('--budget', choices=['steps', 'cpu'], default='steps')
+    p.add_argument('--limit', type=float, default=None, help="env steps or CPU seconds per seed")
+    p.add_argument('--algos', nargs='+', default=None)
+    p.add_argument('--seeds', type=int, nargs='+', default=[0, 1, 2])
+    p.add_argument('--workers', type=int, default=None)
+    p.add_argument('--points', type=int, default=20)
+    p.add_argument('--eval-episodes', type=int, default=20)
+    p.set_defaults(func=cmd_budget)
+
+    p = sub.add_parser('bench', help="headless throughput micro-benchmarks")
+    p.add_argument('--steps', type=int, default=100000)
+    p.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def print_import_profile():
+    heavy = [m for m in ('numpy', 'pygame', 'matplotlib', 'seaborn') if m in sys.modules]
+    print("\nImport profile:")
+    print(f"  interpreter + cli startup (CPU): {_STARTUP_CPU * 1000:8.1f} ms")
+    for name, seconds in _IMPORT_TIMES:
+        print(f"  {name:<31} {seconds * 1000:8.1f} ms")
+    print(f"  heavy modules loaded: {', '.join(heavy) or 'none'}")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.func(args)
+    finally:
+        if args.profile_imports:
+            print_import_profile()
+
+
+if __name__ == "__main__":
+    main()
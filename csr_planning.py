@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from utils.discretize import flat_index
+
+CSR_FILES = ('ptr', 'col', 'prob', 'reward', 'done')
+
+
+def export_model_csr(path, source, bins=(8, 8, 8)):
+    """
+    Write a learned model as CSR arrays (one .npy per array) in directory `path`.
+    Rows are flat (s, a) ids s*2 + a in state order, so any range of states
+    is one contiguous slice of col/prob:
+      ptr (n_states*2 + 1,)  row offsets      col, prob (nnz,)  next state, probability
+      reward, done (n_states*2,)  mean reward and done probability per row
+    source: TransitionStats (flat keys, no dict model needed) or LearnedModel.
+    """
+    os.makedirs(path, exist_ok=True)
+
+    if hasattr(source, 'counts'):
+        bins = source.bins
+        n_states = source.n_states
+        keys = np.sort(np.fromiter(source.counts.keys(), dtype=np.int64, count=len(source.counts)))
+        counts = np.array([source.counts[k] for k in keys.tolist()], dtype=np.float64)
+        rows, col = np.divmod(keys, n_states)
+        totals = np.bincount(rows, weights=counts, minlength=n_states * 2)
+        prob = counts / totals[rows]
+        reward = np.zeros(n_states * 2)
+        done = np.zeros(n_states * 2)
+        visited = np.flatnonzero(totals)
+        reward[visited] = [source.reward_sum[k] / source.REWARD_SCALE for k in visited.tolist()]
+        reward[visited] /= totals[visited]
+        done[visited] = [source.done_count[k] for k in visited.tolist()]
+        done[visited] /= totals[visited]
+    else:
+        n_states = int(np.prod(bins))
+        entries = []
+        reward = np.zeros(n_states * 2)
+        done = np.zeros(n_states * 2)
+        for (s, a), trans in source.P.items():
+            row = flat_index(s, bins) * 2 + a
+            reward[row], done[row] = trans['r'], trans['done']
+            entries.extend((row, flat_index(s2, bins), p) for s2, p in trans['s_next'].items())
+        entries.sort()
+        rows = np.array([e[0] for e in entries], dtype=np.int64)
+        col = np.array([e[1] for e in entries], dtype=np.int64)
+        prob = np.array([e[2] for e in entries], dtype=np.float64)
+
+    ptr = np.zeros(n_states * 2 + 1, dtype=np.int64)
+    ptr[1:] = np.cumsum(np.bincount(rows, minlength=n_states * 2))
+
+    arrays = {'ptr': ptr, 'col': col.astype(np.int64), 'prob': prob, 'reward': reward, 'done': done}
+    for name in CSR_FILES:
+        np.save(os.path.join(path, f'{name}.npy'), arrays[name])
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump({'bins': list(bins), 'n_states': n_states, 'nnz': int(len(col))}, f)
+    return path
+
+
+def load_model_csr(path):
+    """Memory-map the CSR arrays written by export_model_csr."""
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in CSR_FILES}
+    return meta, arrays
+
+
+def state_blocks(ptr, n_states, block_nnz=1 << 20):
+    """Split states into contiguous ranges holding about block_nnz transitions each."""
+    state_ptr = np.asarray(ptr[::2])  # offset of row (s, 0) for every s, plus the end
+    cuts = np.searchsorted(state_ptr, np.arange(block_nnz, state_ptr[-1], block_nnz))
+    bounds = np.unique(np.r_[0, cuts, n_states])
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def _backup_block(arrays, V, s0, s1, gamma):
+    """Bellman backup of states [s0, s1): returns (n, 2) Q values, -inf for unvisited rows."""
+    ptr = np.asarray(arrays['ptr'][2 * s0:2 * s1 + 1])
+    col = np.asarray(arrays['col'][ptr[0]:ptr[-1]])
+    prob = np.asarray(arrays['prob'][ptr[0]:ptr[-1]])
+
+    lengths = np.diff(ptr)
+    row_ids = np.repeat(np.arange(len(lengths)), lengths)
+    expected = np.bincount(row_ids, weights=prob * V[col], minlength=len(lengths))
+
+    # Same convention as value_iteration: bootstrap only mostly non-terminal rows
+    done = np.asarray(arrays['done'][2 * s0:2 * s1])
+    Q = np.asarray(arrays['reward'][2 * s0:2 * s1]) + gamma * np.where(done < 0.5, expected, 0.0)
+    return np.where(lengths > 0, Q, -np.inf).reshape(-1, 2)
+
+
+def _sweep_block(arrays, V, s0, s1, gamma):
+    """Update V[s0:s1] in place; states without any visited action keep their value."""
+    best = _backup_block(arrays, V, s0, s1, gamma).max(axis=1)
+    new = np.where(np.isfinite(best), best, V[s0:s1])
+    delta = float(np.abs(new - V[s0:s1]).max())
+    V[s0:s1] = new
+    return delta
+
+
+_arrays = None
+_V = None
+_shm = None
+
+
+def _init_worker(path, shm_name, n_states):
+    global _arrays, _V, _shm
+    _, _arrays = load_model_csr(path)
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _V = np.ndarray((n_states,), dtype=np.float64, buffer=_shm.buf)
+
+
+def _worker_sweep(block, gamma):
+    return _sweep_block(_arrays, _V, block[0], block[1], gamma)
+
+
+def chunked_value_iteration(path, gamma=0.98, iters=300, tol=1e-4, block_nnz=1 << 20,
+                            workers=0, info=None):
+    """
+    Out-of-core value iteration over a CSR model directory (export_model_csr).
+    Each sweep streams contiguous state blocks of about block_nnz transitions
+    from the memory-mapped arrays, so memory is bounded by one block plus the
+    dense V. Updates are in place, block by block (like value_iteration's
+    in-place sweep). With workers > 0, blocks are backed up in parallel worker
+    processes that write to a shared-memory V (disjoint slices, no locking).
+    Returns V (n_states,) and policy (n_states,) int8 arrays, -1 for states
+    without any visited action.
+    """
+    start = time.time()
+    meta, arrays = load_model_csr(path)
+    n_states = meta['n_states']
+    blocks = state_blocks(arrays['ptr'], n_states, block_nnz)
+
+    shm = shared_memory.SharedMemory(create=True, size=n_states * 8)
+    pool = None
+    V_shared = None
+    try:
+        V_shared = np.ndarray((n_states,), dtype=np.float64, buffer=shm.buf)
+        V_shared[:] = 0.0
+        if workers:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(path, shm.name, n_states))
+
+        print(f"   [Chunked VI] {n_states} states, {meta['nnz']} transitions, "
+              f"{len(blocks)} blocks, {workers or 'no'} workers")
+
+        sweeps, delta = 0, 0.0
+        for it in range(iters):
+            if pool is None:
+                delta = max(_sweep_block(arrays, V_shared, s0, s1, gamma) for s0, s1 in blocks)
+            else:
+                delta = max(pool.map(_worker_sweep, blocks, [gamma] * len(blocks)))
+            sweeps += 1
+
+            if it % 50 == 0:
+                print(f"      Iter {it}: delta={delta:.6f}")
+
+            if delta < tol:
+                print(f"   [Chunked VI] Converged at iter {it}")
+                break
+
+        V = V_shared.copy()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        V_shared = None  # release the view before closing the segment
+        shm.close()
+        shm.unlink()
+
+    # Greedy policy, block by block
+    policy = np.full(n_states, -1, dtype=np.int8)
+    for s0, s1 in blocks:
+        Q = _backup_block(arrays, V, s0, s1, gamma)
+        policy[s0:s1] = np.where(np.isfinite(Q).any(axis=1), Q.argmax(axis=1), -1)
+
+    if info is not None:
+        info['iters'] = sweeps
+        info['delta'] = delta
+        info['time'] = time.time() - start
+
+    return V, policy
+
+
+def policy_to_dict(policy, bins=(8, 8, 8)):
+    """Dense policy array -> {s_disc: action} for PolicyAgent (unvisited states are left out)."""
+    known = np.flatnonzero(policy >= 0)
+    cells = np.stack(np.unravel_index(known, tuple(bins)), axis=1).tolist()
+    return {tuple(c): int(a) for c, a in zip(cells, policy[known].tolist())}
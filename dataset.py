@@ -45,14 +45,247 @@ def collect_dataset(env, agent=None, n_episodes=5000, max_steps=2000):
     return dataset
 
 
-def build_model_from_dataset(dataset):
+def collect_model(env, agent=None, n_episodes=5000, max_steps=2000, stats=None, out=None,
+                  seed=None, log_every=500):
+    """
+    Like collect_dataset, but feeds every transition straight into
+    TransitionStats count/sum accumulators instead of a list, so memory grows
+    with unique (s, a, s2) transitions only. Optionally saves the aggregate
+    to `out` (.npz). Returns the stats; stats.to_model() gives model, states.
+    If seed is given, episode i seeds the tube layout and the random
+    behaviour actions (a local random.Random) with seed + i, so any episode
+    range of a deterministic (eps = 0) or random agent can be replayed exactly
+    elsewhere. The global `random` state is never touched.
+    """
+    from statistics import mean
+    from agents.model_base import TransitionStats
+
+    bins = getattr(agent, 'bins', (8, 8, 8))
+    stats = TransitionStats(bins) if stats is None else stats
+    rng = random.Random()
+    scores = []
+
+    for ep in range(n_episodes):
+        if seed is not None:
+            rng.seed(seed + ep)
+        s = env.reset(seed=None if seed is None else seed + ep)
+        s_disc = discretize_state(s, bins)
+        done = False
+        steps = 0
+
+        while not done and steps < max_steps:
+            if agent is not None:
+                a = agent.act(s)
+            else:
+                a = rng.randint(0, 1)
+
+            s2, r, done, info = env.step(a)
+            s2_disc = discretize_state(s2, bins)
+
+            stats.add(s_disc, a, s2_disc, r, done)
+
+            s, s_disc = s2, s2_disc
+            steps += 1
+
+        scores.append(info['score'])
+
+        if log_every and (ep + 1) % log_every == 0:
+            recent_avg = mean(scores[-log_every:])
+            print(f"   Collected {ep+1}/{n_episodes}, recent avg score: {recent_avg:.2f}, "
+                  f"unique transitions: {len(stats.counts)}")
+
+    if out is not None:
+        stats.save(out)
+
+    return stats
+
+
+def coverage(visits, min_count=1):
+    """Fraction of (state, action) pairs sampled at least min_count times."""
+    return float(np.mean(visits >= min_count))
+
+
+def collect_coverage(env, agent=None, bins=None, target=0.95, min_count=5, max_transitions=2_000_000,
+                     restart_prob=0.5, eps=0.1, patience=20, max_steps=2000, seed=None, stats=None,
+                     log_every=500):
+    """
+    Coverage-driven collection into TransitionStats.
+    A live visitation histogram over flat (state, action) ids steers collection:
+      - with probability restart_prob an episode starts in an under-sampled cell
+        (env.restore of a configuration built by sim_model.states_to_config),
+        picked in proportion to its missing samples;
+      - in a state whose actions have fewer than min_count samples, the less
+        tried action is taken; otherwise `agent` acts (random if None),
+        with eps random actions;
+      - an episode is cut after `patience` steps in a row through well-sampled
+        states, so no budget is spent replaying the familiar corridor.
+    Stops once coverage(visits, min_count) >= target or after max_transitions.
+    If seed is given, episode i seeds the tube layout with seed + i and all
+    choices above come from one np.random.Generator seeded with seed, so a run
+    is reproducible; the global `random` state is never touched.
+    Returns stats, visits (an (n_states, 2) count array).
+    """
+    from agents.model_base import TransitionStats
+    from utils.discretize import flat_index
+    from utils.sim_model import sample_cell_states, states_to_config, configs_to_snapshots
+
+    bins = tuple(bins or getattr(agent, 'bins', (8, 8, 8)))
+    n_states = int(np.prod(bins))
+    stats = TransitionStats(bins) if stats is None else stats
+    visits = np.zeros((n_states, 2), dtype=np.int64)
+    rng = np.random.default_rng(seed)
+
+    ep = 0
+    while stats.n_transitions < max_transitions and coverage(visits, min_count) < target:
+        s = env.reset(seed=None if seed is None else seed + ep)
+
+        if rng.random() < restart_prob:
+            deficit = np.maximum(min_count - visits.min(axis=1), 0)
+            cell = rng.choice(n_states, p=deficit / deficit.sum())
+            state, _ = sample_cell_states(np.array([cell]), bins, 1, rng)
+            snap = configs_to_snapshots(env, *states_to_config(env, state, rng, bins))[0]
+            s = env.restore(snap)
+
+        s_disc = discretize_state(s, bins)
+        done = False
+        steps = 0
+        familiar = 0
+
+        while not done and steps < max_steps and familiar < patience:
+            counts = visits[flat_index(s_disc, bins)]
+            familiar = familiar + 1 if counts.min() >= min_count else 0
+            if counts.min() < min_count:
+                a = int(counts[1] < counts[0]) if counts[0] != counts[1] else int(rng.integers(2))
+            elif agent is None or rng.random() < eps:
+                a = int(rng.integers(2))
+            else:
+                a = agent.act(s)
+
+            s2, r, done, info = env.step(a)
+            s2_disc = discretize_state(s2, bins)
+
+            stats.add(s_disc, a, s2_disc, r, done)
+            visits[flat_index(s_disc, bins), a] += 1
+
+            s, s_disc = s2, s2_disc
+            steps += 1
+
+        ep += 1
+        if log_every and ep % log_every == 0:
+            print(f"   Episode {ep}: {stats.n_transitions} transitions, "
+                  f"coverage {coverage(visits, min_count):.1%} (>= {min_count} samples)")
+
+    print(f"   Coverage {coverage(visits, min_count):.1%} after {ep} episodes, "
+          f"{stats.n_transitions} transitions")
+    return stats, visits
+
+
+_env = None
+
+
+def _init_collect_worker(frame_skip=1):
+    global _env
+    import os
+    from flappybird_env import FlappyBirdEnv
+    _env = FlappyBirdEnv(render_mode=False, frame_skip=frame_skip)
+    # Forked workers inherit one copy of the global `random` state that agent.act() draws from
+    random.seed(os.urandom(16))
+
+
+def _collect_shard(agent, first, n_episodes, max_steps, seed):
+    if seed is not None:
+        seed += first
+        random.seed(seed)  # the agent's exploration, whichever worker runs the shard
+    return collect_model(_env, agent, n_episodes, max_steps, seed=seed, log_every=0)
+
+
+def collect_model_parallel(agent=None, n_episodes=5000, max_steps=2000, workers=None,
+                           seed=None, shard_size=250, out=None, frame_skip=1):
+    """
+    Parallel collect_model: episodes are split into shards of `shard_size`,
+    collected by worker processes (each with its own env and a copy of the
+    agent) and the per-shard TransitionStats are merged as they finish.
+    Seeding follows collect_model: with a seed, episodes are seeded by their
+    global index, so the result is identical to
+    collect_model(env, agent, n_episodes, max_steps, seed=seed) for a random or
+    greedy agent; without one, every worker env and shard draws from its own
+    fresh RNGs. An agent exploring with the global `random` module is reseeded
+    per worker (and with seed + first shard episode when seeded), so shards
+    never replay each other's exploration and a seeded run does not depend on
+    the number of workers.
+    """
+    import os
+    import time
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from agents.model_base import TransitionStats
+
+    start = time.time()
+    workers = workers or os.cpu_count() or 1
+    stats = TransitionStats(getattr(agent, 'bins', (8, 8, 8)))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_collect_worker,
+                             initargs=(frame_skip,)) as pool:
+        futures = [pool.submit(_collect_shard, agent, first,
+                               min(shard_size, n_episodes - first), max_steps, seed)
+                   for first in range(0, n_episodes, shard_size)]
+        for n_merged, future in enumerate(as_completed(futures), 1):
+            stats.merge(future.result())
+            if n_merged % max(1, len(futures) // 10) == 0 or n_merged == len(futures):
+                print(f"   Merged {n_merged}/{len(futures)} shards, "
+                      f"unique transitions: {len(stats.counts)}")
+
+    print(f"   Collected {n_episodes} episodes ({stats.n_transitions} transitions) "
+          f"on {workers} workers in {time.time() - start:.2f}s")
+
+    if out is not None:
+        stats.save(out)
+
+    return stats
+
+
+# Flat transition record for array datasets (see save_dataset_arrays)
+TRANSITION_DTYPE = np.dtype([
+    ('s', '<u4'),
+    ('a', 'u1'),
+    ('s2', '<u4'),
+    ('r', '<f8'),
+    ('done', 'u1'),
+])
+
+
+def save_dataset_arrays(dataset, path, bins=(8, 8, 8)):
+    """
+    Save a collect_dataset list as one structured .npy array of
+    TRANSITION_DTYPE records with flat state indices, sorted by (s, a),
+    so it can be memory-mapped and segment-reduced per (s, a) pair.
+    """
+    from utils.discretize import flat_index
+
+    n = len(dataset)
+    arr = np.zeros(n, dtype=TRANSITION_DTYPE)
+    arr['s'] = flat_index(np.array([item[0] for item in dataset]).reshape(n, 3), bins)
+    arr['a'] = [item[1] for item in dataset]
+    arr['s2'] = flat_index(np.array([item[2] for item in dataset]).reshape(n, 3), bins)
+    arr['r'] = [item[3] for item in dataset]
+    arr['done'] = [item[4] if len(item) == 5 else False for item in dataset]
+
+    order = np.argsort(arr['s'].astype(np.int64) * 2 + arr['a'], kind='stable')
+    np.save(path, arr[order])
+    return path
+
+
+def load_dataset_arrays(path, mmap=True):
+    return np.load(path, mmap_mode='r' if mmap else None)
+
+
+def build_model_from_dataset(dataset, model=None):
     """
     Build a learned MDP model from dataset.
+    Pass e.g. a BoundedLearnedModel as `model` to cap memory.
     """
-    from collections import defaultdict
     from agents.model_base import LearnedModel
 
-    model = LearnedModel()
+    model = LearnedModel() if model is None else model
     states = set()
 
     for item in dataset:
@@ -72,18 +305,19 @@ def build_model_from_dataset(dataset):
     return model, list(states)
 
 
-def evaluate_policy(env, policy, episodes=100, bins=(8, 8, 8)):
+def evaluate_policy(env, policy, episodes=100, bins=(8, 8, 8), seed=None):
     """
     Evaluate a deterministic policy or an agent object on the environment.
     - If policy is dict: key is discrete state, value is action.
     - If policy is an agent: must have .act(state).
+    - If seed is given, episode i uses tube layout seed + i.
     """
     from utils.discretize import discretize_state
 
     scores = []
 
     for ep in range(episodes):
-        s = env.reset()
+        s = env.reset(seed=None if seed is None else seed + ep)
         done = False
         steps = 0
 
@@ -1,13 +1,18 @@
 import numpy as np
 
 
+# State bounds: [velocity, horizontal_dist, vertical_dist]
+STATE_LOW = np.array([-1.5, 0.0, -1.5])
+STATE_HIGH = np.array([1.5, 3.0, 1.5])
+
+
 def discretize_state(state, bins=(8, 8, 8)):
     """
     Discretize continuous state into integer bins.
     State: [velocity, horizontal_dist, vertical_dist]
     """
-    low = np.array([-1.5, 0.0, -1.5])
-    high = np.array([1.5, 3.0, 1.5])
+    low = STATE_LOW
+    high = STATE_HIGH
 
     state_clipped = np.clip(state, low, high)
     ratios = (state_clipped - low) / (high - low)
@@ -15,3 +20,23 @@ def discretize_state(state, bins=(8, 8, 8)):
 
     idx = tuple((ratios * np.array(bins)).astype(int))
     return idx
+
+
+def discretize_batch(states, bins=(8, 8, 8)):
+    """
+    Vectorized discretize_state for an (N, 3) array of states.
+    Returns an (N, 3) int array of bin indices (same bins as discretize_state).
+    """
+    states = np.asarray(states, dtype=np.float32).reshape(-1, 3)
+    state_clipped = np.clip(states, STATE_LOW, STATE_HIGH)
+    ratios = (state_clipped - STATE_LOW) / (STATE_HIGH - STATE_LOW)
+    ratios = np.clip(ratios, 0.0, 0.999)
+    return (ratios * np.array(bins)).astype(np.int64)
+
+
+def flat_index(idx, bins=(8, 8, 8)):
+    """Row-major flat index of a discretized state (tuple or (N, 3) array)."""
+    if isinstance(idx, tuple):
+        return (idx[0] * bins[1] + idx[1]) * bins[2] + idx[2]
+    idx = np.asarray(idx)
+    return (idx[..., 0] * bins[1] + idx[..., 1]) * bins[2] + idx[..., 2]
@@ -0,0 +1,135 @@
+import copy
+import numpy as np
+from statistics import NormalDist
+from concurrent.futures import ProcessPoolExecutor
+from utils.dataset import evaluate_policy
+
+_env = None
+
+
+def _init_worker(frame_skip=1):
+    global _env
+    from flappybird_env import FlappyBirdEnv
+    _env = FlappyBirdEnv(render_mode=False, frame_skip=frame_skip)
+
+
+def _evaluate_snapshot(agent, episodes, seed):
+    mean, std, _ = evaluate_policy(_env, agent, episodes, bins=agent.bins, seed=seed)
+    return mean
+
+
+class GreedyEvaluator:
+    """
+    Evaluates greedy snapshots of an agent in background worker processes
+    while training continues, and tracks when greedy performance plateaus.
+    All snapshots are scored on the same seeded tube layouts.
+    - should_stop: target_score reached, or (after min_episodes) `patience`
+      evaluations in a row without improving the best score by at least min_delta
+    - best_agent / best_score: best snapshot seen so far
+    """
+    def __init__(self, eval_episodes=20, patience=5, min_delta=0.5,
+                 target_score=None, min_episodes=0, workers=2, seed=0, frame_skip=1):
+        self.eval_episodes = eval_episodes
+        self.patience = patience
+        self.min_delta = min_delta
+        self.target_score = target_score
+        self.min_episodes = min_episodes
+        self.seed = seed
+
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                        initargs=(frame_skip,))
+        self.pending = []
+        self.history = []  # (episode, greedy mean score)
+
+        self.best_agent = None
+        self.best_score = float('-inf')
+        self.best_episode = 0
+        self.since_best = 0
+        self.should_stop = False
+
+    def submit(self, episode, agent):
+        snapshot = copy.deepcopy(agent)
+        snapshot.eps = 0.0
+        if hasattr(snapshot, 'episode'):  # MCAgent trajectory buffer
+            snapshot.episode = []
+        future = self.pool.submit(_evaluate_snapshot, snapshot, self.eval_episodes, self.seed)
+        self.pending.append((episode, snapshot, future))
+
+    def poll(self, block=False):
+        """Consume finished evaluations, in submission order."""
+        while self.pending and (block or self.pending[0][2].done()):
+            episode, snapshot, future = self.pending.pop(0)
+            score = future.result()
+            self.history.append((episode, score))
+
+            if score > self.best_score + self.min_delta:
+                self.since_best = 0
+            else:
+                self.since_best += 1
+
+            if score > self.best_score:
+                self.best_agent, self.best_score, self.best_episode = snapshot, score, episode
+
+            print(f"  [eval] Ep {episode:5d} | greedy avg: {score:5.2f} | best: {self.best_score:5.2f}")
+
+            if self.target_score is not None and score >= self.target_score:
+                self.should_stop = True
+            if self.since_best >= self.patience and episode >= self.min_episodes:
+                self.should_stop = True
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def paired_evaluate(env, policies, episodes=100, seed=0):
+    """
+    Common-random-numbers evaluation: every policy plays the same sequence
+    of seeded tube layouts (episode i uses seed + i).
+    policies: name -> policy dict or agent. Returns name -> scores array.
+    """
+    scores = {}
+    for name, policy in policies.items():
+        bins = getattr(policy, 'bins', (8, 8, 8))
+        _, _, ep_scores = evaluate_policy(env, policy, episodes, bins=bins, seed=seed)
+        scores[name] = np.asarray(ep_scores, dtype=np.float64)
+    return scores
+
+
+def paired_comparison(scores, baseline=None, confidence=0.95):
+    """
+    Paired differences of every policy against `baseline` (first by default).
+    Each row holds the mean difference, its confidence interval and the
+    variance reduction vs. an unpaired comparison, i.e. roughly how many
+    times more episodes independent runs would need for the same interval.
+    """
+    names = list(scores)
+    baseline = baseline or names[0]
+    base = scores[baseline]
+    n = len(base)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    rows = []
+    for name in names:
+        if name == baseline:
+            continue
+        diff = scores[name] - base
+        se = diff.std(ddof=1) / np.sqrt(n) if n > 1 else float('nan')
+        se_unpaired = np.sqrt((scores[name].var(ddof=1) + base.var(ddof=1)) / n) if n > 1 else float('nan')
+        rows.append({
+            'policy': name,
+            'baseline': baseline,
+            'mean_diff': float(diff.mean()),
+            'ci_low': float(diff.mean() - z * se),
+            'ci_high': float(diff.mean() + z * se),
+            'variance_reduction': float(se_unpaired ** 2 / se ** 2) if se > 0 else float('inf'),
+        })
+    return rows
+
+
+def print_paired_report(scores, rows, confidence=0.95):
+    for name, s in scores.items():
+        print(f"  {name:<12} mean {s.mean():7.2f} ± {s.std():.2f}  ({len(s)} episodes)")
+    for row in rows:
+        print(f"  {row['policy']} - {row['baseline']}: {row['mean_diff']:+.2f} "
+              f"[{row['ci_low']:+.2f}, {row['ci_high']:+.2f}] ({confidence:.0%} CI) "
+              f"| variance reduction x{row['variance_reduction']:.1f}")
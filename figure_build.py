@@ -0,0 +1,81 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import inspect
+from concurrent.futures import ProcessPoolExecutor
+
+
+class FigureSpec:
+    """
+    One generated artifact: `func(*args, **kwargs)` writes `output`.
+    `extra` is any picklable value that should also invalidate the figure
+    when it changes (e.g. sizes/mtimes of log files the function reads).
+    func must be a module-level function so worker processes can import it.
+    """
+    def __init__(self, func, output, args=(), kwargs=None, extra=None):
+        self.func = func
+        self.output = output
+        self.args = tuple(args)
+        self.kwargs = kwargs or {}
+        self.extra = extra
+
+    def digest(self):
+        h = hashlib.sha256()
+        # Source file rather than __module__, which is '__main__' when the defining
+        # script is run directly and its module name when imported
+        source_file = os.path.realpath(inspect.getsourcefile(self.func))
+        h.update(f"{source_file}:{self.func.__qualname__}".encode())
+        h.update(inspect.getsource(self.func).encode())
+        h.update(pickle.dumps((self.args, sorted(self.kwargs.items()), self.extra), protocol=4))
+        return h.hexdigest()
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _render(func, args, kwargs):
+    func(*args, **kwargs)
+
+
+def build_figures(specs, cache_path='results/.figure_cache.json', workers=None, force=False):
+    """
+    Render only the figures whose generating function or inputs changed since
+    the last build (or whose output is missing), in parallel worker processes.
+    Returns the list of outputs that were rendered.
+    """
+    start = time.time()
+    cache = {}
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache = json.load(f)
+
+    stale = []
+    for spec in specs:
+        digest = spec.digest()
+        if force or cache.get(spec.output) != digest or not os.path.exists(spec.output):
+            stale.append((spec, digest))
+
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [(spec, digest, pool.submit(_render, spec.func, spec.args, spec.kwargs))
+                       for spec, digest in stale]
+            for spec, digest, future in futures:
+                future.result()
+                cache[spec.output] = digest
+
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        with open(cache_path, 'w') as f:
+            json.dump(cache, f, indent=2)
+
+    print(f"[figures] {len(specs) - len(stale)} up to date, {len(stale)} rendered "
+          f"in {time.time() - start:.2f}s")
+    return [spec.output for spec, _ in stale]
+
+
+def file_stamp(paths):
+    """(size, mtime) per path, for FigureSpec.extra on figures that read files."""
+    return {p: (os.path.getsize(p), os.path.getmtime(p)) for p in paths}
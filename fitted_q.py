@@ -0,0 +1,82 @@
+import numpy as np
+from utils.dataset import load_dataset_arrays
+
+
+def _segments(chunk):
+    """Flat (s, a) keys of a sorted chunk and the start offset of each run of equal keys."""
+    sa = chunk['s'].astype(np.int64) * 2 + chunk['a']
+    starts = np.flatnonzero(np.r_[True, sa[1:] != sa[:-1]])
+    return sa, starts
+
+
+def _chunks(data, chunk_size):
+    for i in range(0, len(data), chunk_size):
+        yield data[i:i + chunk_size]
+
+
+def fitted_q_iteration(data, bins=(8, 8, 8), gamma=0.98, iters=300, tol=1e-4,
+                       chunk_size=1_000_000, info=None):
+    """
+    Offline fitted Q-iteration straight on a transition array (no model dicts).
+    data: path of a save_dataset_arrays file (memory-mapped) or the array itself,
+    sorted by (s, a). Each sweep reads it in chunks and computes
+      Q(s, a) = mean over stored transitions of r + gamma * (1 - done) * max_a' Q(s2, a')
+    with one np.add.reduceat per chunk (reward sums are reduced once). Unvisited (s, a) pairs are ignored;
+    states with no visited action have value 0.
+    Returns Q as an (n_states, 2) array and the greedy policy dict over visited states.
+    """
+    if isinstance(data, str):
+        data = load_dataset_arrays(data)
+
+    n_states = int(np.prod(bins))
+    counts = np.zeros(n_states * 2)
+    reward_sums = np.zeros(n_states * 2)
+
+    # Segment offsets per chunk are small (one per (s, a) run), so keep them
+    segments = []
+    for chunk in _chunks(data, chunk_size):
+        sa, starts = _segments(chunk)
+        keys = sa[starts]
+        counts[keys] += np.diff(np.r_[starts, len(sa)])
+        reward_sums[keys] += np.add.reduceat(chunk['r'], starts)
+        segments.append((keys, starts))
+
+    visited = (counts > 0).reshape(n_states, 2)
+    has_action = visited.any(axis=1)
+    Q = np.zeros((n_states, 2))
+    sweeps, delta = 0, 0.0
+
+    print(f"   [FQI] Running on {len(data)} transitions, {int(visited.sum())} state-action pairs...")
+
+    for it in range(iters):
+        V = np.where(has_action, np.where(visited, Q, -np.inf).max(axis=1), 0.0)
+        sums = reward_sums.copy()
+
+        for chunk, (keys, starts) in zip(_chunks(data, chunk_size), segments):
+            bootstrap = gamma * V[chunk['s2']]
+            bootstrap[chunk['done'] != 0] = 0.0
+            sums[keys] += np.add.reduceat(bootstrap, starts)
+
+        Q_new = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0).reshape(n_states, 2)
+        delta = np.abs(Q_new - Q).max()
+        Q = Q_new
+        sweeps += 1
+
+        if it % 50 == 0:
+            print(f"      Iter {it}: delta={delta:.6f}, Q_mean={Q[visited].mean():.3f}")
+
+        if delta < tol:
+            print(f"   [FQI] Converged at iter {it}")
+            break
+
+    if info is not None:
+        info['iters'] = sweeps
+        info['delta'] = delta
+
+    # Greedy policy over states with at least one visited action
+    greedy = np.where(visited, Q, -np.inf).argmax(axis=1)
+    policy = {}
+    for flat in np.flatnonzero(has_action).tolist():
+        policy[tuple(int(i) for i in np.unravel_index(flat, bins))] = int(greedy[flat])
+
+    return Q, policy
@@ -1,16 +1,35 @@
-import pygame
-from random import randint
+import random
 import numpy as np
 
 
 class FlappyBirdEnv:
-    def __init__(self, render_mode=True):
-        pygame.init()
+    def __init__(self, render_mode=True, frame_skip=1):
+        """
+        render_mode:
+          True        -> draw to a display window, throttled to 60 FPS
+          "rgb_array" -> draw to an offscreen pygame.Surface, no clock limit;
+                         render() returns the frame as an (H, W, 3) uint8 array
+          False       -> no rendering (pygame is never imported)
+        frame_skip: physics ticks per step() / batch_step() call; the action is
+          repeated for every tick, rewards are summed, and the call returns
+          early when the episode ends.
+        """
+        if frame_skip < 1:
+            raise ValueError("frame_skip must be >= 1")
+        self.frame_skip = frame_skip
         self.WIDTH, self.HEIGHT = 400, 600
-        self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT)) if render_mode else None
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("sans", 20)
+        self.screen = None
         self.render_mode = render_mode
+        if render_mode:
+            import pygame
+            pygame.init()
+            if render_mode == "rgb_array":
+                self.screen = pygame.Surface((self.WIDTH, self.HEIGHT))
+            else:
+                self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
+            self.clock = pygame.time.Clock()
+            self.font = pygame.font.SysFont("sans", 20)
+        self.rng = random.Random()
 
         # Colors
         self.GREEN = (0, 255, 0)
@@ -31,8 +50,11 @@ class FlappyBirdEnv:
 
         self.reset()
 
-    def reset(self):
-        """Reset game and return initial state"""
+    def reset(self, seed=None):
+        """Reset game and return initial state. A seed fixes the tube layout."""
+        if seed is not None:
+            self.rng.seed(seed)
+
         self.Bird_y = 300
         self.bird_vel = 0
         self.score = 0
@@ -40,12 +62,53 @@ class FlappyBirdEnv:
 
         # Tubes start farther and in easier range
         self.tubes = [
-            {"x": 700, "height": randint(150, 300), "passed": False},
-            {"x": 1050, "height": randint(150, 300), "passed": False},
-            {"x": 1400, "height": randint(150, 300), "passed": False},
+            {"x": 700, "height": self.rng.randint(150, 300), "passed": False},
+            {"x": 1050, "height": self.rng.randint(150, 300), "passed": False},
+            {"x": 1400, "height": self.rng.randint(150, 300), "passed": False},
         ]
         return self.get_state()
 
+    # snapshot() layout: bird y, velocity, score, done, then (x, height, passed) per tube
+    SNAPSHOT_SIZE = 4 + 3 * 3
+
+    def snapshot(self, out=None):
+        """
+        Copy the game state into a flat float64 array of SNAPSHOT_SIZE values
+        (written into `out` when given, so repeated snapshots do not allocate).
+        The tube RNG is not included: tubes respawned after restore() are drawn
+        from the env's current RNG state.
+        """
+        if out is None:
+            out = np.empty(self.SNAPSHOT_SIZE)
+        out[0] = self.Bird_y
+        out[1] = self.bird_vel
+        out[2] = self.score
+        out[3] = self.done
+        for k, t in enumerate(self.tubes):
+            out[4 + 3 * k] = t["x"]
+            out[5 + 3 * k] = t["height"]
+            out[6 + 3 * k] = t["passed"]
+        return out
+
+    def restore(self, snap):
+        """Restore a snapshot() in place (the tube dicts are reused)."""
+        self.Bird_y = float(snap[0])
+        self.bird_vel = float(snap[1])
+        self.score = int(snap[2])
+        self.done = bool(snap[3])
+        for k, t in enumerate(self.tubes):
+            t["x"] = float(snap[4 + 3 * k])
+            t["height"] = int(snap[5 + 3 * k])
+            t["passed"] = bool(snap[6 + 3 * k])
+        return self.get_state()
+
+    @staticmethod
+    def unpack_snapshots(snaps):
+        """(N, SNAPSHOT_SIZE) snapshots -> (y, vel, tube_x, tube_h, passed) arrays for batch_step()."""
+        snaps = np.atleast_2d(snaps)
+        tubes = snaps[:, 4:].reshape(len(snaps), -1, 3)
+        return snaps[:, 0], snaps[:, 1], tubes[:, :, 0], tubes[:, :, 1], tubes[:, :, 2] > 0.5
+
     def get_state(self):
         """Return state: [velocity, horizontal_dist, vertical_dist]"""
         y, vy = self.Bird_y, self.bird_vel
@@ -68,10 +131,20 @@ class FlappyBirdEnv:
         ], dtype=np.float32)
 
     def step(self, action):
-        """Action: 0 = no jump, 1 = jump"""
+        """Action: 0 = no jump, 1 = jump (repeated for frame_skip ticks)"""
         if self.done:
             return self.get_state(), 0.0, True, {"score": self.score}
 
+        reward = 0.0
+        for _ in range(self.frame_skip):
+            reward += self._tick(action)
+            if self.done:
+                break
+
+        return self.get_state(), reward, self.done, {"score": self.score}
+
+    def _tick(self, action):
+        """Advance the game by one physics tick and return the reward."""
         # Execute action
         if action == 1:
             self.bird_vel = self.JUMP_STRENGTH
@@ -85,7 +158,7 @@ class FlappyBirdEnv:
             t["x"] -= self.TUBE_VELOCITY
             if t["x"] < -self.TUBE_WIDTH:
                 t["x"] = max([tube["x"] for tube in self.tubes]) + 350
-                t["height"] = randint(150, 300)
+                t["height"] = self.rng.randint(150, 300)
                 t["passed"] = False
 
         # Score update
@@ -127,12 +200,101 @@ class FlappyBirdEnv:
             proximity_reward = 3.0 * max(0.0, 1.0 - distance_to_center / (self.HEIGHT / 2))
             reward += proximity_reward
 
-        return self.get_state(), reward, self.done, {"score": self.score}
+        return reward
+
+    def batch_step(self, y, vel, tube_x, tube_h, passed, actions, rng=None):
+        """
+        Vectorized step() for N independent configurations.
+        y, vel: (N,) bird position/velocity; tube_x, tube_h, passed: (N, n_tubes);
+        actions: (N,). Inputs are not modified. Respawned tube heights are drawn
+        from `rng` (a np.random.Generator). Honors frame_skip: rows that end
+        mid-call keep their terminal configuration.
+        Returns (y, vel, tube_x, tube_h, passed, reward, done).
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        actions = np.asarray(actions)
+
+        y, vel, tube_x, tube_h, passed, reward, done = self._batch_tick(
+            y, vel, tube_x, tube_h, passed, actions, rng)
+
+        for _ in range(self.frame_skip - 1):
+            if done.all():
+                break
+            nxt = self._batch_tick(y, vel, tube_x, tube_h, passed, actions, rng)
+            live = ~done
+            y, vel = np.where(live, nxt[0], y), np.where(live, nxt[1], vel)
+            tube_x = np.where(live[:, None], nxt[2], tube_x)
+            tube_h = np.where(live[:, None], nxt[3], tube_h)
+            passed = np.where(live[:, None], nxt[4], passed)
+            reward = reward + np.where(live, nxt[5], 0.0)
+            done = done | nxt[6]
+
+        return y, vel, tube_x, tube_h, passed, reward, done
+
+    def _batch_tick(self, y, vel, tube_x, tube_h, passed, actions, rng):
+        """One physics tick of batch_step()."""
+
+        # Physics update
+        vel = np.where(actions == 1, self.JUMP_STRENGTH, vel)
+        y = y + vel
+        vel = vel + self.GRAVITY
+
+        # Move tubes (in list order, exactly like step(): later tubes are not moved yet
+        # when an earlier one is respawned behind the current rightmost tube)
+        tube_x = np.array(tube_x, dtype=np.float64)
+        tube_h = np.array(tube_h, dtype=np.float64)
+        passed = np.array(passed, dtype=bool)
+        for k in range(tube_x.shape[1]):
+            tube_x[:, k] -= self.TUBE_VELOCITY
+            out = tube_x[:, k] < -self.TUBE_WIDTH
+            if out.any():
+                tube_x[out, k] = tube_x[out].max(axis=1) + 350
+                tube_h[out, k] = rng.integers(150, 301, int(out.sum()))
+                passed[out, k] = False
+
+        # Score update
+        newly_passed = ~passed & (tube_x + self.TUBE_WIDTH < self.BIRD_X)
+        passed = passed | newly_passed
+        passed_tube = newly_passed.any(axis=1)
+
+        # Collision detection
+        overlap = (self.BIRD_X + self.BIRD_WIDTH > tube_x) & (self.BIRD_X < tube_x + self.TUBE_WIDTH)
+        hit = overlap & ((y[:, None] < tube_h) | (y[:, None] + self.BIRD_HEIGHT > tube_h + self.TUBE_GAP))
+        done = (y < 0) | (y + self.BIRD_HEIGHT > self.HEIGHT) | hit.any(axis=1)
+
+        # Reward calculation
+        ahead = tube_x + self.TUBE_WIDTH > self.BIRD_X
+        nxt = np.where(ahead.any(axis=1), ahead.argmax(axis=1), 0)
+        gap_center = tube_h[np.arange(len(y)), nxt] + self.TUBE_GAP / 2
+        distance_to_center = np.abs(y + self.BIRD_HEIGHT / 2 - gap_center)
+        proximity_reward = 3.0 * np.maximum(0.0, 1.0 - distance_to_center / (self.HEIGHT / 2))
+        reward = np.where(done, -5.0, 0.2 + 20.0 * passed_tube + proximity_reward)
+
+        return y, vel, tube_x, tube_h, passed, reward, done
+
+    def batch_state(self, y, vel, tube_x, tube_h):
+        """Vectorized get_state(): (N, 3) float32 states."""
+        ahead = tube_x + self.TUBE_WIDTH > self.BIRD_X
+        nxt = np.where(ahead.any(axis=1), ahead.argmax(axis=1), tube_x.argmax(axis=1))
+        rows = np.arange(len(y))
+
+        next_x = np.maximum(0, tube_x[rows, nxt] - self.BIRD_X)
+        gap_center_y = tube_h[rows, nxt] + self.TUBE_GAP / 2
+        vertical_distance = (y + self.BIRD_HEIGHT / 2 - gap_center_y) / self.HEIGHT
+
+        return np.stack([
+            np.clip(vel / 10, -1.5, 1.5),
+            next_x / self.WIDTH,
+            np.clip(vertical_distance, -1.5, 1.5)
+        ], axis=1).astype(np.float32)
 
     def render(self):
         if not self.render_mode:
             return
-        self.clock.tick(60)
+        import pygame
+        offscreen = self.render_mode == "rgb_array"
+        if not offscreen:
+            self.clock.tick(60)
         self.screen.fill(self.GREEN)
 
         # Draw tubes
@@ -151,7 +313,16 @@ class FlappyBirdEnv:
         score_text = self.font.render(f"Score: {self.score}", True, self.BLACK)
         self.screen.blit(score_text, (10, 10))
 
+        if offscreen:
+            return self.get_frame()
         pygame.display.flip()
 
+    def get_frame(self):
+        """Return the current screen as an (H, W, 3) uint8 RGB array."""
+        import pygame
+        return pygame.surfarray.array3d(self.screen).transpose(1, 0, 2)
+
     def close(self):
-        pygame.quit()
+        if self.render_mode:
+            import pygame
+            pygame.quit()
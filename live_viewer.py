@@ -0,0 +1,157 @@
+"""
+Live training viewer that never slows down the learner.
+
+The trainer copies its Q-table into shared memory every few episodes
+(QTablePublisher.publish, a plain memcpy). A separate viewer process
+reads the latest table on a background thread and plays its own
+rendered greedy episodes at 60 FPS, so training stays headless.
+
+    python cli.py train --algo q --live-view
+    python live_viewer.py <shared memory name>   # attach to a running trainer
+"""
+import sys
+import time
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+
+# header: [version (odd while writing), closed, bins0, bins1, bins2, n_actions]
+HEADER_LEN = 6
+
+
+def q_array(agent):
+    """Dense Q array of an agent (QAgent/SarsaAgent: q_table, MCAgent: Q)."""
+    q = getattr(agent, 'q_table', getattr(agent, 'Q', None))
+    if not isinstance(q, np.ndarray):
+        raise ValueError(f"{type(agent).__name__} has no dense Q-table to publish")
+    return q
+
+
+class QTablePublisher:
+    """Trainer side: owns a shared-memory copy of the Q-table."""
+    def __init__(self, shape, name=None):
+        n = int(np.prod(shape))
+        self.shm = shared_memory.SharedMemory(create=True, size=(HEADER_LEN + n) * 8, name=name)
+        self.name = self.shm.name
+        self.header = np.ndarray(HEADER_LEN, dtype=np.int64, buffer=self.shm.buf)
+        self.header[:] = 0
+        self.header[2:2 + len(shape)] = shape
+        self.table = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf, offset=HEADER_LEN * 8)
+
+    def publish(self, q):
+        self.header[0] += 1  # odd: readers retry
+        self.table[...] = q
+        self.header[0] += 1
+
+    def close(self):
+        self.header[1] = 1
+        self.header = self.table = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(name):
+    """
+    Attach without registering the segment with this process's resource tracker,
+    which would unlink it under the trainer when a standalone viewer exits.
+    Registration is skipped rather than undone (resource_tracker.unregister):
+    a viewer from start_viewer shares the trainer's tracker and would drop its entry.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda res, rtype: None if rtype == 'shared_memory' else register(res, rtype)
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedQReader:
+    """Viewer side: consistent snapshots of a published Q-table."""
+    def __init__(self, name):
+        self.shm = _attach(name)
+        self.header = np.ndarray(HEADER_LEN, dtype=np.int64, buffer=self.shm.buf)
+        shape = tuple(int(x) for x in self.header[2:])
+        self.table = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf, offset=HEADER_LEN * 8)
+
+    @property
+    def closed(self):
+        return bool(self.header[1])
+
+    def read(self):
+        """Return (version, copy of the table), retrying while a write is in progress."""
+        while True:
+            v1 = int(self.header[0])
+            if v1 % 2 == 0:
+                snapshot = self.table.copy()
+                if int(self.header[0]) == v1:
+                    return v1, snapshot
+            time.sleep(0.0005)
+
+
+class SharedGreedyAgent:
+    """Greedy agent over the latest published table, refreshed by a daemon thread."""
+    def __init__(self, reader, refresh=0.5):
+        self.reader = reader
+        self.bins = reader.table.shape[:-1]
+        self.eps = 0.0
+        self.version, self.q = reader.read()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._refresh_loop, args=(refresh,), daemon=True)
+        self._thread.start()
+
+    def _refresh_loop(self, refresh):
+        while not self._stop.wait(refresh):
+            if self.reader.closed:
+                break
+            version, q = self.reader.read()
+            if version != self.version:
+                self.version, self.q = version, q  # reference swap, act() never blocks
+
+    def act(self, state):
+        from utils.discretize import discretize_state
+        return int(np.argmax(self.q[discretize_state(state, self.bins)]))
+
+    def stop(self):
+        self._stop.set()
+
+
+def run_viewer(name, refresh=0.5, max_steps=3000):
+    import pygame
+    from flappybird_env import FlappyBirdEnv
+
+    reader = SharedQReader(name)
+    agent = SharedGreedyAgent(reader, refresh)
+    env = FlappyBirdEnv(render_mode=True)
+
+    try:
+        while not reader.closed:
+            s = env.reset()
+            done = False
+            steps = 0
+            while not done and steps < max_steps and not reader.closed:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        return
+                s, r, done, info = env.step(agent.act(s))
+                env.render()
+                steps += 1
+            pygame.display.set_caption(f"Flappy Bird RL - table v{agent.version // 2} | last score {info['score']}")
+    finally:
+        agent.stop()
+        env.close()
+        reader.shm.close()
+
+
+def start_viewer(publisher, refresh=0.5):
+    """Spawn the viewer process for a publisher; returns the Process."""
+    proc = mp.get_context('spawn').Process(target=run_viewer, args=(publisher.name, refresh), daemon=True)
+    proc.start()
+    return proc
+
+
+if __name__ == "__main__":
+    run_viewer(sys.argv[1])
@@ -0,0 +1,99 @@
+import time
+import numpy as np
+
+
+class LookaheadAgent:
+    """
+    Online planner: before every decision, snapshot the env and score both
+    actions with batched depth-limited rollouts (FlappyBirdEnv.batch_step).
+    Both actions share the same random continuations (common random
+    numbers), so their difference has low variance.
+    Rollouts stop early when the per-decision latency budget runs out.
+
+    rollout_policy: None -> flap with probability flap_prob; otherwise an
+    object with .act_batch(states) (e.g. an ExportedPolicy) used after the first step.
+    """
+    def __init__(self, env, depth=40, rollouts=32, gamma=0.98, flap_prob=0.08,
+                 latency_budget=0.005, rollout_policy=None, seed=None, bins=(8, 8, 8)):
+        self.env = env
+        self.depth = depth
+        self.rollouts = rollouts
+        self.gamma = gamma
+        self.flap_prob = flap_prob
+        self.latency_budget = latency_budget
+        self.rollout_policy = rollout_policy
+        self.rng = np.random.default_rng(seed)
+        self.bins = bins
+        self.eps = 0.0
+
+        self._snap = np.empty(env.SNAPSHOT_SIZE)
+        self._first = np.repeat([0, 1], rollouts)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.decisions = 0
+        self.think_time = 0.0
+        self.depth_sum = 0
+        self.truncated = 0
+
+    def action_values(self):
+        """Discounted rollout return of each action from the env's current state."""
+        start = time.perf_counter()
+        deadline = start + self.latency_budget
+
+        snap = self.env.snapshot(self._snap)
+        y, vel, tube_x, tube_h, passed = self.env.unpack_snapshots(
+            np.broadcast_to(snap, (2 * self.rollouts, len(snap))))
+
+        # Same random continuation for both halves of the batch
+        noise = np.tile(self.rng.random((self.depth, self.rollouts)) < self.flap_prob, 2)
+
+        returns = np.zeros(2 * self.rollouts)
+        alive = np.ones(2 * self.rollouts, dtype=bool)
+        actions = self._first
+        discount = 1.0
+        depth = 0
+
+        for d in range(self.depth):
+            y, vel, tube_x, tube_h, passed, reward, done = self.env.batch_step(
+                y, vel, tube_x, tube_h, passed, actions, self.rng)
+
+            returns += discount * reward * alive
+            alive &= ~done
+            discount *= self.gamma
+            depth = d + 1
+
+            if not alive.any():
+                break
+            if time.perf_counter() > deadline:
+                self.truncated += 1
+                break
+
+            if self.rollout_policy is None:
+                actions = noise[d]
+            else:
+                actions = self.rollout_policy.act_batch(self.env.batch_state(y, vel, tube_x, tube_h))
+
+        self.decisions += 1
+        self.depth_sum += depth
+        self.think_time += time.perf_counter() - start
+        return returns[:self.rollouts].mean(), returns[self.rollouts:].mean()
+
+    def act(self, state):
+        if self.env.done:
+            return 0
+        q0, q1 = self.action_values()
+        return int(q1 > q0)
+
+    @property
+    def decisions_per_sec(self):
+        return self.decisions / self.think_time if self.think_time else 0.0
+
+    def report(self):
+        if not self.decisions:
+            return "no decisions yet"
+        return (f"{self.decisions} decisions | {self.decisions_per_sec:,.0f} decisions/s | "
+                f"mean latency {self.think_time / self.decisions * 1000:.2f} ms "
+                f"(budget {self.latency_budget * 1000:.1f} ms) | "
+                f"mean depth {self.depth_sum / self.decisions:.1f}/{self.depth} | "
+                f"truncated {self.truncated}")
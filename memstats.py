@@ -0,0 +1,202 @@
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+import numpy as np
+
+
+def deep_sizeof(obj, seen=None):
+    """
+    Approximate deep size in bytes: containers, their contents and object
+    attributes, counting shared objects once. NumPy arrays count their
+    data buffer (views count the base array once).
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+
+        if isinstance(o, np.ndarray):
+            if o.base is not None and isinstance(o.base, np.ndarray):
+                total += sys.getsizeof(o)
+                stack.append(o.base)
+            else:
+                total += sys.getsizeof(o) if o.flags.owndata else sys.getsizeof(o) + o.nbytes
+            continue
+
+        total += sys.getsizeof(o)
+
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif isinstance(o, (str, bytes, int, float, bool, type(None))):
+            pass
+        else:
+            if hasattr(o, '__dict__'):
+                stack.append(o.__dict__)
+            for slot in getattr(type(o), '__slots__', ()):
+                if hasattr(o, slot):
+                    stack.append(getattr(o, slot))
+
+    return total
+
+
+def format_bytes(n):
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if abs(n) < 1024 or unit == 'GB':
+            return f"{n:.1f} {unit}" if unit != 'B' else f"{n} B"
+        n /= 1024
+
+
+def dataset_footprint(dataset):
+    """Deep size of a collect_dataset list and bytes per transition."""
+    total = deep_sizeof(dataset)
+    return {
+        'transitions': len(dataset),
+        'bytes': total,
+        'bytes_per_transition': total / max(len(dataset), 1),
+    }
+
+
+def model_footprint(model):
+    """Deep size of a LearnedModel per table, with bytes per (s, a) and per state."""
+    seen = set()
+    tables = {name: deep_sizeof(value, seen) for name, value in vars(model).items()}
+    pairs = getattr(model, 'P', None) or getattr(model, 'stats', None) or model.transitions
+    states = {s for s, _ in pairs}
+    total = sum(tables.values())
+    return {
+        'tables': tables,
+        'bytes': total,
+        'state_action_pairs': len(pairs),
+        'states': len(states),
+        'bytes_per_pair': total / max(len(pairs), 1),
+        'bytes_per_state': total / max(len(states), 1),
+    }
+
+
+def agent_footprint(agent):
+    """Deep size of an agent per attribute and bytes per (tabulated) state."""
+    seen = set()
+    attrs = {name: deep_sizeof(value, seen) for name, value in vars(agent).items()}
+    total = sum(attrs.values())
+
+    if hasattr(agent, 'returns_sum'):        # MCAgent: only visited states are stored
+        n_states = len(agent.returns_sum)
+    elif hasattr(getattr(agent, 'q_table', None), 'size') and not isinstance(agent.q_table, np.ndarray):
+        n_states = agent.q_table.size       # SparseQTable
+    else:
+        n_states = int(np.prod(agent.bins))
+    return {
+        'attributes': attrs,
+        'bytes': total,
+        'states': n_states,
+        'bytes_per_state': total / max(n_states, 1),
+    }
+
+
+def current_rss():
+    """Resident set size in bytes (Linux /proc, else peak RSS as a fallback)."""
+    try:
+        with open('/proc/self/statm') as f:
+            import os
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return peak_rss()
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes (0 if unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class MemoryTracker:
+    """
+    Records RSS and peak RSS at stage boundaries, and optionally tracemalloc
+    current/peak Python allocations plus the top allocation sites per stage.
+    checkpoint(name) closes the stage that started at the previous checkpoint
+    (or at construction):
+
+        mem = MemoryTracker(trace=True)
+        dataset = collect_dataset(...)
+        mem.checkpoint("collect")
+        mem.report()
+    """
+    def __init__(self, trace=False, top=3):
+        self.trace = trace
+        self.top = top
+        self.stages = []
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._begin()
+
+    def _begin(self):
+        self._rss = current_rss()
+        self._start = time.time()
+        if self.trace:
+            tracemalloc.reset_peak()
+            self._snapshot = self._take_snapshot()
+
+    @staticmethod
+    def _take_snapshot():
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+
+    def checkpoint(self, name):
+        rss = current_rss()
+        row = {
+            'stage': name,
+            'time': time.time() - self._start,
+            'rss': rss,
+            'rss_delta': rss - self._rss,
+            'peak_rss': peak_rss(),
+        }
+        if self.trace:
+            current, peak = tracemalloc.get_traced_memory()
+            row['py_current'] = current
+            row['py_peak'] = peak
+            diff = self._take_snapshot().compare_to(self._snapshot, 'lineno')
+            row['top'] = [(str(d.traceback), d.size_diff) for d in diff[:self.top]]
+        self.stages.append(row)
+        self._begin()
+        return row
+
+    @contextmanager
+    def stage(self, name):
+        self._begin()
+        try:
+            yield
+        finally:
+            self.checkpoint(name)
+
+    def report(self):
+        print("\n=== Memory by stage ===")
+        for row in self.stages:
+            line = (f"  {row['stage']:<28} rss {format_bytes(row['rss']):>10} "
+                    f"(Δ {format_bytes(row['rss_delta']):>10}) | peak rss {format_bytes(row['peak_rss']):>10}")
+            if self.trace:
+                line += f" | py peak {format_bytes(row['py_peak']):>10}"
+            print(line)
+            for where, size in row.get('top', []):
+                print(f"      {format_bytes(size):>10}  {where}")
+        return self.stages
+
+
+def print_footprint(name, fp):
+    extra = {k: v for k, v in fp.items() if k.startswith('bytes_per')}
+    per = ", ".join(f"{k.replace('bytes_', '')}: {v:,.0f} B" for k, v in extra.items())
+    print(f"  {name:<28} {format_bytes(fp['bytes']):>10} ({per})")
@@ -0,0 +1,166 @@
+import os
+import numpy as np
+
+
+# One fixed-size binary record per training episode (16 bytes)
+METRICS_DTYPE = np.dtype([
+    ('episode', '<u4'),
+    ('score', '<i4'),
+    ('steps', '<u4'),
+    ('eps', '<f4'),
+])
+
+
+class MetricsLog:
+    """
+    Append-only binary log of per-episode training metrics.
+    Records are buffered and written in blocks, so logging costs
+    next to nothing inside the training loop. The file can be read
+    while training is still running (only complete records are read).
+    """
+    def __init__(self, path, append=False, buffer_size=1024):
+        self.path = path
+        self._f = open(path, 'ab' if append else 'wb')
+        self._buf = np.zeros(buffer_size, dtype=METRICS_DTYPE)
+        self._n = 0
+
+    def append(self, episode, score, steps, eps):
+        self._buf[self._n] = (episode, score, steps, eps)
+        self._n += 1
+        if self._n == len(self._buf):
+            self.flush()
+
+    def flush(self):
+        if self._n:
+            self._buf[:self._n].tofile(self._f)
+            self._n = 0
+        self._f.flush()
+
+    def close(self):
+        if not self._f.closed:
+            self.flush()
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def count_records(path):
+    return os.path.getsize(path) // METRICS_DTYPE.itemsize
+
+
+def iter_metrics(path, start=0, chunk_size=1_000_000):
+    """Yield structured record arrays from `path`, starting at record `start`."""
+    end = count_records(path)
+    with open(path, 'rb') as f:
+        f.seek(start * METRICS_DTYPE.itemsize)
+        while start < end:
+            n = min(chunk_size, end - start)
+            yield np.fromfile(f, dtype=METRICS_DTYPE, count=n)
+            start += n
+
+
+class LearningCurve:
+    """
+    Incremental, bounded-memory learning curve.
+    Keeps a rolling mean over the last `window` episodes, and downsamples
+    the curve into at most `max_points` buckets. Each bucket stores its
+    episode count, the mean score, the rolling mean at its last episode and
+    per-bucket score quantiles. When the bucket count overflows, adjacent
+    buckets are merged and the bucket width doubles. Merged means are exact
+    (count-weighted); merged quantiles are the count-weighted average of the
+    halves' quantiles, an approximation of the quantiles of all their episodes
+    (exact only for buckets that were never merged).
+    """
+    def __init__(self, window=100, max_points=2000, quantiles=(0.1, 0.9)):
+        self.window = window
+        self.max_points = max_points
+        self.quantiles = tuple(quantiles)
+
+        self.n = 0          # episodes consumed
+        self.offset = 0     # records consumed from the log file
+        self.stride = 1     # episodes per bucket
+
+        self._tail = np.zeros(0)
+        self._pending = np.zeros(0)
+        self._pending_roll = np.zeros(0)
+
+        self.x = np.zeros(0)
+        self.count = np.zeros(0)
+        self.mean = np.zeros(0)
+        self.rolling = np.zeros(0)
+        self.q = np.zeros((0, len(self.quantiles)))
+
+    def update(self, scores):
+        scores = np.asarray(scores, dtype=np.float64)
+        if len(scores) == 0:
+            return self
+
+        # Rolling mean, continuing from the last window-1 scores
+        ext = np.concatenate([self._tail, scores])
+        cs = np.concatenate([[0.0], np.cumsum(ext)])
+        ends = np.arange(len(self._tail) + 1, len(ext) + 1)
+        starts = np.maximum(0, ends - self.window)
+        roll = (cs[ends] - cs[starts]) / (ends - starts)
+        self._tail = ext[-(self.window - 1):] if self.window > 1 else np.zeros(0)
+
+        self._add_to_buckets(scores, roll)
+        self.n += len(scores)
+        return self
+
+    def refresh(self, path, chunk_size=1_000_000):
+        """Consume any records appended to `path` since the last call."""
+        for chunk in iter_metrics(path, self.offset, chunk_size):
+            self.update(chunk['score'])
+            self.offset += len(chunk)
+        return self
+
+    def _add_to_buckets(self, scores, roll):
+        scores = np.concatenate([self._pending, scores])
+        roll = np.concatenate([self._pending_roll, roll])
+        first = self.n - len(self._pending)
+
+        n_full = len(scores) // self.stride
+        if n_full:
+            blocks = scores[:n_full * self.stride].reshape(n_full, self.stride)
+            last = np.arange(1, n_full + 1) * self.stride - 1
+            self.x = np.concatenate([self.x, first + last])
+            self.count = np.concatenate([self.count, np.full(n_full, float(self.stride))])
+            self.mean = np.concatenate([self.mean, blocks.mean(axis=1)])
+            self.rolling = np.concatenate([self.rolling, roll[last]])
+            self.q = np.concatenate([self.q, np.quantile(blocks, self.quantiles, axis=1).T])
+
+        self._pending = scores[n_full * self.stride:]
+        self._pending_roll = roll[n_full * self.stride:]
+
+        while len(self.x) > self.max_points:
+            self._merge()
+
+    def _merge(self):
+        """Halve the number of buckets by merging neighbours (an odd last bucket is kept as is)."""
+        m = len(self.x) // 2 * 2
+
+        def pairs(a, reduce):
+            return np.concatenate([reduce(a[:m].reshape((m // 2, 2) + a.shape[1:])), a[m:]])
+
+        # Weights of each half; a kept odd bucket may hold fewer episodes than a full one
+        w = self.count[:m].reshape(m // 2, 2)
+        w = w / w.sum(axis=1, keepdims=True)
+
+        self.x = pairs(self.x, lambda a: a[:, 1])
+        self.mean = pairs(self.mean, lambda a: (a * w).sum(axis=1))
+        self.rolling = pairs(self.rolling, lambda a: a[:, 1])
+        self.q = pairs(self.q, lambda a: (a * w[:, :, None]).sum(axis=1))
+        self.count = pairs(self.count, lambda a: a.sum(axis=1))
+        self.stride *= 2
+
+    def points(self):
+        """Return (x, mean, rolling, quantiles) arrays for plotting."""
+        return self.x, self.mean, self.rolling, self.q
+
+
+def load_curve(path, window=100, max_points=2000, quantiles=(0.1, 0.9)):
+    return LearningCurve(window, max_points, quantiles).refresh(path)
@@ -1,26 +1,52 @@
 import random
 import numpy as np
 from collections import defaultdict
-from utils.discretize import discretize_state
+from utils.discretize import discretize_state, flat_index
 
 
-class LearnedModel:
+class ModelTables:
+    """
+    The P/R tables the planners read, filled by a subclass's build():
+      P[(s, a)] = {'s_next': {s2: prob}, 'r': mean_reward, 'done': prob_done}
+      R[(s, a)] = mean_reward
+    Empty until build() runs.
+    """
+    def __init__(self):
+        self.P = {}
+        self.R = {}
+
+    def get_transitions(self, s, a):
+        if (s, a) in self.P:
+            return self.P[(s, a)]['s_next']
+        return {}
+
+    def get_reward(self, s, a):
+        return self.R.get((s, a), 0.0)
+
+    def get_done_prob(self, s, a):
+        if (s, a) in self.P:
+            return self.P[(s, a)]['done']
+        return 0.0
+
+
+class LearnedModel(ModelTables):
     """
     Learned tabular MDP model:
       transitions[(s, a)] -> counts of s'
-      rewards[(s, a)] -> list of rewards
-      dones[(s, a)]   -> list of done flags
+      reward_sum[(s, a)]  -> sum of rewards
+      done_sum[(s, a)]    -> number of terminal transitions
     """
     def __init__(self):
+        super().__init__()
         self.transitions = defaultdict(lambda: defaultdict(int))
-        self.rewards = defaultdict(list)
-        self.dones = defaultdict(list)
+        self.reward_sum = defaultdict(float)
+        self.done_sum = defaultdict(float)
 
     def add(self, s, a, s2, r, done=False):
         key = (s, a)
         self.transitions[key][s2] += 1
-        self.rewards[key].append(r)
-        self.dones[key].append(1.0 if done else 0.0)
+        self.reward_sum[key] += r
+        self.done_sum[key] += 1.0 if done else 0.0
 
     def build(self):
         """
@@ -35,33 +61,259 @@ class LearnedModel:
             total = sum(counter.values())
             self.P[key] = {
                 's_next': {s2: cnt / total for s2, cnt in counter.items()},
-                'r': float(np.mean(self.rewards[key])),
-                'done': float(np.mean(self.dones[key]))
+                'r': float(self.reward_sum[key] / total),
+                'done': float(self.done_sum[key] / total)
             }
             self.R[key] = self.P[key]['r']
 
-    def get_transitions(self, s, a):
-        if (s, a) in self.P:
-            return self.P[(s, a)]['s_next']
-        return {}
+    @classmethod
+    def from_counts(cls, counts, reward_sum, done_sum):
+        """
+        Built model from aggregated statistics instead of individual add() calls:
+          counts[(s, a)] -> {s2: count}, reward_sum[(s, a)], done_sum[(s, a)]
+        The sums are kept, so build() and coarsen_model() see the same data.
+        """
+        model = cls()
+        for key, counter in counts.items():
+            model.transitions[key].update(counter)
+            model.reward_sum[key] = float(reward_sum[key])
+            model.done_sum[key] = float(done_sum[key])
+        model.build()
+        return model
 
-    def get_reward(self, s, a):
-        return self.R.get((s, a), 0.0)
 
-    def get_done_prob(self, s, a):
-        if (s, a) in self.P:
-            return self.P[(s, a)]['done']
-        return 0.0
+class TransitionStats:
+    """
+    Online sufficient statistics of a transition stream, keyed by flat index:
+      counts[(s*2 + a) * n_states + s2] -> number of (s, a, s2) transitions
+      reward_sum[s*2 + a], done_count[s*2 + a]
+    Memory grows with unique transitions only; no dataset is materialized.
+    Reward sums are kept in fixed point (integers), so merging statistics
+    from several collectors is exact in any order.
+    """
+    REWARD_SCALE = 1 << 24
 
+    def __init__(self, bins=(8, 8, 8)):
+        self.bins = tuple(bins)
+        self.n_states = int(np.prod(self.bins))
+        self.counts = {}
+        self.reward_sum = {}
+        self.done_count = {}
+        self.n_transitions = 0
 
-def value_iteration(states, model, gamma=0.98, iters=300, tol=1e-4):
+    def add(self, s, a, s2, r, done=False):
+        """Add one transition of discretized states (tuples)."""
+        sa = flat_index(s, self.bins) * 2 + a
+        key = sa * self.n_states + flat_index(s2, self.bins)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.reward_sum[sa] = self.reward_sum.get(sa, 0) + round(r * self.REWARD_SCALE)
+        self.done_count[sa] = self.done_count.get(sa, 0) + (1 if done else 0)
+        self.n_transitions += 1
+
+    def add_arrays(self, s, a, s2, r, done):
+        """Add a batch of transitions given as flat state indices (arrays)."""
+        sa = np.asarray(s, dtype=np.int64) * 2 + np.asarray(a, dtype=np.int64)
+        keys, key_counts = np.unique(sa * self.n_states + np.asarray(s2, dtype=np.int64), return_counts=True)
+        for key, c in zip(keys.tolist(), key_counts.tolist()):
+            self.counts[key] = self.counts.get(key, 0) + c
+
+        sa_keys, inverse = np.unique(sa, return_inverse=True)
+        r_sums = np.zeros(len(sa_keys), dtype=np.int64)
+        np.add.at(r_sums, inverse, np.rint(np.asarray(r) * self.REWARD_SCALE).astype(np.int64))
+        d_sums = np.bincount(inverse, weights=done, minlength=len(sa_keys))
+        for key, rs, ds in zip(sa_keys.tolist(), r_sums.tolist(), d_sums.tolist()):
+            self.reward_sum[key] = self.reward_sum.get(key, 0) + rs
+            self.done_count[key] = self.done_count.get(key, 0) + int(round(ds))
+        self.n_transitions += len(sa)
+
+    def merge(self, other):
+        """Add another collector's statistics into this one (associative, order-independent)."""
+        if other.bins != self.bins:
+            raise ValueError(f"cannot merge stats with bins {other.bins} into {self.bins}")
+        for table, other_table in ((self.counts, other.counts),
+                                   (self.reward_sum, other.reward_sum),
+                                   (self.done_count, other.done_count)):
+            for key, value in other_table.items():
+                table[key] = table.get(key, 0) + value
+        self.n_transitions += other.n_transitions
+        return self
+
+    def _unflatten(self, flat):
+        return [tuple(row) for row in np.stack(np.unravel_index(flat, self.bins), axis=1).tolist()]
+
+    def to_model(self):
+        """
+        Build a LearnedModel. Returns model, states (like build_model_from_dataset).
+        Keys are visited in sorted order, so equal statistics give identical models.
+        """
+        keys = np.sort(np.fromiter(self.counts.keys(), dtype=np.int64, count=len(self.counts)))
+        sa, s2 = np.divmod(keys, self.n_states)
+        s, a = np.divmod(sa, 2)
+
+        trans, r_sums, d_sums = {}, {}, {}
+        for si, ai, s2i, k, sai in zip(self._unflatten(s), a.tolist(), self._unflatten(s2),
+                                      keys.tolist(), sa.tolist()):
+            key = (si, ai)
+            trans.setdefault(key, {})[s2i] = self.counts[k]
+            r_sums[key] = self.reward_sum[sai] / self.REWARD_SCALE
+            d_sums[key] = self.done_count[sai]
+
+        states = set()
+        for (si, _), counter in trans.items():
+            states.add(si)
+            states.update(counter)
+
+        return LearnedModel.from_counts(trans, r_sums, d_sums), sorted(states)
+
+    def save(self, path):
+        """Write the deduplicated aggregate (a few arrays) to an .npz file."""
+        sa_keys = np.fromiter(self.reward_sum.keys(), dtype=np.int64, count=len(self.reward_sum))
+        np.savez(
+            path,
+            bins=np.array(self.bins),
+            keys=np.fromiter(self.counts.keys(), dtype=np.int64, count=len(self.counts)),
+            counts=np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts)),
+            sa_keys=sa_keys,
+            reward_sum=np.array([self.reward_sum[k] for k in sa_keys.tolist()], dtype=np.int64),
+            done_count=np.array([self.done_count[k] for k in sa_keys.tolist()], dtype=np.int64),
+            n_transitions=self.n_transitions,
+        )
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        stats = cls(tuple(data['bins'].tolist()))
+        stats.counts = dict(zip(data['keys'].tolist(), data['counts'].tolist()))
+        stats.reward_sum = dict(zip(data['sa_keys'].tolist(), data['reward_sum'].tolist()))
+        stats.done_count = dict(zip(data['sa_keys'].tolist(), data['done_count'].tolist()))
+        stats.n_transitions = int(data['n_transitions'])
+        return stats
+
+
+class BoundedLearnedModel(ModelTables):
+    """
+    Capacity-limited alternative to LearnedModel for long collection campaigns:
+      - running reward / done sums per (s, a) instead of raw lists
+      - at most top_k successors per (s, a); pruned counts are kept as
+        residual mass and the kept probabilities are renormalized
+      - when the estimated size exceeds memory_budget bytes, the least
+        visited (s, a) pairs are evicted
+    stats[(s, a)] = [n, reward_sum, reward_sq_sum, done_sum, residual, {s2: count}]
+    It offers add()/build() and the P/R tables, which is all the planners and
+    build_model_from_dataset need, but not LearnedModel's raw transitions and
+    sums, so coarsen_model() does not apply to it.
+    """
+    # Rough CPython costs used to enforce the budget without walking every dict
+    PAIR_BYTES = 450
+    SUCCESSOR_BYTES = 130
+
+    def __init__(self, top_k=8, memory_budget=None, evict_fraction=0.1, check_every=1024):
+        super().__init__()
+        self.top_k = top_k
+        self.memory_budget = memory_budget
+        self.evict_fraction = evict_fraction
+        self.check_every = check_every
+
+        self.stats = {}
+        self.n_successors = 0
+        self.evicted = 0
+        self._adds = 0
+
+    def add(self, s, a, s2, r, done=False):
+        key = (s, a)
+        st = self.stats.get(key)
+        if st is None:
+            st = self.stats[key] = [0, 0.0, 0.0, 0.0, 0, {}]
+
+        st[0] += 1
+        st[1] += r
+        st[2] += r * r
+        st[3] += 1.0 if done else 0.0
+
+        counts = st[5]
+        if s2 in counts:
+            counts[s2] += 1
+        else:
+            if len(counts) >= 2 * self.top_k:  # prune lazily to amortize the sort
+                self._prune(st)
+                counts = st[5]
+            counts[s2] = 1
+            self.n_successors += 1
+
+        self._adds += 1
+        if self.memory_budget and self._adds % self.check_every == 0:
+            self.enforce_budget()
+
+    def _prune(self, st):
+        counts = st[5]
+        kept = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:self.top_k]
+        st[4] += sum(counts.values()) - sum(c for _, c in kept)
+        self.n_successors -= len(counts) - len(kept)
+        st[5] = dict(kept)
+
+    def estimated_bytes(self):
+        return len(self.stats) * self.PAIR_BYTES + self.n_successors * self.SUCCESSOR_BYTES
+
+    def enforce_budget(self):
+        """Evict the least visited (s, a) pairs until under memory_budget."""
+        while self.stats and self.estimated_bytes() > self.memory_budget:
+            n_evict = max(1, int(len(self.stats) * self.evict_fraction))
+            for key, st in sorted(self.stats.items(), key=lambda kv: kv[1][0])[:n_evict]:
+                self.n_successors -= len(st[5])
+                del self.stats[key]
+            self.evicted += n_evict
+
+    def bytes_used(self):
+        """Measured size of the statistics (containers, keys and values)."""
+        import sys
+        total = sys.getsizeof(self.stats)
+        for key, st in self.stats.items():
+            total += sys.getsizeof(key) + sys.getsizeof(st)
+            total += sum(sys.getsizeof(v) for v in st[:5])
+            total += sys.getsizeof(st[5]) + sum(sys.getsizeof(c) for c in st[5].values())
+        return total
+
+    def build(self):
+        """Same P/R tables as LearnedModel.build, plus P[(s,a)]['residual'] mass."""
+        for st in self.stats.values():
+            if len(st[5]) > self.top_k:
+                self._prune(st)
+
+        self.P = {}
+        self.R = {}
+
+        for key, (n, r_sum, _, d_sum, residual, counts) in self.stats.items():
+            kept = sum(counts.values())
+            self.P[key] = {
+                's_next': {s2: cnt / kept for s2, cnt in counts.items()},
+                'r': r_sum / n,
+                'done': d_sum / n,
+                'residual': residual / (kept + residual)
+            }
+            self.R[key] = self.P[key]['r']
+
+    def memory_report(self):
+        return {
+            'pairs': len(self.stats),
+            'successors': self.n_successors,
+            'evicted_pairs': self.evicted,
+            'bytes': self.bytes_used(),
+        }
+
+
+def value_iteration(states, model, gamma=0.98, iters=300, tol=1e-4, V_init=None, info=None):
     """
     Standard value iteration on learned model.
+    V_init: optional warm start (dict s -> value), missing states start at 0.
+    info:   optional dict, filled with the number of sweeps and final delta.
     """
     V = {s: 0.0 for s in states}
+    if V_init is not None:
+        V.update((s, V_init[s]) for s in states if s in V_init)
 
     print(f"   [VI] Running with {len(states)} states...")
 
+    sweeps, delta = 0, 0.0
     for it in range(iters):
         delta = 0.0
 
@@ -89,6 +341,7 @@ def value_iteration(states, model, gamma=0.98, iters=300, tol=1e-4):
 
             delta = max(delta, abs(V[s] - v_old))
 
+        sweeps += 1
         if it % 50 == 0:
             print(f"      Iter {it}: delta={delta:.6f}, V_mean={np.mean(list(V.values())):.3f}")
 
@@ -96,6 +349,10 @@ def value_iteration(states, model, gamma=0.98, iters=300, tol=1e-4):
             print(f"   [VI] Converged at iter {it}")
             break
 
+    if info is not None:
+        info['iters'] = sweeps
+        info['delta'] = delta
+
     # Extract greedy policy
     policy = {}
     for s in states:
@@ -121,6 +378,109 @@ def value_iteration(states, model, gamma=0.98, iters=300, tol=1e-4):
     return V, policy
 
 
+def coarsen_state(s, fine_bins, coarse_bins):
+    """
+    Map a discretized state to a coarser grid. Exact (same cell as
+    discretize_state at coarse_bins) when each fine bin count is a
+    multiple of the coarse one.
+    """
+    return tuple(i * c // f for i, c, f in zip(s, coarse_bins, fine_bins))
+
+
+def multigrid_levels(bins, min_bins=4):
+    """Resolutions from coarsest to `bins`, halving while every dim stays >= min_bins."""
+    levels = []
+    b = tuple(bins)
+    while min(b) >= min_bins:
+        levels.insert(0, b)
+        if any(x % 2 for x in b):
+            break
+        b = tuple(x // 2 for x in b)
+    return levels
+
+
+def coarsen_model(model, fine_bins, coarse_bins):
+    """Aggregate a (not yet built) LearnedModel onto a coarser grid."""
+    coarse = LearnedModel()
+    for (s, a), counter in model.transitions.items():
+        key = (coarsen_state(s, fine_bins, coarse_bins), a)
+        for s2, cnt in counter.items():
+            coarse.transitions[key][coarsen_state(s2, fine_bins, coarse_bins)] += cnt
+        coarse.reward_sum[key] += model.reward_sum[(s, a)]
+        coarse.done_sum[key] += model.done_sum[(s, a)]
+    coarse.build()
+    return coarse
+
+
+def multigrid_value_iteration(dataset, bins=(8, 8, 8), levels=None, gamma=0.98, iters=300,
+                              tol=1e-4, coarse_tol=None):
+    """
+    Coarse-to-fine value iteration.
+    The dataset (discretized at `bins`) is aggregated into a LearnedModel at
+    each level; each level is solved with VI warm-started from the previous
+    level's V projected onto the finer grid. Coarse levels only provide a
+    warm start, so they stop at the looser `coarse_tol` (default 100 * tol).
+    `levels` runs coarsest to finest; `bins` is appended if it is not the last
+    level, so the result is always solved at full resolution.
+    Returns V, policy at `bins` and a per-level report.
+    """
+    import time
+
+    levels = [tuple(b) for b in levels] if levels else multigrid_levels(bins)
+    if levels[-1] != tuple(bins):
+        levels.append(tuple(bins))
+    coarse_tol = tol * 100 if coarse_tol is None else coarse_tol
+
+    # Aggregate the data once at full resolution, coarser models merge its counts
+    fine = LearnedModel()
+    for item in dataset:
+        if len(item) == 5:
+            s, a, s2, r, done = item
+        else:
+            s, a, s2, r = item
+            done = False
+        fine.add(s, a, s2, r, done)
+
+    report = []
+    V_prev, prev_bins = None, None
+
+    for level_bins in levels:
+        start = time.time()
+
+        model = coarsen_model(fine, bins, level_bins)
+        states = set()
+        for (s, a), trans in model.P.items():
+            states.add(s)
+            states.update(trans['s_next'])
+        states = list(states)
+
+        V_init = None
+        if V_prev is not None:
+            V_init = {s: V_prev.get(coarsen_state(s, level_bins, prev_bins), 0.0) for s in states}
+
+        info = {}
+        level_tol = tol if level_bins == levels[-1] else coarse_tol
+        print(f"   [MG] Level {level_bins}")
+        V_prev, policy = value_iteration(states, model, gamma, iters, level_tol, V_init=V_init, info=info)
+        prev_bins = level_bins
+
+        report.append({
+            'bins': level_bins,
+            'states': len(states),
+            'iters': info['iters'],
+            'time': time.time() - start,
+        })
+
+    print("   [MG] Level report:")
+    for row in report:
+        print(f"      {str(row['bins']):<14} states={row['states']:<6} "
+              f"iters={row['iters']:<4} time={row['time']:.2f}s")
+    print(f"   [MG] Total sweeps: {sum(r['iters'] for r in report)}, "
+          f"total time: {sum(r['time'] for r in report):.2f}s")
+
+    return V_prev, policy, report
+
+
 def policy_iteration(states, model, gamma=0.98, eval_iters=60, max_iters=100):
     """
     Standard policy iteration on learned model.
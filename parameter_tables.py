@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
 import os
+from utils.figure_build import FigureSpec, build_figures
 
 plt.rcParams['font.family'] = 'DejaVu Sans'
 plt.rcParams['font.size'] = 11
@@ -167,10 +168,12 @@ def create_recommendations_table_dark():
 def main():
     os.makedirs('results', exist_ok=True)
     print("Generating all dark tables...")
-    create_gamma_table_dark()
-    create_epsilon_table_dark()
-    create_alpha_table_dark()
-    create_recommendations_table_dark()
+    build_figures([
+        FigureSpec(create_gamma_table_dark, 'results/table_gamma_dark.png'),
+        FigureSpec(create_epsilon_table_dark, 'results/table_epsilon_dark.png'),
+        FigureSpec(create_alpha_table_dark, 'results/table_alpha_dark.png'),
+        FigureSpec(create_recommendations_table_dark, 'results/table_recommendations_dark.png'),
+    ])
     print(" All dark tables saved in results/")
 
 if __name__ == "__main__":
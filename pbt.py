@@ -0,0 +1,182 @@
+"""
+Population-based training (PBT) for the tabular agents.
+
+A population of agents with different alpha / gamma / eps_decay trains in
+parallel worker processes. After every interval each member is scored
+greedily on the same seeded tube layouts. The bottom members then copy the
+agent (Q-table, eps, hyperparameters) of a random top member (exploit) and
+perturb its hyperparameters (explore). Each member carries the
+hyperparameter schedule of its lineage, so the winner's schedule is known.
+
+    python pbt.py --algo q --population 8 --interval 1000 --rounds 20
+"""
+import os
+import copy
+import json
+import pickle
+import random
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from agents.q_learning import QAgent
+from agents.sarsa import SarsaAgent
+from agents.mc import MCAgent
+from utils.dataset import evaluate_policy
+from train import run_training_episode
+
+ALGOS = {
+    'q': (QAgent, "Q-Learning"),
+    'sarsa': (SarsaAgent, "SARSA"),
+    'mc': (MCAgent, "Monte Carlo"),
+}
+HYPERPARAMS = ('alpha', 'gamma', 'eps_decay')
+
+_env = None
+_eval_env = None
+
+
+def _init_worker(frame_skip=1):
+    global _env, _eval_env
+    from flappybird_env import FlappyBirdEnv
+    _env = FlappyBirdEnv(render_mode=False, frame_skip=frame_skip)
+    _eval_env = FlappyBirdEnv(render_mode=False, frame_skip=frame_skip)
+
+
+def sample_hyperparams(rng):
+    """Log-uniform alpha, and log-uniform horizons 1 - gamma and 1 - eps_decay."""
+    return {
+        'alpha': float(np.exp(rng.uniform(np.log(0.05), np.log(0.5)))),
+        'gamma': float(1 - np.exp(rng.uniform(np.log(0.005), np.log(0.1)))),
+        'eps_decay': float(1 - np.exp(rng.uniform(np.log(1e-5), np.log(1e-3)))),
+    }
+
+
+def perturb_hyperparams(params, rng, factors=(0.8, 1.25)):
+    """Scale alpha, 1 - gamma and 1 - eps_decay by a random factor (clipped to sane ranges)."""
+    return {
+        'alpha': float(np.clip(params['alpha'] * rng.choice(factors), 0.005, 1.0)),
+        'gamma': float(np.clip(1 - (1 - params['gamma']) * rng.choice(factors), 0.8, 0.999)),
+        'eps_decay': float(np.clip(1 - (1 - params['eps_decay']) * rng.choice(factors), 0.99, 0.999999)),
+    }
+
+
+def apply_hyperparams(agent, params):
+    for name in HYPERPARAMS:
+        if hasattr(agent, name):  # MCAgent has no alpha
+            setattr(agent, name, params[name])
+
+
+def _train_interval(agent, episodes, eval_episodes, eval_seed, seed):
+    """Worker: train `agent` for `episodes` episodes, then score a greedy copy."""
+    random.seed(seed)
+    _env.rng.seed(seed)
+
+    steps = 0
+    for _ in range(episodes):
+        _, ep_steps = run_training_episode(_env, agent)
+        agent.decay()
+        steps += ep_steps
+
+    greedy = copy.deepcopy(agent)
+    greedy.eps = 0.0
+    mean, _, _ = evaluate_policy(_eval_env, greedy, eval_episodes, bins=agent.bins, seed=eval_seed)
+    return agent, float(mean), steps
+
+
+def run_pbt(algo='q', population=8, interval=1000, rounds=20, truncation=0.25,
+            eval_episodes=20, workers=None, seed=0, out_dir='results', frame_skip=1):
+    """
+    Returns the best member: dict with 'agent', 'score', 'params' and
+    'lineage' (one record per round: member, hyperparameters, score, and the
+    member it was copied from when it exploited before that round).
+    """
+    agent_class, name = ALGOS[algo]
+    rng = np.random.default_rng(seed)
+
+    members = []
+    for i in range(population):
+        params = sample_hyperparams(rng)
+        agent = agent_class()
+        apply_hyperparams(agent, params)
+        members.append({'id': i, 'agent': agent, 'params': params, 'score': None, 'lineage': []})
+
+    n_swap = max(1, int(population * truncation))
+    print(f"\n=== PBT {name}: {population} members x {rounds} rounds of {interval} episodes ===")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(frame_skip,)) as pool:
+        for rnd in range(1, rounds + 1):
+            # All members are scored on the same layouts in a round (common random numbers)
+            eval_seed = seed * 1_000_000 + rnd * 1000
+            futures = [pool.submit(_train_interval, m['agent'], interval, eval_episodes, eval_seed,
+                                   seed * 1_000_000 + rnd * population + m['id'])
+                       for m in members]
+            for m, future in zip(members, futures):
+                m['agent'], m['score'], m['steps'] = future.result()
+                params = {k: v for k, v in m['params'].items() if hasattr(m['agent'], k)}
+                m['lineage'].append({'round': rnd, 'episode': rnd * interval, 'member': m['id'],
+                                     'copied_from': m.pop('parent', None), **params,
+                                     'eps': m['agent'].eps, 'score': m['score']})
+
+            # Ties (common early on, when every greedy score is 0) go to longer survival in training
+            ranked = sorted(members, key=lambda m: (m['score'], m['steps']), reverse=True)
+            best = ranked[0]
+            print(f"  Round {rnd:3d} | best {best['score']:6.2f} (member {best['id']}) "
+                  f"| mean {np.mean([m['score'] for m in members]):6.2f} "
+                  f"| alpha {best['params']['alpha']:.3f} gamma {best['params']['gamma']:.4f} "
+                  f"eps_decay {best['params']['eps_decay']:.6f}")
+
+            if rnd == rounds:
+                break
+
+            # Exploit + explore: bottom members restart from a perturbed copy of a top member
+            for loser in ranked[-n_swap:]:
+                parent = ranked[rng.integers(n_swap)]
+                loser['agent'] = copy.deepcopy(parent['agent'])
+                loser['params'] = perturb_hyperparams(parent['params'], rng)
+                apply_hyperparams(loser['agent'], loser['params'])
+                loser['lineage'] = copy.deepcopy(parent['lineage'])
+                loser['parent'] = parent['id']
+
+    best = ranked[0]
+    best['agent'].eps = 0.0
+
+    os.makedirs(out_dir, exist_ok=True)
+    slug = name.lower().replace(" ", "_").replace("-", "_")
+    with open(os.path.join(out_dir, f"pbt_lineage_{slug}.json"), 'w') as f:
+        json.dump({'algo': name, 'frame_skip': frame_skip, 'score': best['score'], 'params': best['params'],
+                   'lineage': best['lineage']}, f, indent=1)
+    with open(os.path.join(out_dir, f"agent_pbt_{algo}.pkl"), 'wb') as f:
+        pickle.dump(best['agent'], f)
+
+    print(f"\nBest member {best['id']}: greedy avg {best['score']:.2f}")
+    print("Winning lineage schedule:")
+    for rec in best['lineage']:
+        alpha = f"{rec['alpha']:.3f}" if 'alpha' in rec else "-"
+        origin = f" (from {rec['copied_from']})" if rec['copied_from'] is not None else ""
+        print(f"  round {rec['round']:3d} | member {rec['member']}{origin} | alpha {alpha} | gamma {rec['gamma']:.4f} "
+              f"| eps_decay {rec['eps_decay']:.6f} | eps {rec['eps']:.3f} | score {rec['score']:.2f}")
+    print(f"✓ Saved {out_dir}/pbt_lineage_{slug}.json and {out_dir}/agent_pbt_{algo}.pkl")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Population-based training of tabular agents")
+    parser.add_argument('--algo', choices=sorted(ALGOS), default='q')
+    parser.add_argument('--population', type=int, default=8)
+    parser.add_argument('--interval', type=int, default=1000, help="episodes between exploit/explore steps")
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--truncation', type=float, default=0.25, help="fraction replaced each round")
+    parser.add_argument('--eval-episodes', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--frame-skip', type=int, default=1, help="physics ticks per env step (action repeat)")
+    args = parser.parse_args()
+
+    run_pbt(args.algo, args.population, args.interval, args.rounds, args.truncation,
+            args.eval_episodes, args.workers, args.seed, frame_skip=args.frame_skip)
+
+
+if __name__ == "__main__":
+    main()
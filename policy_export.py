@@ -0,0 +1,76 @@
+import os
+import json
+import numpy as np
+from utils.discretize import STATE_LOW, STATE_HIGH, discretize_batch, flat_index
+
+
+def export_policy(path, policy, bins=None):
+    """
+    Export a trained policy to a directory of memory-mappable arrays:
+      meta.json   -> discretizer parameters (bins, low, high)
+      actions.npy -> uint8 greedy action per flat state index
+      q.npy       -> float32 Q-values (n_states, 2), only for Q-based agents
+    `policy` can be a dict (s_disc -> action), a PolicyAgent, or an agent
+    with a `q_table` (QAgent, SarsaAgent, SparseQAgent) or `Q` (MCAgent).
+    """
+    bins = tuple(bins or getattr(policy, 'bins', (8, 8, 8)))
+    n_states = int(np.prod(bins))
+    os.makedirs(path, exist_ok=True)
+
+    q = getattr(policy, 'q_table', getattr(policy, 'Q', None))
+    if q is not None:
+        if hasattr(q, 'to_dense'):  # SparseQTable
+            q = q.to_dense(n_states)
+        q = np.asarray(q, dtype=np.float32).reshape(n_states, 2)
+        actions = np.argmax(q, axis=1).astype(np.uint8)
+        np.save(os.path.join(path, 'q.npy'), q)
+    else:
+        table = policy if isinstance(policy, dict) else policy.policy
+        actions = np.zeros(n_states, dtype=np.uint8)  # unseen states -> action 0, as PolicyAgent
+        for s_disc, a in table.items():
+            actions[flat_index(s_disc, bins)] = a
+
+    np.save(os.path.join(path, 'actions.npy'), actions)
+
+    meta = {
+        'bins': list(bins),
+        'low': STATE_LOW.tolist(),
+        'high': STATE_HIGH.tolist(),
+        'has_q': q is not None,
+    }
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    return path
+
+
+class ExportedPolicy:
+    """
+    Greedy policy loaded from an export_policy directory.
+    Arrays are memory-mapped by default, so many processes can share
+    one copy. Usable as an agent (.act) or for whole batches (.act_batch).
+    """
+    def __init__(self, path, mmap=True):
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+
+        if self.meta['low'] != STATE_LOW.tolist() or self.meta['high'] != STATE_HIGH.tolist():
+            raise ValueError(f"{path} was exported with different discretizer bounds")
+
+        mode = 'r' if mmap else None
+        self.bins = tuple(self.meta['bins'])
+        self.actions = np.load(os.path.join(path, 'actions.npy'), mmap_mode=mode)
+        self.q = np.load(os.path.join(path, 'q.npy'), mmap_mode=mode) if self.meta['has_q'] else None
+        self.eps = 0.0
+
+    def act_batch(self, states):
+        """(N, 3) raw states -> (N,) uint8 actions."""
+        return self.actions[flat_index(discretize_batch(states, self.bins), self.bins)]
+
+    def q_batch(self, states):
+        if self.q is None:
+            raise ValueError("policy was exported without Q-values")
+        return self.q[flat_index(discretize_batch(states, self.bins), self.bins)]
+
+    def act(self, state):
+        return int(self.act_batch(state)[0])
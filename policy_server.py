@@ -0,0 +1,165 @@
+"""
+Local batched inference server for exported policies.
+
+Each connection is served by its own thread (the memory-mapped policy is
+read-only), so one persistent client never blocks the others.
+
+Protocol (little-endian, one persistent stream connection):
+  request  : uint32 n, then n * 3 float32 raw states [velocity, horizontal_dist, vertical_dist]
+  response : n uint8 actions
+  n == STATS_REQUEST returns uint32 length + JSON latency stats instead.
+"""
+import os
+import json
+import time
+import socket
+import struct
+import argparse
+import threading
+import socketserver
+import numpy as np
+
+from utils.policy_export import ExportedPolicy
+
+STATS_REQUEST = 0xFFFFFFFF
+HEADER = struct.Struct('<I')
+
+
+def _recv_exact(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        k = sock.recv_into(view[got:], n - got)
+        if k == 0:
+            raise ConnectionError("connection closed")
+        got += k
+    return buf
+
+
+class LatencyStats:
+    """Ring buffer of the last `size` request latencies and batch sizes (thread-safe)."""
+    def __init__(self, size=100_000):
+        self.lock = threading.Lock()
+        self.latency = np.zeros(size)
+        self.batch = np.zeros(size, dtype=np.int64)
+        self.n = 0
+        self.states = 0
+
+    def add(self, seconds, batch_size):
+        with self.lock:
+            i = self.n % len(self.latency)
+            self.latency[i] = seconds
+            self.batch[i] = batch_size
+            self.n += 1
+            self.states += batch_size
+
+    def summary(self):
+        with self.lock:
+            n, states = self.n, self.states
+            k = min(n, len(self.latency))
+            lat = self.latency[:k] * 1e6
+            batch = self.batch[:k].copy()
+        if k == 0:
+            return {'requests': 0, 'states': 0}
+        per_state = lat / np.maximum(batch, 1)
+        p = [50, 90, 99]
+        return {
+            'requests': n,
+            'states': states,
+            'request_us': dict(zip(['p50', 'p90', 'p99'], np.percentile(lat, p).round(2).tolist())),
+            'per_state_us': dict(zip(['p50', 'p90', 'p99'], np.percentile(per_state, p).round(3).tolist())),
+        }
+
+
+class PolicyRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        policy = self.server.policy
+        stats = self.server.stats
+        sock = self.request
+
+        while True:
+            try:
+                (n,) = HEADER.unpack(_recv_exact(sock, HEADER.size))
+            except ConnectionError:
+                return
+
+            if n == STATS_REQUEST:
+                payload = json.dumps(stats.summary()).encode()
+                sock.sendall(HEADER.pack(len(payload)) + payload)
+                continue
+
+            raw = _recv_exact(sock, n * 12)
+            start = time.perf_counter()
+            states = np.frombuffer(raw, dtype='<f4').reshape(n, 3)
+            actions = np.ascontiguousarray(policy.act_batch(states), dtype=np.uint8)
+            stats.add(time.perf_counter() - start, n)
+            sock.sendall(actions.tobytes())
+
+
+class _UnixPolicyServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPPolicyServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def make_server(policy_path, address):
+    """`address` is a filesystem path (Unix socket) or a (host, port) tuple."""
+    if isinstance(address, str):
+        if os.path.exists(address):
+            os.unlink(address)
+        server = _UnixPolicyServer(address, PolicyRequestHandler)
+    else:
+        server = _TCPPolicyServer(address, PolicyRequestHandler)
+        server.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    server.policy = ExportedPolicy(policy_path)
+    server.stats = LatencyStats()
+    return server
+
+
+class PolicyClient:
+    def __init__(self, address):
+        if isinstance(address, str):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.connect(address)
+
+    def act_batch(self, states):
+        states = np.ascontiguousarray(states, dtype='<f4').reshape(-1, 3)
+        self.sock.sendall(HEADER.pack(len(states)) + states.tobytes())
+        return np.frombuffer(_recv_exact(self.sock, len(states)), dtype=np.uint8)
+
+    def stats(self):
+        self.sock.sendall(HEADER.pack(STATS_REQUEST))
+        (length,) = HEADER.unpack(_recv_exact(self.sock, HEADER.size))
+        return json.loads(_recv_exact(self.sock, length))
+
+    def close(self):
+        self.sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve an exported policy over a local socket")
+    parser.add_argument('policy', help="directory written by export_policy")
+    parser.add_argument('--socket', default='/tmp/flappy_policy.sock', help="Unix socket path")
+    parser.add_argument('--port', type=int, default=None, help="serve on localhost TCP instead")
+    args = parser.parse_args()
+
+    address = ('127.0.0.1', args.port) if args.port else args.socket
+    server = make_server(args.policy, address)
+    print(f"Serving {args.policy} on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
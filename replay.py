@@ -0,0 +1,100 @@
+import os
+import pickle
+import numpy as np
+
+from flappybird_env import FlappyBirdEnv
+from agents.model_base import PolicyAgent
+
+
+def iter_episode_frames(env, agent=None, actions=None, seed=None, max_steps=3000, stride=1):
+    """
+    Play one episode on an offscreen env and yield every `stride`-th frame.
+    Either `agent` (anything with .act(state)) or a saved `actions` sequence
+    must be given; replaying saved actions needs the seed the episode used.
+    The final frame is always yielded so the death/score is visible.
+    """
+    if env.render_mode != "rgb_array":
+        raise ValueError("env must be created with render_mode='rgb_array'")
+
+    s = env.reset(seed=seed)
+    done = False
+    steps = 0
+
+    while not done and steps < max_steps:
+        if steps % stride == 0:
+            yield env.render()
+
+        if actions is not None:
+            if steps >= len(actions):
+                break
+            a = actions[steps]
+        else:
+            a = agent.act(s)
+
+        s, r, done, info = env.step(a)
+        steps += 1
+
+    yield env.render()
+
+
+def record_episode(env, agent=None, actions=None, seed=None, max_steps=3000, stride=1):
+    """Return the frames of one episode as an (N, H, W, 3) uint8 array."""
+    frames = list(iter_episode_frames(env, agent, actions, seed, max_steps, stride))
+    return np.stack(frames)
+
+
+def save_episode(path, env, agent=None, actions=None, seed=None, max_steps=3000, stride=1, fps=30):
+    """
+    Export an episode to `path`:
+      .npy       -> raw frame array
+      .gif/.mp4  -> animated file via imageio (mp4 also needs imageio-ffmpeg)
+    GIF/video frames are streamed to the writer, so long episodes never sit in memory.
+    """
+    frames = iter_episode_frames(env, agent, actions, seed, max_steps, stride)
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == ".npy":
+        np.save(path, np.stack(list(frames)))
+        return path
+
+    try:
+        import imageio
+    except ImportError as e:
+        raise ImportError("GIF/video export requires imageio (pip install imageio imageio-ffmpeg)") from e
+
+    if ext == ".gif":
+        writer = imageio.get_writer(path, mode="I", duration=1.0 / fps)
+    else:
+        writer = imageio.get_writer(path, fps=fps)
+
+    n = 0
+    with writer:
+        for frame in frames:
+            writer.append_data(frame)
+            n += 1
+
+    print(f"✅ Saved: {path} ({n} frames)")
+    return path
+
+
+def main():
+    env = FlappyBirdEnv(render_mode="rgb_array")
+    os.makedirs("results", exist_ok=True)
+
+    for name in ["vi", "pi"]:
+        path = f"results/policy_{name}.pkl"
+        if not os.path.exists(path):
+            print(f"{path} not found! Run train.py or train_vi_pi.py first.")
+            continue
+
+        with open(path, "rb") as f:
+            saved = pickle.load(f)
+
+        agent = PolicyAgent(saved["policy"], bins=(8, 8, 8))
+        save_episode(f"results/replay_{name}.gif", env, agent, seed=0, stride=2)
+
+    env.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import sqlite3
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    algo TEXT NOT NULL,
+    seed INTEGER,
+    created REAL NOT NULL,
+    finished REAL,
+    status TEXT NOT NULL DEFAULT 'running',
+    config TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS params (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    key TEXT NOT NULL,
+    num REAL,
+    text TEXT
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS runs_algo ON runs(algo, kind);
+CREATE INDEX IF NOT EXISTS params_key ON params(key, num, text);
+CREATE INDEX IF NOT EXISTS params_run ON params(run_id);
+CREATE INDEX IF NOT EXISTS metrics_name ON metrics(name, value);
+"""
+
+
+class RunRegistry:
+    """
+    Local experiment registry: an SQLite index of runs (kind, algo, seed,
+    config, status), their scalar metrics and timings, and artifact paths.
+    Arrays are stored as .npy files under <root>/<run id>/ and only loaded
+    on request, so queries over many runs read metadata only.
+
+        reg = RunRegistry()
+        run = reg.start_run('planning', 'PI', config={'gamma': 0.99}, seed=0)
+        reg.log_metrics(run, {'mean_score': 12.3, 'time_plan': 1.8})
+        reg.save_array(run, 'scores', scores)
+        reg.finish_run(run)
+        reg.best('mean_score', algo='PI', gamma=0.99)
+    """
+    def __init__(self, root='results/runs'):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(root, 'registry.sqlite'))
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    # ----- writing -----
+
+    def start_run(self, kind, algo, config=None, seed=None):
+        config = config or {}
+        with self.db:
+            run_id = self.db.execute(
+                "INSERT INTO runs (kind, algo, seed, created, config) VALUES (?, ?, ?, ?, ?)",
+                (kind, algo, seed, time.time(), json.dumps(config, default=str))).lastrowid
+            self.db.executemany(
+                "INSERT INTO params (run_id, key, num, text) VALUES (?, ?, ?, ?)",
+                [(run_id, key) + self._param_value(value) for key, value in config.items()])
+        return run_id
+
+    def log_metrics(self, run_id, metrics):
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO metrics (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, name, float(value)) for name, value in metrics.items()])
+
+    def log_metric(self, run_id, name, value):
+        self.log_metrics(run_id, {name: value})
+
+    def add_artifact(self, run_id, name, path):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO artifacts (run_id, name, path) VALUES (?, ?, ?)",
+                            (run_id, name, path))
+
+    def run_dir(self, run_id):
+        """Directory for a run's own artifacts (never shared with other runs)."""
+        path = os.path.join(self.root, str(run_id))
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def save_array(self, run_id, name, array):
+        path = os.path.join(self.run_dir(run_id), f'{name}.npy')
+        np.save(path, np.asarray(array))
+        self.add_artifact(run_id, name, path)
+        return path
+
+    def record(self, kind, algo, config=None, seed=None, metrics=None, arrays=None, artifacts=None):
+        """start_run + metrics + arrays + artifact paths + finish_run in one call. Returns the run id."""
+        run_id = self.start_run(kind, algo, config, seed)
+        self.log_metrics(run_id, metrics or {})
+        for name, array in (arrays or {}).items():
+            self.save_array(run_id, name, array)
+        for name, path in (artifacts or {}).items():
+            self.add_artifact(run_id, name, path)
+        self.finish_run(run_id)
+        return run_id
+
+    def finish_run(self, run_id, status='done'):
+        with self.db:
+            self.db.execute("UPDATE runs SET status = ?, finished = ? WHERE id = ?",
+                            (status, time.time(), run_id))
+
+    # ----- queries (metadata only) -----
+
+    @staticmethod
+    def _param_value(value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None, json.dumps(value, default=str)
+        return float(value), None
+
+    def _filters(self, kind=None, algo=None, seed=None, status='done', params=None):
+        """SQL joins/conditions selecting runs; config params go through the indexed params table."""
+        joins, join_args = [], []
+        for i, (key, value) in enumerate((params or {}).items()):
+            num, text = self._param_value(value)
+            if num is not None:
+                joins.append(f"JOIN params p{i} ON p{i}.run_id = runs.id AND p{i}.key = ? "
+                             f"AND p{i}.num BETWEEN ? AND ?")
+                join_args += [key, num - 1e-12, num + 1e-12]
+            else:
+                joins.append(f"JOIN params p{i} ON p{i}.run_id = runs.id AND p{i}.key = ? AND p{i}.text = ?")
+                join_args += [key, text]
+
+        where, where_args = [], []
+        for col, value in (('kind', kind), ('algo', algo), ('seed', seed), ('status', status)):
+            if value is not None:
+                where.append(f"runs.{col} = ?")
+                where_args.append(value)
+
+        where_sql = (" WHERE " + " AND ".join(where)) if where else ""
+        return " ".join(joins), where_sql, join_args + where_args
+
+    def runs(self, kind=None, algo=None, seed=None, status='done', **params):
+        """Runs matching the filters (config params compared by value), newest first."""
+        join_sql, where_sql, args = self._filters(kind, algo, seed, status, params)
+        rows = self.db.execute(
+            f"SELECT runs.* FROM runs {join_sql}{where_sql} ORDER BY runs.id DESC", args).fetchall()
+        return [self._row(row) for row in rows]
+
+    def metric_values(self, metric, kind=None, algo=None, seed=None, **params):
+        """(run, value) pairs of one metric over matching runs, best first."""
+        join_sql, where_sql, args = self._filters(kind, algo, seed, 'done', params)
+        where_sql = (where_sql + " AND" if where_sql else " WHERE") + " m.name = ?"
+        rows = self.db.execute(
+            f"SELECT runs.*, m.value AS metric FROM runs JOIN metrics m ON m.run_id = runs.id "
+            f"{join_sql}{where_sql} ORDER BY m.value DESC", args + [metric]).fetchall()
+        return [(self._row(row), row['metric']) for row in rows]
+
+    def best(self, metric, kind=None, algo=None, maximize=True, **params):
+        """Best run by `metric` across seeds (None if nothing matches)."""
+        values = self.metric_values(metric, kind, algo, **params)
+        if not values:
+            return None
+        run, value = values[0] if maximize else values[-1]
+        return {**run, metric: value}
+
+    def latest(self, algo, kind=None, **params):
+        runs = self.runs(kind=kind, algo=algo, **params)
+        return runs[0] if runs else None
+
+    def metrics(self, run_id):
+        return {row['name']: row['value'] for row in
+                self.db.execute("SELECT name, value FROM metrics WHERE run_id = ?", (run_id,))}
+
+    def artifacts(self, run_id):
+        return {row['name']: row['path'] for row in
+                self.db.execute("SELECT name, path FROM artifacts WHERE run_id = ?", (run_id,))}
+
+    def load_array(self, run_id, name, mmap=True):
+        return np.load(self.artifacts(run_id)[name], mmap_mode='r' if mmap else None)
+
+    @staticmethod
+    def _row(row):
+        run = {key: row[key] for key in ('id', 'kind', 'algo', 'seed', 'created', 'finished', 'status')}
+        run['config'] = json.loads(row['config'])
+        return run
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,137 @@
+import numpy as np
+from agents.q_learning import QAgent
+from utils.discretize import discretize_state, flat_index
+
+
+class ActiveTraceSet:
+    """
+    Eligibility traces for recently visited (state, action) pairs only.
+    Active keys/values are packed at the front of fixed-size arrays, traces
+    below `cutoff` are pruned after each decay and at most `capacity` are
+    kept (the weakest is evicted), so each update costs O(capacity).
+    """
+    def __init__(self, n_keys, capacity=256, cutoff=1e-3):
+        self.capacity = capacity
+        self.cutoff = cutoff
+        self.pos = np.full(n_keys, -1, dtype=np.int64)  # key -> slot, -1 if inactive
+        self.keys = np.zeros(capacity, dtype=np.int64)
+        self.vals = np.zeros(capacity)
+        self.n = 0
+
+    def visit(self, key):
+        """Replacing trace: set e(key) = 1."""
+        p = self.pos[key]
+        if p < 0:
+            if self.n == self.capacity:
+                self._remove(int(np.argmin(self.vals[:self.n])))
+            p = self.n
+            self.keys[p] = key
+            self.pos[key] = p
+            self.n += 1
+        self.vals[p] = 1.0
+
+    def _remove(self, p):
+        last = self.n - 1
+        self.pos[self.keys[p]] = -1
+        if p != last:
+            self.keys[p] = self.keys[last]
+            self.vals[p] = self.vals[last]
+            self.pos[self.keys[p]] = p
+        self.n = last
+
+    def decay(self, factor):
+        n = self.n
+        self.vals[:n] *= factor
+        keep = self.vals[:n] >= self.cutoff
+        if not keep.all():
+            self.pos[self.keys[:n][~keep]] = -1
+            k = int(keep.sum())
+            self.keys[:k] = self.keys[:n][keep]
+            self.vals[:k] = self.vals[:n][keep]
+            self.pos[self.keys[:k]] = np.arange(k)
+            self.n = k
+
+    def clear(self):
+        self.pos[self.keys[:self.n]] = -1
+        self.n = 0
+
+    def active(self):
+        return self.keys[:self.n], self.vals[:self.n]
+
+
+class SarsaLambdaAgent(QAgent):
+    """
+    SARSA(lambda) with replacing eligibility traces over a sparse active set.
+    learn() picks the next action itself (on-policy) and act() returns it for
+    the next state, so the agent trains with the same act/learn loop as QAgent.
+    Call start_episode() before each episode so no traces carry over.
+    """
+    def __init__(self, bins=(8, 8, 8), alpha=0.15, gamma=0.98, lam=0.8,
+                 eps=1.0, eps_min=0.01, eps_decay=0.99985, trace_capacity=256, trace_cutoff=1e-3):
+        super().__init__(bins, alpha, gamma, eps, eps_min, eps_decay)
+        self.lam = lam
+        self.traces = ActiveTraceSet(self.q_table.size, trace_capacity, trace_cutoff)
+        self._next = None  # (state, action) chosen in learn()
+
+    @property
+    def q_flat(self):
+        """Flat view of q_table, taken on use so it survives copy.deepcopy and pickle."""
+        return self.q_table.reshape(-1)
+
+    def start_episode(self):
+        self.traces.clear()
+        self._next = None
+
+    def key(self, state, action):
+        return flat_index(discretize_state(state, self.bins), self.bins) * 2 + action
+
+    def act(self, state):
+        if self._next is not None and self._next[0] is state:
+            a = self._next[1]
+            self._next = None
+            return a
+        return super().act(state)
+
+    def _next_value(self, s2, a2):
+        return self.q_flat[self.key(s2, a2)]
+
+    def learn(self, s, a, r, s2, done):
+        k = self.key(s, a)
+
+        if done:
+            q_next = 0.0
+            keep = False
+            self._next = None
+        else:
+            a2 = QAgent.act(self, s2)
+            self._next = (s2, a2)
+            q_next = self._next_value(s2, a2)
+            keep = self._keep_traces(s2, a2)  # judged on Q before this update
+
+        q_flat = self.q_flat
+        delta = r + self.gamma * q_next - q_flat[k]
+
+        self.traces.visit(k)
+        keys, vals = self.traces.active()
+        q_flat[keys] += self.alpha * delta * vals
+
+        if keep:
+            self.traces.decay(self.gamma * self.lam)
+        else:
+            self.traces.clear()
+
+    def _keep_traces(self, s2, a2):
+        return True
+
+
+class QLambdaAgent(SarsaLambdaAgent):
+    """
+    Watkins's Q(lambda): bootstraps from max_a Q(s2, a) and cuts the traces
+    whenever the next action is exploratory.
+    """
+    def _next_value(self, s2, a2):
+        return np.max(self.q_table[discretize_state(s2, self.bins)])
+
+    def _keep_traces(self, s2, a2):
+        q = self.q_table[discretize_state(s2, self.bins)]
+        return q[a2] == np.max(q)
@@ -0,0 +1,104 @@
+import time
+import numpy as np
+from agents.model_base import TransitionStats
+from utils.discretize import STATE_LOW, STATE_HIGH, discretize_batch, flat_index
+
+
+def sample_cell_states(cells, bins=(8, 8, 8), samples_per_cell=32, rng=None):
+    """
+    Uniformly sample continuous states inside each discretization cell.
+    cells: (M,) flat cell ids. Returns (M * samples_per_cell, 3) states
+    and the cell id of each sample.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    bins = np.array(bins)
+    idx = np.stack(np.unravel_index(cells, tuple(bins)), axis=1)
+    idx = np.repeat(idx, samples_per_cell, axis=0)
+
+    width = (STATE_HIGH - STATE_LOW) / bins
+    states = STATE_LOW + (idx + rng.random(idx.shape)) * width
+    return states, np.repeat(cells, samples_per_cell)
+
+
+def states_to_config(env, states, rng=None, bins=None):
+    """
+    Build env configurations (bird y/velocity, 3 tubes) that produce the given
+    continuous states under FlappyBirdEnv.get_state: the next tube is placed at
+    the sampled horizontal distance, the following ones 350px apart, and the
+    bird at the sampled offset from a random gap.
+    With `bins`, states in the first horizontal bin place the tube anywhere in
+    [BIRD_X - TUBE_WIDTH, BIRD_X + bin width): get_state clips the distance to 0
+    while the tube is still over the bird, and that is where tubes are passed.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    n = len(states)
+
+    vel = states[:, 0] * 10
+    next_x = states[:, 1] * env.WIDTH
+    if bins is not None:
+        bin_width = (STATE_HIGH[1] - STATE_LOW[1]) / bins[1] * env.WIDTH
+        first = next_x < bin_width
+        next_x[first] = rng.uniform(-env.TUBE_WIDTH, bin_width, int(first.sum()))
+    tube_x = env.BIRD_X + next_x[:, None] + np.array([0.0, 350.0, 700.0])
+    tube_h = rng.integers(150, 301, (n, 3)).astype(np.float64)
+    gap_center = tube_h[:, 0] + env.TUBE_GAP / 2
+    y = states[:, 2] * env.HEIGHT + gap_center - env.BIRD_HEIGHT / 2
+    passed = np.zeros((n, 3), dtype=bool)
+
+    return y, vel, tube_x, tube_h, passed
+
+
+def configs_to_snapshots(env, y, vel, tube_x, tube_h, passed):
+    """Pack batch configurations into (N, SNAPSHOT_SIZE) arrays for env.restore()."""
+    n = len(y)
+    snaps = np.zeros((n, env.SNAPSHOT_SIZE))
+    snaps[:, 0] = y
+    snaps[:, 1] = vel
+    tubes = snaps[:, 4:].reshape(n, -1, 3)
+    tubes[:, :, 0] = tube_x
+    tubes[:, :, 1] = tube_h
+    tubes[:, :, 2] = passed
+    return snaps
+
+
+def simulate_transition_stats(env, bins=(8, 8, 8), samples_per_cell=32, seed=None, chunk_cells=4096):
+    """
+    Simulated one-step dynamics of every cell of the grid: sample continuous
+    states per cell, apply both actions with env.batch_step, and aggregate
+    transition counts, reward sums and done counts per (s, a).
+    Returns TransitionStats (no dict model is built).
+    """
+    rng = np.random.default_rng(seed)
+    n_states = int(np.prod(bins))
+    stats = TransitionStats(bins)
+
+    for first in range(0, n_states, chunk_cells):
+        cells = np.arange(first, min(first + chunk_cells, n_states))
+        states, cell_ids = sample_cell_states(cells, bins, samples_per_cell, rng)
+        y, vel, tube_x, tube_h, passed = states_to_config(env, states, rng, bins)
+
+        # Both actions from the same sampled configurations, in one batch
+        actions = np.repeat([0, 1], len(y))
+        y2, vel2, tx2, th2, _, r, done = env.batch_step(
+            np.tile(y, 2), np.tile(vel, 2), np.tile(tube_x, (2, 1)),
+            np.tile(tube_h, (2, 1)), np.tile(passed, (2, 1)), actions, rng)
+
+        s2 = flat_index(discretize_batch(env.batch_state(y2, vel2, tx2, th2), bins), bins)
+        stats.add_arrays(np.tile(cell_ids, 2), actions, s2, r, done)
+
+    return stats
+
+
+def build_model_by_simulation(env, bins=(8, 8, 8), samples_per_cell=32, seed=None, chunk_cells=4096):
+    """
+    Build a LearnedModel covering every cell of the grid from simulated
+    one-step dynamics instead of played episodes (see simulate_transition_stats).
+    Returns model, states (like build_model_from_dataset).
+    """
+    start = time.time()
+    stats = simulate_transition_stats(env, bins, samples_per_cell, seed, chunk_cells)
+    model, states = stats.to_model()
+
+    print(f"   Simulated model built in {time.time() - start:.2f}s: "
+          f"{len(states)} states, {len(model.P)} state-action entries")
+    return model, states
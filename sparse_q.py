@@ -0,0 +1,111 @@
+import numpy as np
+import random
+from agents.base import BaseAgent
+from agents.q_learning import QAgent
+from utils.discretize import discretize_state, flat_index
+
+
+class SparseQTable:
+    """
+    Open-addressing hash table (linear probing) from flat state index to
+    a row of action values. Keys and values live in flat numpy arrays, so
+    only visited states take memory. Unvisited states read as zeros.
+    """
+    EMPTY = -1
+
+    def __init__(self, n_actions=2, capacity=1024, dtype=np.float32, max_load=0.5):
+        capacity = 1 << max(3, int(capacity - 1).bit_length())  # power of two
+        self.n_actions = n_actions
+        self.dtype = np.dtype(dtype)
+        self.max_load = max_load
+        self.size = 0
+        self._alloc(capacity)
+        self._zeros = np.zeros(n_actions, dtype=self.dtype)
+
+    def _alloc(self, capacity):
+        self.mask = capacity - 1
+        self.keys = np.full(capacity, self.EMPTY, dtype=np.int64)
+        self.values = np.zeros((capacity, self.n_actions), dtype=self.dtype)
+
+    def _probe(self, key):
+        """Slot holding `key`, or the empty slot where it would go."""
+        i = (key * 0x9E3779B1) & self.mask
+        keys = self.keys
+        while True:
+            k = keys[i]
+            if k == key or k == self.EMPTY:
+                return i
+            i = (i + 1) & self.mask
+
+    def get(self, key):
+        """Action values for `key` (read-only zeros if unvisited)."""
+        i = self._probe(key)
+        if self.keys[i] == self.EMPTY:
+            return self._zeros
+        return self.values[i]
+
+    def row(self, key):
+        """Writable action-value row for `key`, inserting it if needed."""
+        i = self._probe(key)
+        if self.keys[i] == self.EMPTY:
+            if (self.size + 1) > self.max_load * len(self.keys):
+                self._grow()
+                i = self._probe(key)
+            self.keys[i] = key
+            self.size += 1
+        return self.values[i]
+
+    def _grow(self):
+        old_keys, old_values = self.keys, self.values
+        self._alloc(len(old_keys) * 2)
+        for j in np.flatnonzero(old_keys != self.EMPTY):
+            i = self._probe(int(old_keys[j]))
+            self.keys[i] = old_keys[j]
+            self.values[i] = old_values[j]
+
+    def items(self):
+        used = self.keys != self.EMPTY
+        return self.keys[used], self.values[used]
+
+    def to_dense(self, n_states):
+        dense = np.zeros((n_states, self.n_actions), dtype=self.dtype)
+        keys, values = self.items()
+        dense[keys] = values
+        return dense
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.values.nbytes
+
+    def __len__(self):
+        return self.size
+
+
+class SparseQAgent(QAgent):
+    """
+    Q-learning with a SparseQTable instead of a dense np.zeros(bins + (2,)).
+    Same act/learn API as QAgent, so it trains with train_agent, but memory
+    grows with visited states only, making 64^3 or 128^3 grids practical.
+    dtype=np.float16 halves value storage again (updates are computed in float64).
+    """
+    def __init__(self, bins=(64, 64, 64), alpha=0.15, gamma=0.98,
+                 eps=1.0, eps_min=0.01, eps_decay=0.99985, dtype=np.float32, capacity=4096):
+        BaseAgent.__init__(self, bins, gamma, eps, eps_min, eps_decay)
+        self.alpha = alpha
+        self.q_table = SparseQTable(2, capacity, dtype)
+
+    def key(self, state):
+        return flat_index(discretize_state(state, self.bins), self.bins)
+
+    def act(self, state):
+        if random.random() < self.eps:
+            return random.randint(0, 1)
+        return int(np.argmax(self.q_table.get(self.key(state))))
+
+    def learn(self, s, a, r, s2, done):
+        best_next = 0.0 if done else float(np.max(self.q_table.get(self.key(s2))))
+        target = r + self.gamma * best_next
+
+        row = self.q_table.row(self.key(s))
+        q = float(row[a])
+        row[a] = q + self.alpha * (target - q)
@@ -0,0 +1,5 @@
+import os
+
+# Offscreen pygame for the rgb_array env tests (no display needed)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
@@ -0,0 +1,86 @@
+import pytest
+
+from flappybird_env import FlappyBirdEnv
+from agents.sarsa import SarsaAgent
+from budget_harness import BudgetMeter, run_budgeted, summarize
+from train import run_training_episode
+
+
+@pytest.mark.parametrize("algo", ["Q-Learning", "VI"])
+def test_step_budget_is_never_exceeded(algo):
+    run = run_budgeted(algo, "steps", 2500, seed=0, points=4, eval_episodes=2)
+    assert run["curve"][-1]["steps"] == 2500
+    assert all(p["steps"] <= 2500 for p in run["curve"])
+
+
+def test_seed_reproduces_a_run():
+    first = run_budgeted("Q-Learning", "steps", 3000, seed=4, points=3, eval_episodes=2)
+    second = run_budgeted("Q-Learning", "steps", 3000, seed=4, points=3, eval_episodes=2)
+    assert ([(p["steps"], p["score"]) for p in first["curve"]]
+            == [(p["steps"], p["score"]) for p in second["curve"]])
+
+
+def test_sarsa_trains_with_the_sarsa_update():
+    class StrictSarsa(SarsaAgent):
+        def learn(self, *args):
+            raise AssertionError("Q-learning update used for a SARSA agent")
+
+    env = FlappyBirdEnv(render_mode=False)
+    _, steps = run_training_episode(env, StrictSarsa(), max_steps=50)
+    assert 0 < steps <= 50
+
+
+def test_sarsa_plays_the_action_it_bootstrapped_on():
+    played, bootstrapped = [], []
+
+    class RecordingSarsa(SarsaAgent):
+        def learn_sarsa(self, s, a, r, s2, a2, done):
+            bootstrapped.append(a2)
+            super().learn_sarsa(s, a, r, s2, a2, done)
+
+    class RecordingEnv(FlappyBirdEnv):
+        def step(self, action):
+            played.append(action)
+            return super().step(action)
+
+    env = RecordingEnv(render_mode=False)
+    agent = RecordingSarsa(eps=0.5)
+    for seed in range(5):
+        env.reset(seed=seed)
+        played.clear()
+        bootstrapped.clear()
+        _, steps = run_training_episode(env, agent, max_steps=300)
+        assert len(played) == steps > 1
+        assert played[1:] == bootstrapped[:-1]
+
+
+def test_meter_steps_left():
+    meter = BudgetMeter("steps", 100)
+    meter.steps = 60
+    assert meter.steps_left() == 40
+    assert BudgetMeter("cpu", 1.0).steps_left() is None
+    with pytest.raises(ValueError):
+        BudgetMeter("episodes", 10)
+
+
+def test_leaderboard_ranks_by_area_under_curve():
+    def run(algo, scores):
+        return {"algo": algo, "seed": 0, "kind": "steps", "limit": 100,
+                "curve": [{"steps": 50, "score": scores[0]}, {"steps": 100, "score": scores[1]}]}
+
+    # "early" learns fast and plateaus, "late" ends higher but has a smaller area
+    rows = summarize([run("late", (0.0, 10.0)), run("early", (8.0, 8.0))])
+    assert [row["algo"] for row in rows] == ["early", "late"]
+    assert rows[1]["final"] == 10.0
+
+
+def test_frame_skip_reaches_training_and_evaluation_envs(monkeypatch):
+    import budget_harness
+
+    made = []
+    real_env = budget_harness.FlappyBirdEnv
+    monkeypatch.setattr(budget_harness, 'FlappyBirdEnv',
+                        lambda **kw: made.append(kw['frame_skip']) or real_env(**kw))
+    run = run_budgeted("Q-Learning", "steps", 500, seed=0, points=2, eval_episodes=1, frame_skip=4)
+    assert made == [4, 4] and run["frame_skip"] == 4
+    assert run["curve"][-1]["steps"] == 500
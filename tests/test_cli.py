@@ -0,0 +1,57 @@
+import sys
+import subprocess
+
+import cli
+
+
+def test_startup_imports_only_the_standard_library():
+    code = ("import sys, cli; cli.build_parser().parse_args(['plan', '--method', 'pi']); "
+            "print(','.join(m for m in ('numpy', 'pygame', 'matplotlib', 'seaborn') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ""
+
+
+def test_subcommands_dispatch_to_their_handlers():
+    parser = cli.build_parser()
+    assert parser.parse_args(['train', '--algo', 'q-lambda']).func is cli.cmd_train
+    assert parser.parse_args(['plan', '--method', 'chunked-vi']).func is cli.cmd_plan
+    assert parser.parse_args(['evaluate', 'results/policy_pi']).func is cli.cmd_evaluate
+    assert parser.parse_args(['runs', '--param', 'gamma=0.99']).param == ['gamma=0.99']
+
+
+def test_evaluate_command_runs_an_exported_policy(tmp_path, capsys):
+    from utils.policy_export import export_policy
+
+    path = export_policy(str(tmp_path / "policy"), {}, bins=(8, 8, 8))
+    cli.main(['evaluate', path, '--episodes', '2'])
+    assert "Mean score over 2 episodes" in capsys.readouterr().out
+
+
+def test_collect_seeding_does_not_depend_on_workers(tmp_path, monkeypatch):
+    import utils.dataset as dataset_mod
+
+    seen = []
+    real_serial, real_parallel = dataset_mod.collect_model, dataset_mod.collect_model_parallel
+    monkeypatch.setattr(dataset_mod, 'collect_model',
+                        lambda *a, **kw: seen.append(kw['seed']) or real_serial(*a, **kw))
+    monkeypatch.setattr(dataset_mod, 'collect_model_parallel',
+                        lambda *a, **kw: seen.append(kw['seed']) or real_parallel(*a, **kw))
+
+    out = str(tmp_path / "stats.npz")
+    for workers in ('1', '2'):
+        cli.main(['collect', '--aggregate', '--episodes', '4', '--workers', workers, '--out', out])
+        cli.main(['collect', '--aggregate', '--episodes', '4', '--workers', workers, '--out', out,
+                  '--seed', '0'])
+    assert seen == [None, 0, None, 0]
+
+
+def test_frame_skip_reaches_pbt_and_budget_runs(monkeypatch):
+    import pbt
+    import budget_harness
+
+    seen = {}
+    monkeypatch.setattr(pbt, 'run_pbt', lambda *a, **kw: seen.setdefault('pbt', kw['frame_skip']))
+    monkeypatch.setattr(budget_harness, 'run_harness', lambda *a, **kw: seen.setdefault('budget', kw['frame_skip']))
+    cli.main(['--frame-skip', '3', 'pbt'])
+    cli.main(['--frame-skip', '2', 'budget'])
+    assert seen == {'pbt': 3, 'budget': 2}
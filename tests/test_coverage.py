@@ -0,0 +1,45 @@
+import random
+import numpy as np
+
+from flappybird_env import FlappyBirdEnv
+from utils.dataset import collect_coverage, coverage
+
+BINS = (4, 4, 4)
+
+
+def test_coverage_fraction():
+    visits = np.array([[0, 3], [5, 5], [1, 0], [2, 9]])
+    assert coverage(visits) == 6 / 8
+    assert coverage(visits, min_count=3) == 4 / 8
+    assert coverage(np.zeros((4, 2))) == 0.0
+
+
+def test_collection_reaches_its_target():
+    env = FlappyBirdEnv(render_mode=False)
+    stats, visits = collect_coverage(env, bins=BINS, target=0.6, min_count=2, max_transitions=200_000,
+                                     seed=0, log_every=0)
+    assert visits.shape == (64, 2)
+    assert coverage(visits, 2) >= 0.6
+    assert visits.sum() == stats.n_transitions < 200_000
+    assert stats.bins == BINS
+
+
+def test_collection_stops_at_the_transition_cap():
+    env = FlappyBirdEnv(render_mode=False)
+    stats, visits = collect_coverage(env, bins=BINS, target=1.0, min_count=1000, max_transitions=500,
+                                     max_steps=100, seed=0, log_every=0)
+    assert 500 <= stats.n_transitions < 600
+    assert coverage(visits, 1000) < 1.0
+
+
+def test_seeded_collection_is_reproducible_and_leaves_global_random_alone():
+    env = FlappyBirdEnv(render_mode=False)
+    random.seed(123)
+    expected = random.random()
+
+    random.seed(123)
+    first, visits = collect_coverage(env, bins=BINS, target=0.5, min_count=2, seed=3, log_every=0)
+    assert random.random() == expected
+    second, visits_again = collect_coverage(env, bins=BINS, target=0.5, min_count=2, seed=3, log_every=0)
+    assert np.array_equal(visits, visits_again)
+    assert first.counts == second.counts and first.reward_sum == second.reward_sum
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from agents.model_base import TransitionStats, value_iteration
+from agents.csr_planning import (export_model_csr, load_model_csr, state_blocks,
+                                 chunked_value_iteration, policy_to_dict)
+from utils.discretize import flat_index
+
+BINS = (8, 8, 8)
+
+
+def random_stats(n=5000, seed=0):
+    """Transitions in a corner of the grid; termination depends on (s, a) only."""
+    rng = np.random.default_rng(seed)
+    stats = TransitionStats(BINS)
+    for c in rng.integers(0, 4, size=(n, 2, 3)):
+        s, s2, a = tuple(c[0].tolist()), tuple(c[1].tolist()), int(rng.integers(2))
+        stats.add(s, a, s2, float(rng.normal(1.0, 3.0)), s[0] == 0 and a == 1)
+    return stats
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_chunked_vi_matches_value_iteration(tmp_path, workers):
+    stats = random_stats()
+    model, states = stats.to_model()
+    V_ref, _ = value_iteration(states, model, gamma=0.9, iters=1000, tol=1e-10)
+
+    path = export_model_csr(str(tmp_path / "csr"), stats)
+    info = {}
+    V, policy = chunked_value_iteration(path, gamma=0.9, iters=1000, tol=1e-10, block_nnz=300,
+                                        workers=workers, info=info)
+    assert 0 < info['iters'] < 1000
+    for s in states:
+        assert abs(V[flat_index(np.array(s), BINS)] - V_ref[s]) < 1e-6
+    assert set(policy_to_dict(policy, BINS)) == {s for s, _ in model.P}
+
+
+def test_dict_model_and_stats_export_the_same_arrays(tmp_path):
+    stats = random_stats()
+    model, _ = stats.to_model()
+    _, from_stats = load_model_csr(export_model_csr(str(tmp_path / "stats"), stats))
+    meta, from_model = load_model_csr(export_model_csr(str(tmp_path / "model"), model, BINS))
+    assert meta['n_states'] == 512 and meta['nnz'] == len(from_model['col'])
+    for name in ('ptr', 'col'):
+        assert np.array_equal(from_stats[name], from_model[name])
+    for name in ('prob', 'reward', 'done'):
+        assert np.allclose(from_stats[name], from_model[name])
+
+
+def test_state_blocks_partition_the_states():
+    rng = np.random.default_rng(0)
+    ptr = np.r_[0, np.cumsum(rng.integers(0, 20, 2 * 100))]
+    blocks = state_blocks(ptr, 100, block_nnz=150)
+    assert blocks[0][0] == 0 and blocks[-1][1] == 100
+    assert all(a[1] == b[0] for a, b in zip(blocks, blocks[1:]))
+    assert len(blocks) >= ptr[-1] // 150
+    assert state_blocks(ptr, 100, block_nnz=10 ** 9) == [(0, 100)]
+
+
+def test_zero_iterations_and_policy_dict(tmp_path):
+    path = export_model_csr(str(tmp_path / "csr"), random_stats(200))
+    info = {}
+    V, policy = chunked_value_iteration(path, iters=0, info=info)
+    assert info['iters'] == 0 and info['delta'] == 0.0 and not V.any()
+
+    policy = np.full(512, -1, dtype=np.int8)
+    policy[flat_index(np.array([1, 2, 3]), BINS)] = 1
+    policy[0] = 0
+    assert policy_to_dict(policy, BINS) == {(0, 0, 0): 0, (1, 2, 3): 1}
@@ -0,0 +1,31 @@
+import numpy as np
+
+from flappybird_env import FlappyBirdEnv
+from utils.evaluation import paired_evaluate, paired_comparison
+
+
+def test_same_policy_scores_identically_on_paired_layouts():
+    env = FlappyBirdEnv(render_mode=False)
+    policy = {}  # never flaps
+    scores = paired_evaluate(env, {"a": policy, "b": dict(policy)}, episodes=5, seed=7)
+    assert np.array_equal(scores["a"], scores["b"])
+
+
+def test_paired_comparison_intervals_and_variance_reduction():
+    rng = np.random.default_rng(0)
+    layout = rng.normal(10, 5, 400)  # shared per-episode difficulty
+    scores = {"base": layout + rng.normal(0, 0.5, 400),
+              "better": layout + 1.0 + rng.normal(0, 0.5, 400)}
+
+    (row,) = paired_comparison(scores, baseline="base")
+    assert row["policy"] == "better" and row["baseline"] == "base"
+    assert row["ci_low"] < 1.0 < row["ci_high"]
+    assert row["ci_low"] > 0  # detected despite the large layout variance
+    assert row["variance_reduction"] > 10
+
+
+def test_baseline_defaults_to_first_policy():
+    scores = {"x": np.array([1.0, 2.0, 3.0]), "y": np.array([2.0, 3.0, 4.0])}
+    (row,) = paired_comparison(scores)
+    assert row["baseline"] == "x" and row["mean_diff"] == 1.0
+    assert row["variance_reduction"] == float("inf")
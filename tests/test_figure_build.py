@@ -0,0 +1,47 @@
+import sys
+import importlib.util
+
+from utils.figure_build import FigureSpec, build_figures
+
+FIGURE_MODULE = '''
+def write_figure(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+'''
+
+
+def load_as(path, name):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_digest_does_not_depend_on_module_name(tmp_path):
+    source = tmp_path / "figures_mod.py"
+    source.write_text(FIGURE_MODULE)
+    as_script = load_as(source, "__main__")
+    as_import = load_as(source, "figures_mod")
+
+    out = str(tmp_path / "a.txt")
+    assert (FigureSpec(as_script.write_figure, out, (out, "x")).digest()
+            == FigureSpec(as_import.write_figure, out, (out, "x")).digest())
+    assert (FigureSpec(as_import.write_figure, out, (out, "x")).digest()
+            != FigureSpec(as_import.write_figure, out, (out, "y")).digest())
+
+
+def test_only_stale_figures_are_rebuilt(tmp_path, monkeypatch):
+    source = tmp_path / "figures_build_mod.py"
+    source.write_text(FIGURE_MODULE)
+    module = load_as(source, "figures_build_mod")
+    monkeypatch.setitem(sys.modules, "figures_build_mod", module)  # picklable for the workers
+    cache = str(tmp_path / "cache.json")
+    a, b = str(tmp_path / "a.txt"), str(tmp_path / "b.txt")
+
+    specs = [FigureSpec(module.write_figure, a, (a, "1")), FigureSpec(module.write_figure, b, (b, "1"))]
+    assert build_figures(specs, cache, workers=1) == [a, b]
+    assert build_figures(specs, cache, workers=1) == []
+
+    specs[1] = FigureSpec(module.write_figure, b, (b, "2"))
+    assert build_figures(specs, cache, workers=1) == [b]
+    assert open(b).read() == "2"
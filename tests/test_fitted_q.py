@@ -0,0 +1,78 @@
+import numpy as np
+
+import cli
+from agents.fitted_q import fitted_q_iteration
+from agents.model_base import value_iteration
+from utils.dataset import build_model_from_dataset, save_dataset_arrays, load_dataset_arrays
+from utils.discretize import flat_index
+
+BINS = (8, 8, 8)
+
+
+def random_dataset(n=4000, seed=0):
+    """Random transitions in a corner of the grid; termination depends on (s, a) only."""
+    rng = np.random.default_rng(seed)
+    cells = rng.integers(0, 4, size=(n, 2, 3))
+    dataset = []
+    for c in cells:
+        s, s2, a = tuple(c[0].tolist()), tuple(c[1].tolist()), int(rng.integers(2))
+        dataset.append((s, a, s2, float(rng.normal(1.0, 3.0)), s[0] == 0 and a == 1))
+    return dataset
+
+
+def test_arrays_round_trip_sorted(tmp_path):
+    dataset = random_dataset()
+    path = save_dataset_arrays(dataset, str(tmp_path / "arrays.npy"), BINS)
+    arr = load_dataset_arrays(path)
+    assert isinstance(arr, np.memmap) and len(arr) == len(dataset)
+
+    sa = arr['s'].astype(np.int64) * 2 + arr['a']
+    assert (np.diff(sa) >= 0).all()
+    expected = sorted((int(flat_index(np.array(s), BINS)), a, r) for s, a, _, r, _ in dataset)
+    assert sorted(zip(arr['s'].tolist(), arr['a'].tolist(), arr['r'].tolist())) == expected
+
+
+def test_fqi_matches_value_iteration(tmp_path):
+    dataset = random_dataset()
+    model, states = build_model_from_dataset(dataset)
+    V, _ = value_iteration(states, model, gamma=0.9, iters=1000, tol=1e-9)
+
+    path = save_dataset_arrays(dataset, str(tmp_path / "arrays.npy"), BINS)
+    info = {}
+    Q, policy = fitted_q_iteration(path, BINS, gamma=0.9, iters=1000, tol=1e-9, info=info)
+    assert 0 < info['iters'] < 1000 and info['delta'] < 1e-9
+
+    for s in states:
+        flat = int(flat_index(np.array(s), BINS))
+        if s in policy:
+            assert abs(Q[flat, policy[s]] - V[s]) < 1e-6
+        else:
+            assert V[s] == 0.0
+
+
+def test_chunk_size_does_not_change_the_result(tmp_path):
+    arrays = load_dataset_arrays(save_dataset_arrays(random_dataset(), str(tmp_path / "arrays.npy"), BINS))
+    Q_whole, policy_whole = fitted_q_iteration(arrays, BINS, iters=50)
+    Q_chunked, policy_chunked = fitted_q_iteration(arrays, BINS, iters=50, chunk_size=333)
+    assert np.allclose(Q_whole, Q_chunked) and policy_whole == policy_chunked
+
+
+def test_zero_iterations_report_zero_sweeps(tmp_path):
+    path = save_dataset_arrays(random_dataset(200), str(tmp_path / "arrays.npy"), BINS)
+    info = {}
+    Q, _ = fitted_q_iteration(path, BINS, iters=0, info=info)
+    assert info == {'iters': 0, 'delta': 0.0} and not Q.any()
+
+
+def test_cli_writes_arrays_next_to_the_dataset(tmp_path):
+    import pickle
+
+    dataset_path = tmp_path / "data.pkl"
+    with open(dataset_path, 'wb') as f:
+        pickle.dump(random_dataset(500), f)
+    cli.main(['plan', '--method', 'fqi', '--dataset', str(dataset_path), '--episodes', '1'])
+    assert (tmp_path / "data_arrays.npy").exists()
+
+    out = tmp_path / "elsewhere.npy"
+    cli.main(['plan', '--method', 'fqi', '--dataset', str(dataset_path), '--episodes', '1', '--arrays', str(out)])
+    assert out.exists()
@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from flappybird_env import FlappyBirdEnv
+from replay import record_episode
+
+
+def play(env, actions, seed):
+    env.reset(seed=seed)
+    rewards = []
+    for a in actions:
+        _, r, done, _ = env.step(a)
+        rewards.append(r)
+        if done:
+            break
+    return rewards, env.score
+
+
+def test_reset_seed_fixes_tube_layout():
+    env = FlappyBirdEnv(render_mode=False)
+    env.reset(seed=3)
+    first = [t["height"] for t in env.tubes]
+    env.reset(seed=3)
+    assert [t["height"] for t in env.tubes] == first
+
+
+def test_seeded_action_replay_is_exact():
+    env = FlappyBirdEnv(render_mode=False)
+    actions = [int(i % 17 == 0) for i in range(2000)]
+    assert play(env, actions, seed=5) == play(env, actions, seed=5)
+
+
+def test_rgb_array_render_returns_frames():
+    pytest.importorskip("pygame")
+    env = FlappyBirdEnv(render_mode="rgb_array")
+    env.reset(seed=0)
+    frame = env.render()
+    assert frame.shape == (env.HEIGHT, env.WIDTH, 3)
+    assert frame.dtype == np.uint8
+    env.close()
+
+
+def test_record_episode_stride_keeps_final_frame():
+    pytest.importorskip("pygame")
+    env = FlappyBirdEnv(render_mode="rgb_array")
+    actions = [0] * 9
+    frames = record_episode(env, actions=actions, seed=0, stride=4)
+    # frames at steps 0, 4, 8 plus the final frame
+    assert frames.shape == (4, env.HEIGHT, env.WIDTH, 3)
+    env.close()
+
+
+def batch_from(env):
+    return env.unpack_snapshots(env.snapshot())
+
+
+def test_snapshot_restore_round_trip():
+    env = FlappyBirdEnv(render_mode=False)
+    env.reset(seed=1)
+    for _ in range(40):
+        env.step(0)
+    snap = env.snapshot().copy()
+    state = env.get_state()
+
+    future = [env.step(a)[:3] for a in (1, 0, 0, 1)]
+    assert np.array_equal(env.restore(snap), state)
+    replay = [env.step(a)[:3] for a in (1, 0, 0, 1)]
+    for (s1, r1, d1), (s2, r2, d2) in zip(future, replay):
+        assert np.array_equal(s1, s2) and r1 == r2 and d1 == d2
+
+
+def test_batch_step_matches_step():
+    env = FlappyBirdEnv(render_mode=False)
+    env.reset(seed=2)
+    y, vel, tube_x, tube_h, passed = batch_from(env)
+    rng = np.random.default_rng(0)
+
+    for _ in range(2000):
+        nxt = next(t for t in env.tubes if t["x"] + env.TUBE_WIDTH > env.BIRD_X)
+        a = int(env.Bird_y + env.BIRD_HEIGHT > nxt["height"] + 0.75 * env.TUBE_GAP)
+        state, reward, done, _ = env.step(a)
+        prev_x = tube_x
+        y, vel, tube_x, tube_h, passed, r, d = env.batch_step(y, vel, tube_x, tube_h, passed, [a], rng)
+        assert np.allclose(tube_x[0], [t["x"] for t in env.tubes])
+        respawned = (tube_x > prev_x).any()
+        tube_h[0] = [t["height"] for t in env.tubes]  # respawned heights come from env.rng
+        assert np.allclose(env.batch_state(y, vel, tube_x, tube_h)[0], state)
+        assert d[0] == done
+        if not respawned:  # the respawn tick's proximity bonus used the batch's own height
+            assert np.isclose(r[0], reward)
+        if done:
+            break
+    assert env.score >= 2  # covers tube passes and respawns
+
+
+def test_batch_step_honors_frame_skip():
+    env = FlappyBirdEnv(render_mode=False, frame_skip=3)
+    ticks = FlappyBirdEnv(render_mode=False)
+    env.reset(seed=4)
+    ticks.reset(seed=4)
+    y, vel, tube_x, tube_h, passed = batch_from(env)
+    rng = np.random.default_rng(0)
+
+    for _ in range(700):
+        nxt = next(t for t in env.tubes if t["x"] + env.TUBE_WIDTH > env.BIRD_X)
+        a = int(env.Bird_y + env.BIRD_HEIGHT > nxt["height"] + 0.75 * env.TUBE_GAP)
+        state, reward, done, _ = env.step(a)
+        prev_x = tube_x
+        y, vel, tube_x, tube_h, passed, r, d = env.batch_step(y, vel, tube_x, tube_h, passed, [a], rng)
+
+        total, tick_done = 0.0, False
+        for _ in range(3):  # the same action repeated by a frame_skip=1 env
+            tick_state, tick_r, tick_done, _ = ticks.step(a)
+            total += tick_r
+            if tick_done:
+                break
+        assert np.array_equal(tick_state, state) and np.isclose(total, reward) and tick_done == done
+
+        assert np.allclose(tube_x[0], [t["x"] for t in env.tubes])
+        respawned = (tube_x > prev_x).any()
+        tube_h[0] = [t["height"] for t in env.tubes]  # respawned heights come from env.rng
+        assert np.allclose(env.batch_state(y, vel, tube_x, tube_h)[0], state)
+        assert d[0] == done
+        if not respawned:
+            assert np.isclose(r[0], reward)
+        if done:
+            break
+    assert env.score >= 2
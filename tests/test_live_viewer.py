@@ -0,0 +1,47 @@
+import sys
+import subprocess
+import numpy as np
+import pytest
+
+from agents.q_learning import QAgent
+from agents.tile_coding import TileCodingAgent
+from live_viewer import QTablePublisher, SharedQReader, q_array
+
+
+def test_published_table_round_trips():
+    agent = QAgent()
+    agent.q_table[...] = np.random.default_rng(0).normal(size=agent.q_table.shape)
+    publisher = QTablePublisher(q_array(agent).shape)
+    reader = SharedQReader(publisher.name)
+    try:
+        publisher.publish(q_array(agent))
+        version, table = reader.read()
+        assert version == 2 and np.array_equal(table, agent.q_table)
+
+        agent.q_table += 1.0
+        publisher.publish(q_array(agent))
+        version, table = reader.read()
+        assert version == 4 and np.array_equal(table, agent.q_table)
+        assert not reader.closed
+    finally:
+        publisher.close()
+
+    assert reader.closed
+    reader.header = reader.table = None
+    reader.shm.close()
+
+
+def test_agents_without_dense_q_are_rejected():
+    with pytest.raises(ValueError):
+        q_array(TileCodingAgent())
+
+
+def test_standalone_reader_exit_leaves_the_segment_alone():
+    publisher = QTablePublisher((8, 8, 8, 2))
+    try:
+        code = f"from live_viewer import SharedQReader; r = SharedQReader({publisher.name!r}); print(r.read()[0])"
+        for _ in range(2):  # a second viewer can still attach after the first one exited
+            out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+            assert out.stdout.strip() == "0" and "leaked" not in out.stderr
+    finally:
+        publisher.close()  # raises FileNotFoundError if a viewer's tracker unlinked the segment
@@ -0,0 +1,41 @@
+import numpy as np
+
+from flappybird_env import FlappyBirdEnv
+from agents.lookahead import LookaheadAgent
+
+
+def test_planning_leaves_the_env_untouched():
+    env = FlappyBirdEnv(render_mode=False)
+    state = env.reset(seed=3)
+    snap = env.snapshot().copy()
+    agent = LookaheadAgent(env, depth=20, rollouts=8, latency_budget=1.0, seed=0)
+    assert agent.act(state) in (0, 1)
+    assert np.array_equal(env.snapshot(), snap)
+
+
+def test_lookahead_flaps_when_falling_into_the_floor():
+    env = FlappyBirdEnv(render_mode=False)
+    env.reset(seed=0)
+    for _ in range(200):
+        state, _, done, _ = env.step(0)
+        if env.Bird_y + env.BIRD_HEIGHT + 3 * env.bird_vel > env.HEIGHT or done:
+            break
+    assert not done
+    agent = LookaheadAgent(env, depth=10, rollouts=8, latency_budget=1.0, seed=0)
+    q0, q1 = agent.action_values()
+    assert q1 > q0
+
+
+def test_stats_and_latency_budget():
+    env = FlappyBirdEnv(render_mode=False)
+    state = env.reset(seed=1)
+    agent = LookaheadAgent(env, depth=40, rollouts=8, latency_budget=0.0, seed=0)
+    for _ in range(5):
+        state, _, done, _ = env.step(agent.act(state))
+    assert agent.decisions == 5
+    assert agent.truncated == 5 and agent.depth_sum == 5  # out of budget after the first step
+    assert agent.decisions_per_sec > 0
+    assert "5 decisions" in agent.report()
+
+    agent.reset_stats()
+    assert agent.decisions_per_sec == 0.0 and agent.report() == "no decisions yet"
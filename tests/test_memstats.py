@@ -0,0 +1,40 @@
+import sys
+import tracemalloc
+import numpy as np
+
+from agents.q_learning import QAgent
+from agents.sparse_q import SparseQAgent
+from utils.memstats import deep_sizeof, agent_footprint, MemoryTracker
+
+
+def test_shared_objects_count_once():
+    item = list(range(1000))
+    assert deep_sizeof([item, item]) == deep_sizeof([item]) + sys.getsizeof([None, None]) - sys.getsizeof([None])
+
+
+def test_array_views_count_the_base_once():
+    base = np.zeros(100_000)
+    alone = deep_sizeof(base)
+    assert alone >= base.nbytes
+    both = deep_sizeof([base, base[10:], base[::2]])
+    assert both < alone + 1000  # only the small view headers are added
+
+
+def test_agent_footprint_states():
+    assert agent_footprint(QAgent())['states'] == 512
+    sparse = SparseQAgent(bins=(64, 64, 64))
+    sparse.learn(np.zeros(3), 1, 1.0, np.ones(3), False)
+    fp = agent_footprint(sparse)
+    assert fp['states'] == 1
+    assert fp['bytes'] < agent_footprint(QAgent(bins=(64, 64, 64)))['bytes']
+
+
+def test_tracker_records_each_stage():
+    mem = MemoryTracker(trace=True)
+    data = [np.ones(1000) for _ in range(10)]
+    mem.checkpoint("allocate")
+    del data
+    mem.checkpoint("free")
+    assert [row['stage'] for row in mem.stages] == ["allocate", "free"]
+    assert mem.stages[0]['py_peak'] >= 10 * 8000
+    tracemalloc.stop()
@@ -0,0 +1,78 @@
+import numpy as np
+
+from utils.metrics_log import MetricsLog, LearningCurve, count_records, iter_metrics, load_curve
+
+
+def naive_rolling(scores, window):
+    return np.array([scores[max(0, i + 1 - window):i + 1].mean() for i in range(len(scores))])
+
+
+def test_log_round_trip_across_buffer_flushes(tmp_path):
+    path = str(tmp_path / "metrics.bin")
+    with MetricsLog(path, buffer_size=7) as log:
+        for ep in range(50):
+            log.append(ep, ep % 5, 10 + ep, 0.5)
+
+    assert count_records(path) == 50
+    records = np.concatenate(list(iter_metrics(path, chunk_size=16)))
+    assert records['episode'].tolist() == list(range(50))
+    assert records['score'].tolist() == [ep % 5 for ep in range(50)]
+
+
+def test_rolling_mean_matches_naive_across_chunks():
+    scores = np.random.default_rng(0).integers(0, 20, 503).astype(float)
+    curve = LearningCurve(window=10, max_points=10_000)
+    for chunk in np.array_split(scores, 7):
+        curve.update(chunk)
+
+    x, mean, rolling, q = curve.points()
+    assert np.allclose(rolling, naive_rolling(scores, 10)[x.astype(int)])
+    assert np.allclose(mean, scores[x.astype(int)])
+
+
+def test_bucket_quantiles_after_merges():
+    scores = np.random.default_rng(1).normal(size=4096)
+    curve = LearningCurve(window=50, max_points=64, quantiles=(0.1, 0.5, 0.9))
+    curve.update(scores)
+
+    x, mean, rolling, q = curve.points()
+    assert len(x) <= 64
+    width = curve.stride
+    assert len(x) == len(scores) // width
+    blocks = scores[:len(x) * width].reshape(len(x), width)
+    assert np.allclose(mean, blocks.mean(axis=1))
+    assert np.allclose(rolling, naive_rolling(scores, 50)[x.astype(int)])
+    # Merged buckets hold the count-weighted average of their halves' quantiles
+    assert q.shape == (len(x), 3)
+    assert np.all(q[:, 0] <= q[:, 1]) and np.all(q[:, 1] <= q[:, 2])
+
+
+def test_refresh_only_reads_new_records(tmp_path):
+    path = str(tmp_path / "metrics.bin")
+    log = MetricsLog(path)
+    for ep in range(30):
+        log.append(ep, ep, 1, 0.0)
+    log.flush()
+    curve = load_curve(path, window=5)
+    assert curve.n == 30
+
+    for ep in range(30, 45):
+        log.append(ep, ep, 1, 0.0)
+    log.close()
+    curve.refresh(path)
+    assert curve.n == 45 and curve.offset == 45
+
+
+def test_uneven_merges_weight_buckets_by_episode_count():
+    scores = np.random.default_rng(2).integers(0, 50, 3001).astype(float)
+    curve = LearningCurve(window=10, max_points=8)
+    for chunk in np.array_split(scores, 13):
+        curve.update(chunk)
+
+    x, mean, _, q = curve.points()
+    assert len(set(curve.count.tolist())) > 1  # some kept odd buckets were merged later
+    edges = np.r_[-1, x.astype(int)]
+    assert np.array_equal(curve.count, np.diff(edges))
+    for lo, hi, m in zip(edges[:-1], edges[1:], mean):
+        assert np.isclose(m, scores[lo + 1:hi + 1].mean())
+    assert np.all(q[:, 0] <= q[:, 1])
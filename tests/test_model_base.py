@@ -0,0 +1,110 @@
+import numpy as np
+
+from agents.model_base import (LearnedModel, BoundedLearnedModel, ModelTables, value_iteration,
+                               multigrid_value_iteration, multigrid_levels, coarsen_state)
+
+
+def random_dataset(n=4000, bins=(8, 8, 8), seed=0):
+    rng = np.random.default_rng(seed)
+    data = []
+    for _ in range(n):
+        s = tuple(int(i) for i in rng.integers(0, bins))
+        a = int(rng.integers(2))
+        # Mostly local moves so the MDP has structure across scales
+        s2 = tuple(int(np.clip(i + d, 0, b - 1)) for i, d, b in zip(s, rng.integers(-1, 2, 3), bins))
+        r = float(rng.normal(0.2 + a * (s[2] < bins[2] // 2), 0.1))
+        data.append((s, a, s2, r, bool(rng.random() < 0.02)))
+    return data
+
+
+def build(data):
+    model = LearnedModel()
+    for item in data:
+        model.add(*item)
+    model.build()
+    states = set()
+    for (s, a), trans in model.P.items():
+        states.add(s)
+        states.update(trans['s_next'])
+    return model, list(states)
+
+
+def test_value_iteration_zero_iters_reports_zero_sweeps():
+    model, states = build(random_dataset(200))
+    info = {}
+    V, policy = value_iteration(states, model, iters=0, info=info)
+    assert info['iters'] == 0
+    assert set(policy) == set(states)
+
+
+def test_multigrid_levels_and_coarsening():
+    assert multigrid_levels((16, 16, 16)) == [(4, 4, 4), (8, 8, 8), (16, 16, 16)]
+    assert multigrid_levels((12, 8, 8)) == [(6, 4, 4), (12, 8, 8)]
+    assert coarsen_state((7, 0, 5), (8, 8, 8), (4, 4, 4)) == (3, 0, 2)
+
+
+def test_multigrid_matches_plain_value_iteration():
+    data = random_dataset()
+    model, states = build(data)
+    V_plain, _ = value_iteration(states, model, gamma=0.9, iters=2000, tol=1e-8)
+    V_mg, _, report = multigrid_value_iteration(data, bins=(8, 8, 8), gamma=0.9, iters=2000, tol=1e-8)
+
+    assert [r['bins'] for r in report] == [(4, 4, 4), (8, 8, 8)]
+    assert max(abs(V_mg[s] - V_plain[s]) for s in states) < 1e-5
+
+    # Levels that stop short of `bins` still finish at full resolution
+    V_short, _, report = multigrid_value_iteration(data, bins=(8, 8, 8), levels=[(2, 2, 2), [4, 4, 4]],
+                                                   gamma=0.9, iters=2000, tol=1e-8)
+    assert [r['bins'] for r in report] == [(2, 2, 2), (4, 4, 4), (8, 8, 8)]
+    assert max(abs(V_short[s] - V_plain[s]) for s in states) < 1e-5
+
+
+def test_bounded_model_without_pruning_matches_learned_model():
+    data = random_dataset(3000)
+    model, _ = build(data)
+    bounded = BoundedLearnedModel(top_k=64)
+    for item in data:
+        bounded.add(*item)
+    bounded.build()
+
+    assert set(bounded.P) == set(model.P)
+    for key, trans in model.P.items():
+        assert abs(bounded.P[key]['r'] - trans['r']) < 1e-9
+        assert abs(bounded.P[key]['done'] - trans['done']) < 1e-9
+        assert bounded.P[key]['residual'] == 0.0
+        assert bounded.P[key]['s_next'].keys() == trans['s_next'].keys()
+        assert all(abs(p - trans['s_next'][s2]) < 1e-12 for s2, p in bounded.P[key]['s_next'].items())
+
+
+def test_top_k_keeps_the_most_frequent_successors():
+    bounded = BoundedLearnedModel(top_k=2)
+    s = (0, 0, 0)
+    for s2, n in [((1, 0, 0), 10), ((2, 0, 0), 5), ((3, 0, 0), 1), ((4, 0, 0), 1), ((5, 0, 0), 1)]:
+        for _ in range(n):
+            bounded.add(s, 0, s2, 1.0)
+    bounded.build()
+
+    trans = bounded.P[(s, 0)]
+    assert set(trans['s_next']) == {(1, 0, 0), (2, 0, 0)}
+    assert abs(sum(trans['s_next'].values()) - 1.0) < 1e-12
+    assert abs(trans['residual'] - 3 / 18) < 1e-12
+
+
+def test_memory_budget_evicts_least_visited_pairs():
+    bounded = BoundedLearnedModel(top_k=4, memory_budget=20_000, check_every=1)
+    for item in random_dataset(5000):
+        bounded.add(*item)
+    assert bounded.evicted > 0
+    assert bounded.estimated_bytes() <= 20_000
+
+
+def test_bounded_model_answers_queries_before_build():
+    bounded = BoundedLearnedModel()
+    assert isinstance(bounded, ModelTables) and not isinstance(bounded, LearnedModel)
+    s = (0, 0, 0)
+    bounded.add(s, 1, (1, 0, 0), 2.0, True)
+    assert bounded.get_transitions(s, 1) == {} and bounded.get_reward(s, 1) == 0.0
+
+    bounded.build()
+    assert bounded.get_transitions(s, 1) == {(1, 0, 0): 1.0}
+    assert bounded.get_reward(s, 1) == 2.0 and bounded.get_done_prob(s, 1) == 1.0
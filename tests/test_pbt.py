@@ -0,0 +1,50 @@
+import json
+import numpy as np
+
+from agents.q_learning import QAgent
+from agents.mc import MCAgent
+from pbt import sample_hyperparams, perturb_hyperparams, apply_hyperparams, run_pbt
+
+
+def test_sampled_and_perturbed_hyperparams_stay_in_range():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        params = sample_hyperparams(rng)
+        assert 0.05 <= params['alpha'] <= 0.5
+        assert 0.9 <= params['gamma'] <= 0.995
+        assert 0.999 <= params['eps_decay'] <= 0.99999
+        for _ in range(5):
+            params = perturb_hyperparams(params, rng)
+            assert 0.005 <= params['alpha'] <= 1.0
+            assert 0.8 <= params['gamma'] <= 0.999
+            assert 0.99 <= params['eps_decay'] <= 0.999999
+
+
+def test_perturbation_scales_by_one_of_the_factors():
+    params = {'alpha': 0.1, 'gamma': 0.98, 'eps_decay': 0.9999}
+    new = perturb_hyperparams(params, np.random.default_rng(1), factors=(2.0,))
+    assert np.isclose(new['alpha'], 0.2)
+    assert np.isclose(1 - new['gamma'], 0.04)
+    assert np.isclose(1 - new['eps_decay'], 2e-4)
+
+
+def test_apply_skips_missing_attributes():
+    params = {'alpha': 0.3, 'gamma': 0.95, 'eps_decay': 0.999}
+    q, mc = QAgent(), MCAgent()
+    apply_hyperparams(q, params)
+    apply_hyperparams(mc, params)
+    assert (q.alpha, q.gamma, q.eps_decay) == (0.3, 0.95, 0.999)
+    assert (mc.gamma, mc.eps_decay) == (0.95, 0.999) and not hasattr(mc, 'alpha')
+
+
+def test_tiny_run_writes_the_winning_lineage(tmp_path):
+    best = run_pbt('q', population=2, interval=3, rounds=3, eval_episodes=1, workers=1, seed=0,
+                   out_dir=str(tmp_path))
+    assert best['agent'].eps == 0.0
+    assert [rec['round'] for rec in best['lineage']] == [1, 2, 3]
+
+    with open(tmp_path / "pbt_lineage_q_learning.json") as f:
+        saved = json.load(f)
+    assert saved['score'] == best['score'] and saved['params'] == best['params']
+    assert len(saved['lineage']) == 3
+    assert (tmp_path / "agent_pbt_q.pkl").exists()
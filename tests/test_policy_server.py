@@ -0,0 +1,48 @@
+import threading
+import numpy as np
+
+from agents.model_base import PolicyAgent
+from utils.policy_export import export_policy, ExportedPolicy
+from policy_server import make_server, PolicyClient
+
+
+def random_policy(bins=(8, 8, 8), seed=0):
+    rng = np.random.default_rng(seed)
+    return {(i, j, k): int(rng.integers(2))
+            for i in range(bins[0]) for j in range(bins[1]) for k in range(bins[2])}
+
+
+def random_states(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return rng.uniform([-1.5, 0.0, -1.5], [1.5, 3.0, 1.5], size=(n, 3)).astype(np.float32)
+
+
+def test_exported_policy_matches_policy_agent(tmp_path):
+    policy = random_policy()
+    path = export_policy(str(tmp_path / "policy"), policy, bins=(8, 8, 8))
+    exported = ExportedPolicy(path)
+    agent = PolicyAgent(policy, bins=(8, 8, 8))
+
+    states = random_states(500)
+    assert exported.act_batch(states).tolist() == [agent.act(s) for s in states]
+
+
+def test_idle_client_does_not_block_others(tmp_path):
+    path = export_policy(str(tmp_path / "policy"), random_policy(), bins=(8, 8, 8))
+    address = str(tmp_path / "policy.sock")
+    server = make_server(path, address)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    idle = PolicyClient(address)  # holds its connection open without sending
+    busy = PolicyClient(address)
+    try:
+        busy.sock.settimeout(5.0)
+        states = random_states(64)
+        assert busy.act_batch(states).tolist() == ExportedPolicy(path).act_batch(states).tolist()
+        assert busy.stats()['states'] == 64
+    finally:
+        idle.close()
+        busy.close()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,61 @@
+import numpy as np
+
+from utils.run_registry import RunRegistry
+
+
+def make_registry(tmp_path):
+    reg = RunRegistry(str(tmp_path / "runs"))
+    for seed, gamma, score in [(0, 0.98, 10.0), (1, 0.98, 14.0), (0, 0.99, 12.0)]:
+        reg.record('planning', 'PI', {'gamma': gamma, 'bins': [8, 8, 8], 'fast': False}, seed=seed,
+                   metrics={'mean_score': score, 'time_plan': score / 10},
+                   arrays={'scores': np.full(5, score)})
+    reg.record('planning', 'VI', {'gamma': 0.98}, seed=0, metrics={'mean_score': 20.0})
+    return reg
+
+
+def test_filters_by_algo_seed_and_config(tmp_path):
+    reg = make_registry(tmp_path)
+    try:
+        assert len(reg.runs()) == 4
+        assert [r['seed'] for r in reg.runs(algo='PI', gamma=0.98)] == [1, 0]  # newest first
+        assert len(reg.runs(algo='PI', bins=[8, 8, 8], fast=False)) == 3
+        assert reg.runs(algo='PI', fast=True) == []
+        assert reg.runs(kind='dataset') == []
+        assert reg.latest('PI')['config'] == {'gamma': 0.99, 'bins': [8, 8, 8], 'fast': False}
+    finally:
+        reg.close()
+
+
+def test_best_and_metric_values(tmp_path):
+    reg = make_registry(tmp_path)
+    try:
+        assert reg.best('mean_score')['algo'] == 'VI'
+        best = reg.best('mean_score', algo='PI', gamma=0.98)
+        assert best['seed'] == 1 and best['mean_score'] == 14.0
+        assert reg.best('time_plan', algo='PI', maximize=False)['time_plan'] == 1.0
+        assert [v for _, v in reg.metric_values('mean_score', algo='PI')] == [14.0, 12.0, 10.0]
+        assert reg.best('mean_score', algo='MC') is None
+    finally:
+        reg.close()
+
+
+def test_arrays_artifacts_and_status(tmp_path):
+    reg = make_registry(tmp_path)
+    try:
+        run = reg.best('mean_score', algo='PI')
+        assert np.array_equal(reg.load_array(run['id'], 'scores'), np.full(5, 14.0))
+        assert reg.metrics(run['id']) == {'mean_score': 14.0, 'time_plan': 1.4}
+
+        running = reg.start_run('model_free', 'Q-Learning', {'alpha': 0.1})
+        assert reg.runs(algo='Q-Learning') == []
+        assert reg.runs(algo='Q-Learning', status='running')[0]['id'] == running
+        reg.finish_run(running, status='failed')
+        assert reg.runs(algo='Q-Learning', status='failed')[0]['finished'] is not None
+    finally:
+        reg.close()
+
+    reopened = RunRegistry(str(tmp_path / "runs"))
+    try:
+        assert len(reopened.runs()) == 4
+    finally:
+        reopened.close()
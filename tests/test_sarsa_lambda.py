@@ -0,0 +1,103 @@
+import copy
+import pickle
+import numpy as np
+
+from agents.q_learning import QAgent
+from agents.sarsa_lambda import ActiveTraceSet, SarsaLambdaAgent, QLambdaAgent
+
+
+def random_transitions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    low, high = [-1.5, 0.0, -1.5], [1.5, 3.0, 1.5]
+    states = rng.uniform(low, high, size=(n + 1, 3))
+    return [(states[i], int(rng.integers(2)), float(rng.normal()), states[i + 1], bool(rng.random() < 0.05))
+            for i in range(n)]
+
+
+def test_active_traces_match_dense_traces():
+    rng = np.random.default_rng(0)
+    traces = ActiveTraceSet(64, capacity=64, cutoff=1e-3)
+    dense = np.zeros(64)
+    for _ in range(500):
+        key = int(rng.integers(64))
+        traces.visit(key)
+        dense[key] = 1.0
+        traces.decay(0.7)
+        dense *= 0.7
+        dense[dense < 1e-3] = 0.0
+
+    keys, vals = traces.active()
+    expected = np.flatnonzero(dense)
+    assert sorted(keys.tolist()) == expected.tolist()
+    assert np.allclose(vals[np.argsort(keys)], dense[expected])
+    assert all(traces.pos[k] == i for i, k in enumerate(keys.tolist()))
+
+
+def test_capacity_evicts_the_weakest_trace():
+    traces = ActiveTraceSet(16, capacity=3, cutoff=1e-6)
+    for key in (1, 2, 3):
+        traces.visit(key)
+        traces.decay(0.5)
+    traces.visit(4)  # key 1 has the smallest trace
+    assert sorted(traces.active()[0].tolist()) == [2, 3, 4]
+
+
+def test_q_lambda_with_zero_lambda_is_q_learning():
+    q = QAgent(eps=0.0)
+    ql = QLambdaAgent(lam=0.0, eps=0.0)
+    for s, a, r, s2, done in random_transitions(2000):
+        q.learn(s, a, r, s2, done)
+        ql.learn(s, a, r, s2, done)
+    assert np.allclose(q.q_table, ql.q_table)
+
+
+def test_sarsa_lambda_acts_with_the_action_it_bootstrapped_from():
+    agent = SarsaLambdaAgent(eps=0.5)
+    for s, a, r, s2, done in random_transitions(200, seed=1):
+        agent.learn(s, a, r, s2, done)
+        if not done:
+            chosen = agent._next[1]
+            assert agent.act(s2) == chosen
+
+
+def test_watkins_cut_uses_q_before_the_update():
+    agent = QLambdaAgent(alpha=0.5, lam=0.9, eps=0.0)
+    s = np.array([0.0, 1.0, 0.0], dtype=np.float32)
+    idx = agent.discretize(s)
+    agent.q_table[idx] = [0.05, 0.1]
+
+    # Greedy action 1 from s back to s; the large negative reward makes action 0
+    # greedy only after the update, so the trace must still be kept
+    agent.learn(s, 1, -10.0, s.copy(), False)
+    assert agent._next[1] == 1
+    assert agent.traces.n == 1
+
+    # A non-greedy next action cuts the traces
+    agent.q_table[idx] = [0.1, 0.05]
+    assert agent._keep_traces(s, 0) and not agent._keep_traces(s, 1)
+
+
+def test_copied_and_pickled_agents_keep_learning_into_q_table():
+    agent = SarsaLambdaAgent(eps=0.0)
+    for clone in (copy.deepcopy(agent), pickle.loads(pickle.dumps(agent))):
+        for s, a, r, s2, done in random_transitions(50, seed=2):
+            clone.learn(s, a, r, s2, done)
+        assert clone.q_table.any()
+        assert np.shares_memory(clone.q_flat, clone.q_table)
+    assert not agent.q_table.any()
+
+
+def test_traces_do_not_carry_into_the_next_episode():
+    from flappybird_env import FlappyBirdEnv
+    from train import run_training_episode
+
+    agent = SarsaLambdaAgent()
+    env = FlappyBirdEnv(render_mode=False)
+    run_training_episode(env, agent, max_steps=20)  # cut mid-episode with live traces
+    assert agent.traces.n > 0
+
+    first_update = []
+    learn = agent.learn
+    agent.learn = lambda *args: first_update.append(agent.traces.n) or learn(*args)
+    run_training_episode(env, agent, max_steps=1)
+    assert first_update == [0]
@@ -0,0 +1,51 @@
+import numpy as np
+
+from flappybird_env import FlappyBirdEnv
+from utils.discretize import discretize_batch, flat_index
+from utils.sim_model import sample_cell_states, states_to_config, simulate_transition_stats
+
+BINS = (8, 8, 8)
+
+
+def first_column_cells(bins=BINS):
+    """Cells in the first horizontal-distance bin (the tube is at or over the bird)."""
+    idx = np.stack(np.meshgrid(np.arange(bins[0]), [0], np.arange(bins[2]), indexing='ij'), -1)
+    return flat_index(idx.reshape(-1, 3), bins)
+
+
+def test_configs_reproduce_their_cells():
+    env = FlappyBirdEnv(render_mode=False)
+    rng = np.random.default_rng(0)
+    cells = np.arange(int(np.prod(BINS)))
+    states, cell_ids = sample_cell_states(cells, BINS, 8, rng)
+    y, vel, tube_x, tube_h, _ = states_to_config(env, states, rng, BINS)
+
+    back = flat_index(discretize_batch(env.batch_state(y, vel, tube_x, tube_h), BINS), BINS)
+    assert np.array_equal(back, cell_ids)
+
+
+def test_first_bin_samples_tubes_over_the_bird():
+    env = FlappyBirdEnv(render_mode=False)
+    rng = np.random.default_rng(1)
+    states, _ = sample_cell_states(first_column_cells(), BINS, 500, rng)
+    _, _, tube_x, _, _ = states_to_config(env, states, rng, BINS)
+    assert tube_x[:, 0].min() < env.BIRD_X - env.TUBE_WIDTH + 1
+    assert tube_x[:, 0].min() >= env.BIRD_X - env.TUBE_WIDTH
+
+
+def test_simulated_dynamics_include_the_pass_reward():
+    env = FlappyBirdEnv(render_mode=False)
+    rng = np.random.default_rng(2)
+    states, _ = sample_cell_states(first_column_cells(), BINS, 2000, rng)
+    y, vel, tube_x, tube_h, passed = states_to_config(env, states, rng, BINS)
+    *_, reward, done = env.batch_step(y, vel, tube_x, tube_h, passed, np.zeros(len(y), dtype=int), rng)
+    assert reward.max() >= 20.0
+
+    # ... and the simulated model has the matching jumps: a passed tube makes the
+    # following one (350px further) the next tube, two or more horizontal bins on
+    stats = simulate_transition_stats(env, BINS, samples_per_cell=64, seed=3)
+    keys = np.fromiter(stats.counts.keys(), dtype=np.int64)
+    rows, s2 = np.divmod(keys, stats.n_states)
+    col = np.unravel_index(rows // 2, BINS)[1]
+    col2 = np.unravel_index(s2, BINS)[1]
+    assert np.any((col == 0) & (col2 >= 2))
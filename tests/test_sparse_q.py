@@ -0,0 +1,50 @@
+import numpy as np
+
+from agents.q_learning import QAgent
+from agents.sparse_q import SparseQTable, SparseQAgent
+from utils.discretize import flat_index
+
+
+def test_table_matches_dict_through_growth():
+    rng = np.random.default_rng(0)
+    table = SparseQTable(n_actions=2, capacity=8, dtype=np.float64)
+    reference = {}
+    for key in rng.integers(0, 1 << 20, 5000).tolist():
+        a = int(rng.integers(2))
+        v = float(rng.normal())
+        table.row(key)[a] += v
+        reference.setdefault(key, np.zeros(2))[a] += v
+
+    assert len(table) == len(reference)
+    assert table.size <= table.max_load * len(table.keys)
+    for key, values in reference.items():
+        assert np.allclose(table.get(key), values)
+    assert not table.get(1 << 21).any()  # unvisited -> zeros
+
+
+def test_to_dense_places_rows_by_flat_index():
+    table = SparseQTable(dtype=np.float64)
+    table.row(3)[1] = 2.5
+    table.row(500)[0] = -1.0
+    dense = table.to_dense(512)
+    assert dense[3, 1] == 2.5 and dense[500, 0] == -1.0
+    assert np.count_nonzero(dense) == 2
+
+
+def test_sparse_agent_matches_dense_q_agent():
+    bins = (8, 8, 8)
+    dense = QAgent(bins)
+    sparse = SparseQAgent(bins, dtype=np.float64, capacity=8)
+    rng = np.random.default_rng(1)
+    low, high = [-1.5, 0.0, -1.5], [1.5, 3.0, 1.5]
+    for _ in range(3000):
+        s, s2 = rng.uniform(low, high, size=(2, 3))
+        a, r, done = int(rng.integers(2)), float(rng.normal()), bool(rng.random() < 0.1)
+        dense.learn(s, a, r, s2, done)
+        sparse.learn(s, a, r, s2, done)
+
+    expected = dense.q_table.reshape(-1, 2)
+    assert np.allclose(sparse.q_table.to_dense(512), expected)
+    for s in rng.uniform(low, high, size=(200, 3)):
+        idx = dense.discretize(s)
+        assert sparse.key(s) == flat_index(idx, bins)
@@ -0,0 +1,30 @@
+import numpy as np
+
+from agents.tile_coding import TileCoder, TileCodingAgent
+
+
+def test_one_active_feature_per_tiling():
+    coder = TileCoder(n_tilings=8, tiles=(8, 8, 8))
+    rng = np.random.default_rng(0)
+    for s in rng.uniform([-3, -1, -3], [3, 4, 3], size=(500, 3)):  # includes out-of-range states
+        feats = coder.features(s)
+        assert len(feats) == 8
+        # Each index falls inside its own tiling's block
+        assert np.all(feats // coder.tiling_size == np.arange(8))
+        assert feats.min() >= 0 and feats.max() < coder.n_features
+
+
+def test_tilings_are_offset():
+    coder = TileCoder(n_tilings=4, tiles=(4, 4, 4))
+    local = coder.features(np.array([0.1, 1.0, 0.1])) - coder.base
+    # Identical local coordinates in every tiling would mean no offsets
+    assert len(set(local.tolist())) > 1
+
+
+def test_learning_moves_q_toward_target():
+    agent = TileCodingAgent(n_tilings=8, alpha=0.5)
+    s = np.array([0.0, 1.0, 0.0], dtype=np.float32)
+    for _ in range(200):
+        agent.learn(s, 1, 1.0, s, True)
+    assert np.isclose(agent.q_values(s)[1], 1.0, atol=1e-3)
+    assert agent.q_values(s)[0] == 0.0
@@ -0,0 +1,48 @@
+from flappybird_env import FlappyBirdEnv
+from agents.q_learning import QAgent
+from utils.evaluation import GreedyEvaluator
+from train import train_agent, selection_score
+
+
+def test_no_finished_evaluation_leaves_eval_score_none():
+    env = FlappyBirdEnv(render_mode=False)
+    agent, scores = train_agent(env, QAgent, "Q-Learning", episodes=5, show_every=5,
+                                eval_every=1000, eval_workers=1)
+    assert agent.eval_score is None
+    assert len(scores) == 5
+    assert selection_score(agent, scores) == sum(scores) / 5
+
+
+def test_best_snapshot_is_returned_with_its_score():
+    env = FlappyBirdEnv(render_mode=False)
+    agent, scores = train_agent(env, QAgent, "Q-Learning", episodes=4, show_every=4,
+                                eval_every=2, eval_episodes=2, eval_workers=1, min_episodes=0)
+    assert agent.eval_score is not None
+    assert agent.eps == 0.0
+    assert selection_score(agent, scores) == agent.eval_score
+
+
+def test_evaluator_stops_at_target():
+    evaluator = GreedyEvaluator(eval_episodes=1, target_score=-1, workers=1)
+    try:
+        evaluator.submit(10, QAgent())
+        evaluator.poll(block=True)
+        assert evaluator.should_stop
+        assert evaluator.best_episode == 10
+        assert evaluator.best_agent.eps == 0.0
+    finally:
+        evaluator.close()
+
+
+def test_evaluator_stops_on_plateau_after_min_episodes():
+    evaluator = GreedyEvaluator(eval_episodes=1, patience=2, min_episodes=3, workers=1)
+    try:
+        agent = QAgent()
+        agent.eps = 0.0
+        for ep in (1, 2, 3):  # the same greedy agent on the same layouts never improves
+            evaluator.submit(ep, agent)
+        evaluator.poll(block=True)
+        assert [ep for ep, _ in evaluator.history] == [1, 2, 3]
+        assert evaluator.since_best == 2 and evaluator.should_stop
+    finally:
+        evaluator.close()
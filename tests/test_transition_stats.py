@@ -0,0 +1,151 @@
+import random
+import numpy as np
+
+from flappybird_env import FlappyBirdEnv
+from agents.q_learning import QAgent
+from agents.model_base import TransitionStats, coarsen_model
+from utils.dataset import (build_model_from_dataset, collect_model, collect_model_parallel,
+                           _init_collect_worker)
+from utils.discretize import flat_index
+
+BINS = (8, 8, 8)
+
+
+def random_dataset(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    cells = rng.integers(0, 4, size=(n, 2, 3))  # a small corner of the grid, so keys repeat
+    return [(tuple(c[0].tolist()), int(rng.integers(2)), tuple(c[1].tolist()),
+             float(rng.normal(1.0, 3.0)), bool(rng.random() < 0.1)) for c in cells]
+
+
+def stats_from(dataset):
+    stats = TransitionStats(BINS)
+    for item in dataset:
+        stats.add(*item)
+    return stats
+
+
+def assert_same_model(model, reference, tol=1e-6):
+    assert set(model.P) == set(reference.P)
+    for key, trans in reference.P.items():
+        other = model.P[key]
+        assert abs(other['r'] - trans['r']) < tol
+        assert abs(other['done'] - trans['done']) < 1e-12
+        assert other['s_next'].keys() == trans['s_next'].keys()
+        assert all(abs(p - trans['s_next'][s2]) < 1e-12 for s2, p in other['s_next'].items())
+
+
+def test_to_model_matches_dataset_model():
+    dataset = random_dataset()
+    reference, ref_states = build_model_from_dataset(dataset)
+    model, states = stats_from(dataset).to_model()
+    assert_same_model(model, reference)
+    assert sorted(states) == sorted(ref_states)
+
+
+def test_add_arrays_matches_add():
+    dataset = random_dataset()
+    stats = TransitionStats(BINS)
+    s = flat_index(np.array([d[0] for d in dataset]), BINS)
+    s2 = flat_index(np.array([d[2] for d in dataset]), BINS)
+    a = np.array([d[1] for d in dataset])
+    r = np.array([d[3] for d in dataset])
+    done = np.array([d[4] for d in dataset])
+    for chunk in np.array_split(np.arange(len(dataset)), 3):
+        stats.add_arrays(s[chunk], a[chunk], s2[chunk], r[chunk], done[chunk])
+
+    reference = stats_from(dataset)
+    assert stats.counts == reference.counts
+    assert stats.reward_sum == reference.reward_sum
+    assert stats.done_count == reference.done_count
+    assert stats.n_transitions == len(dataset)
+
+
+def test_save_load_round_trip(tmp_path):
+    stats = stats_from(random_dataset())
+    path = str(tmp_path / "stats.npz")
+    stats.save(path)
+    loaded = TransitionStats.load(path)
+    assert loaded.bins == stats.bins and loaded.n_transitions == stats.n_transitions
+    assert loaded.counts == stats.counts
+    assert loaded.reward_sum == stats.reward_sum and loaded.done_count == stats.done_count
+
+
+def test_seeded_collection_is_reproducible():
+    env = FlappyBirdEnv(render_mode=False)
+    first = collect_model(env, None, n_episodes=20, seed=11, log_every=0)
+    second = collect_model(env, None, n_episodes=20, seed=11, log_every=0)
+    assert first.counts == second.counts and first.reward_sum == second.reward_sum
+
+
+def test_merge_is_exact_in_any_order():
+    dataset = random_dataset(6000)
+    parts = [stats_from(dataset[i::4]) for i in range(4)]
+
+    forward = TransitionStats(BINS)
+    for part in parts:
+        forward.merge(part)
+    backward = TransitionStats(BINS)
+    for part in reversed(parts):
+        backward.merge(part)
+    pairs = TransitionStats(BINS).merge(parts[2]).merge(parts[3])
+    tree = stats_from(dataset[0::4]).merge(parts[1]).merge(pairs)
+
+    whole = stats_from(dataset)
+    for merged in (forward, backward, tree):
+        assert merged.counts == whole.counts
+        assert merged.reward_sum == whole.reward_sum  # fixed point: bit-identical
+        assert merged.done_count == whole.done_count
+        assert merged.n_transitions == len(dataset)
+
+
+def test_parallel_collection_matches_serial():
+    env = FlappyBirdEnv(render_mode=False)
+    serial = collect_model(env, None, n_episodes=30, seed=5, log_every=0)
+    parallel = collect_model_parallel(None, n_episodes=30, workers=2, seed=5, shard_size=7)
+    assert parallel.counts == serial.counts
+    assert parallel.reward_sum == serial.reward_sum
+    assert parallel.done_count == serial.done_count
+
+
+def test_collection_leaves_global_random_alone():
+    env = FlappyBirdEnv(render_mode=False)
+    random.seed(123)
+    expected = random.random()
+    random.seed(123)
+    collect_model(env, None, n_episodes=3, seed=0, log_every=0)
+    assert random.random() == expected
+
+
+def test_aggregated_model_rebuilds_and_coarsens_like_the_dataset_model():
+    dataset = random_dataset()
+    reference, _ = build_model_from_dataset(dataset)
+    model, _ = stats_from(dataset).to_model()
+
+    model.build()
+    assert_same_model(model, reference)
+    assert_same_model(coarsen_model(model, BINS, (4, 4, 4)), coarsen_model(reference, BINS, (4, 4, 4)))
+
+
+def _first_draw(_):
+    import os
+    import time
+    draw = random.random()
+    time.sleep(0.2)  # keep this worker busy so every task gets its own
+    return os.getpid(), draw
+
+
+def test_collection_workers_explore_independently():
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=4, initializer=_init_collect_worker) as pool:
+        results = list(pool.map(_first_draw, range(4)))
+    assert len({pid for pid, _ in results}) == 4
+    assert len({draw for _, draw in results}) == 4
+
+
+def test_seeded_eps_greedy_collection_does_not_depend_on_workers():
+    agent = QAgent(eps=0.3)
+    one = collect_model_parallel(agent, n_episodes=12, workers=1, seed=9, shard_size=3)
+    two = collect_model_parallel(agent, n_episodes=12, workers=3, seed=9, shard_size=3)
+    assert one.counts == two.counts and one.reward_sum == two.reward_sum
@@ -0,0 +1,78 @@
+import numpy as np
+import random
+from agents.base import BaseAgent
+from agents.q_learning import QAgent
+from utils.discretize import STATE_LOW, STATE_HIGH
+
+
+class TileCoder:
+    """
+    Several offset grid tilings over the 3-D state from FlappyBirdEnv.get_state.
+    features(state) returns one active feature index per tiling, computed for
+    all tilings in a single vectorized expression.
+    """
+    def __init__(self, n_tilings=8, tiles=(8, 8, 8), low=STATE_LOW, high=STATE_HIGH):
+        self.n_tilings = n_tilings
+        self.tiles = np.array(tiles)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.width = (self.high - self.low) / self.tiles
+
+        # Asymmetric offsets (1, 3, 5) so tilings do not shift along the diagonal only
+        self.offsets = (np.arange(n_tilings)[:, None] * np.array([1, 3, 5]) % n_tilings) \
+            / n_tilings * self.width
+
+        # Each tiling needs one extra tile per dim to cover its offset
+        dims = self.tiles + 1
+        self.strides = np.array([dims[1] * dims[2], dims[2], 1])
+        self.tiling_size = int(np.prod(dims))
+        self.base = np.arange(n_tilings) * self.tiling_size
+        self.n_features = n_tilings * self.tiling_size
+
+    def features(self, state):
+        s = np.clip(state, self.low, self.high)
+        coords = ((s - self.low + self.offsets) / self.width).astype(np.int64)
+        coords = np.minimum(coords, self.tiles)
+        return coords @ self.strides + self.base
+
+
+class TileCodingAgent(QAgent):
+    """
+    Linear Q-function over tile-coded features, trained by semi-gradient
+    Q-learning. Overlapping tilings generalize across neighbouring states
+    while keeping a fine effective resolution near the gap.
+    Same act/learn API as QAgent, so it plugs into train_agent.
+    """
+    def __init__(self, n_tilings=8, tiles=(8, 8, 8), alpha=0.1, gamma=0.98,
+                 eps=1.0, eps_min=0.01, eps_decay=0.9995, bins=(8, 8, 8)):
+        BaseAgent.__init__(self, bins, gamma, eps, eps_min, eps_decay)
+        self.coder = TileCoder(n_tilings, tiles)
+        self.alpha = alpha / n_tilings  # step size per active feature
+        self.w = np.zeros((self.coder.n_features, 2))
+        self._cache = [(None, None), (None, None)]
+
+    def features(self, state):
+        # learn(s, ...) is followed by act(s2) and learn(s2, ...), so the
+        # last two states cover almost every lookup in train_agent
+        for cached_state, feats in self._cache:
+            if cached_state is state:
+                return feats
+        feats = self.coder.features(state)
+        self._cache = [self._cache[1], (state, feats)]
+        return feats
+
+    def q_values(self, state):
+        return self.w[self.features(state)].sum(axis=0)
+
+    def act(self, state):
+        if random.random() < self.eps:
+            return random.randint(0, 1)
+        return int(np.argmax(self.q_values(state)))
+
+    def learn(self, s, a, r, s2, done):
+        feats = self.features(s)
+
+        best_next = 0.0 if done else np.max(self.q_values(s2))
+        target = r + self.gamma * best_next
+
+        self.w[feats, a] += self.alpha * (target - self.w[feats, a].sum())
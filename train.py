@@ -6,47 +6,100 @@ from flappybird_env import FlappyBirdEnv
 from agents.q_learning import QAgent
 from agents.sarsa import SarsaAgent
 from agents.mc import MCAgent
+from agents.sarsa_lambda import SarsaLambdaAgent
 from agents.model_base import value_iteration, policy_iteration
-from utils.dataset import collect_dataset, build_model_from_dataset, evaluate_policy
+from utils.dataset import collect_dataset, build_model_from_dataset
+from utils.metrics_log import MetricsLog
+from utils.memstats import (MemoryTracker, dataset_footprint, model_footprint,
+                            agent_footprint, print_footprint)
+from live_viewer import q_array
+from utils.evaluation import GreedyEvaluator, paired_evaluate, paired_comparison, print_paired_report
+from utils.run_registry import RunRegistry
+from utils.policy_export import export_policy
 
 
-def train_agent(env, agent_class, name, episodes=50000, show_every=1000):
-    agent = agent_class()
-    scores = []
-    best_avg = 0.0
+def metrics_path(name):
+    """Per-episode metrics log for an algorithm, e.g. results/metrics_q_learning.bin"""
+    slug = name.lower().replace("-", "_").replace(" ", "_")
+    return f"results/metrics_{slug}.bin"
 
-    print(f"\n=== {name.upper()} Training ({episodes} episodes) ===")
 
-    for ep in range(1, episodes + 1):
-        s = env.reset()
-        done = False
-        ep_score = 0
+def run_training_episode(env, agent, max_steps=None):
+    """
+    Play and learn from one episode, cut after max_steps env steps if given.
+    Returns (score, env steps); eps decay is left to the caller.
+    """
+    s = env.reset()
+    done = False
+    ep_score = 0
+    steps = 0
+
+    # riêng cho MC
+    if isinstance(agent, MCAgent):
+        agent.episode = []
+    elif isinstance(agent, SarsaLambdaAgent):
+        agent.start_episode()
 
-        # riêng cho MC
-        if isinstance(agent, MCAgent):
-            agent.episode = []
+    a = agent.act(s)
+    while not done and (max_steps is None or steps < max_steps):
+        s2, r, done, info = env.step(a)
+        ep_score = info["score"]
+        a2 = None
 
-        while not done:
-            a = agent.act(s)
-            s2, r, done, info = env.step(a)
-            ep_score = info["score"]
+        # SarsaAgent subclasses QAgent, so it must be matched first
+        if isinstance(agent, SarsaAgent):
+            a2 = agent.act(s2)  # on-policy: the action bootstrapped on is the one played next
+            agent.learn_sarsa(s, a, r, s2, a2, done)
+        elif isinstance(agent, QAgent):
+            agent.learn(s, a, r, s2, done)
+        elif isinstance(agent, MCAgent):
+            agent.store_transition(s, a, r)
 
-            if isinstance(agent, QAgent):
-                agent.learn(s, a, r, s2, done)
-            elif isinstance(agent, SarsaAgent):
-                a2 = agent.act(s2)
-                agent.learn_sarsa(s, a, r, s2, a2, done)
-                a = a2
-            elif isinstance(agent, MCAgent):
-                agent.store_transition(s, a, r)
+        s = s2
+        steps += 1
+        if not done:
+            a = agent.act(s) if a2 is None else a2
 
-            s = s2
+    if isinstance(agent, MCAgent):
+        agent.learn_episode()
+
+    return ep_score, steps
+
+
+def train_agent(env, agent_class, name, episodes=50000, show_every=1000, log_path=None,
+                eval_every=None, eval_episodes=20, patience=5, target_score=None, min_episodes=10000,
+                eval_workers=2, publisher=None, publish_every=50):
+    """
+    Train `agent_class` for up to `episodes` episodes.
+    With eval_every set, a greedy snapshot is evaluated in background workers
+    every eval_every episodes; training stops once the greedy score reaches
+    target_score or (after min_episodes) stops improving for `patience`
+    evaluations, and the best snapshot is returned (its score in agent.eval_score,
+    None when no evaluation finished).
+    With a live_viewer.QTablePublisher, the Q-table is copied to shared memory
+    every publish_every episodes for a viewer process to render.
+    """
+    agent = agent_class()
+    agent.eval_score = None
+    scores = []
+    best_avg = 0.0
+    log = MetricsLog(log_path) if log_path else None
+    evaluator = None
+    if eval_every:
+        evaluator = GreedyEvaluator(eval_episodes, patience, target_score=target_score,
+                                    min_episodes=min_episodes, workers=eval_workers,
+                                    frame_skip=env.frame_skip)
 
-        if isinstance(agent, MCAgent):
-            agent.learn_episode()
+    print(f"\n=== {name.upper()} Training ({episodes} episodes) ===")
 
+    for ep in range(1, episodes + 1):
+        ep_score, steps = run_training_episode(env, agent)
         agent.decay()
         scores.append(ep_score)
+        if log is not None:
+            log.append(ep, ep_score, steps, agent.eps)
+        if publisher is not None and ep % publish_every == 0:
+            publisher.publish(q_array(agent))
 
         if ep % show_every == 0:
             avg = np.mean(scores[-show_every:])
@@ -57,35 +110,70 @@ def train_agent(env, agent_class, name, episodes=50000, show_every=1000):
                 f"| max: {max_recent:2.0f} | best_avg: {best_avg:5.2f} "
                 f"| eps: {agent.eps:.4f}"
             )
+            if log is not None:
+                log.flush()
+
+        if evaluator is not None:
+            if ep % eval_every == 0:
+                evaluator.submit(ep, agent)
+            evaluator.poll()
+            if evaluator.should_stop:
+                print(f"  Early stop at ep {ep} (best greedy avg {evaluator.best_score:.2f} "
+                      f"at ep {evaluator.best_episode})")
+                break
+
+    if log is not None:
+        log.close()
+
+    if evaluator is not None:
+        if not evaluator.should_stop:
+            evaluator.poll(block=True)
+        evaluator.close()
+        if evaluator.best_agent is not None:
+            agent = evaluator.best_agent
+            agent.eval_score = evaluator.best_score
 
     agent.eps = 0.0  # Greedy for evaluation
     return agent, scores
 
 
-def main():
-    env = FlappyBirdEnv(render_mode=False)
+def selection_score(agent, scores):
+    """Greedy evaluation score, or the last-2000 training mean when no evaluation finished."""
+    if agent.eval_score is not None:
+        return agent.eval_score
+    return float(np.mean(scores[-2000:])) if scores else 0.0
+
+
+def main(trace_memory=False, frame_skip=1):
+    env = FlappyBirdEnv(render_mode=False, frame_skip=frame_skip)
     os.makedirs("results", exist_ok=True)
+    mem = MemoryTracker(trace=trace_memory)
 
     # ===== Train model-free agents =====
-    q_agent, q_scores = train_agent(env, QAgent, "Q-Learning")
-    s_agent, s_scores = train_agent(env, SarsaAgent, "SARSA")
-    mc_agent, mc_scores = train_agent(env, MCAgent, "Monte Carlo")
+    q_agent, q_scores = train_agent(env, QAgent, "Q-Learning", log_path=metrics_path("Q-Learning"),
+                                    eval_every=1000)
+    s_agent, s_scores = train_agent(env, SarsaAgent, "SARSA", log_path=metrics_path("SARSA"),
+                                    eval_every=1000)
+    mc_agent, mc_scores = train_agent(env, MCAgent, "Monte Carlo", log_path=metrics_path("Monte Carlo"),
+                                      eval_every=1000)
+    mem.checkpoint("train model-free agents")
 
-    # ===== Determine best agent (based on last 2000 episodes) =====
+    # ===== Determine best agent (greedy evaluation score) =====
     means = [
-        np.mean(q_scores[-2000:]),
-        np.mean(s_scores[-2000:]),
-        np.mean(mc_scores[-2000:])
+        selection_score(q_agent, q_scores),
+        selection_score(s_agent, s_scores),
+        selection_score(mc_agent, mc_scores)
     ]
     best_idx = int(np.argmax(means))
     best_agent = [q_agent, s_agent, mc_agent][best_idx]
     best_agent.eps = 0.0
 
-    print(f"\nBest agent final mean score (last 2000 eps): {means[best_idx]:.2f}")
+    print(f"\nBest agent mean score: {means[best_idx]:.2f}")
 
     # ===== Collect high-quality dataset =====
     print("\n=== Collecting dataset from best agent ===")
     dataset = collect_dataset(env, best_agent, n_episodes=5000, max_steps=2000)
+    mem.checkpoint("collect dataset")
 
     with open("results/dataset.pkl", "wb") as f:
         pickle.dump(dataset, f)
@@ -98,18 +186,29 @@ def main():
     # ===== Build model for VI & PI =====
     model, states = build_model_from_dataset(dataset)
     print(f"Unique states for model-based methods: {len(states)}")
+    mem.checkpoint("build model")
 
     # ===== Value Iteration =====
     print("\n=== VALUE ITERATION on learned model ===")
     V_vi, policy_vi = value_iteration(states, model)
-    mean_vi, std_vi, _ = evaluate_policy(env, policy_vi)
-    print(f"Value Iteration mean score: {mean_vi:.2f} ± {std_vi:.2f}")
+    mem.checkpoint("value iteration")
 
     # ===== Policy Iteration =====
     print("\n=== POLICY ITERATION on learned model ===")
     V_pi, policy_pi = policy_iteration(states, model)
-    mean_pi, std_pi, _ = evaluate_policy(env, policy_pi)
-    print(f"Policy Iteration mean score: {mean_pi:.2f} ± {std_pi:.2f}")
+    mem.checkpoint("policy iteration")
+
+    # ===== Paired evaluation: every policy plays the same seeded tube layouts =====
+    print("\n=== Paired evaluation (common random numbers) ===")
+    scores = paired_evaluate(env, {
+        "PI": policy_pi,
+        "VI": policy_vi,
+        "Q-Learning": q_agent,
+        "SARSA": s_agent,
+        "Monte Carlo": mc_agent,
+    }, episodes=100, seed=0)
+    print_paired_report(scores, paired_comparison(scores, baseline="PI"))
+    mem.checkpoint("paired evaluation")
 
     # ===== Save policies =====
     with open("results/policy_vi.pkl", "wb") as f:
@@ -117,6 +216,41 @@ def main():
     with open("results/policy_pi.pkl", "wb") as f:
         pickle.dump({"policy": policy_pi, "V": V_pi}, f)
 
+    # ===== Index runs in the registry =====
+    registry = RunRegistry()
+    for name, agent, train_scores in [("Q-Learning", q_agent, q_scores), ("SARSA", s_agent, s_scores),
+                                      ("Monte Carlo", mc_agent, mc_scores)]:
+        config = {key: getattr(agent, key) for key in ("alpha", "gamma", "eps_decay", "eps_min")
+                  if hasattr(agent, key)}
+        config.update(bins=list(agent.bins), episodes=len(train_scores), eval_every=1000, frame_skip=frame_skip)
+        metrics = {"selection_score": selection_score(agent, train_scores),
+                   "mean_score": scores[name].mean(), "std_score": scores[name].std()}
+        if agent.eval_score is not None:  # None when no greedy evaluation finished
+            metrics["eval_score"] = agent.eval_score
+        registry.record("model_free", name, config, seed=0, metrics=metrics,
+                        arrays={"scores": scores[name], "train_scores": train_scores},
+                        artifacts={"metrics_log": metrics_path(name)})
+    registry.record("dataset", ["Q-Learning", "SARSA", "Monte Carlo"][best_idx],
+                    {"episodes": 5000, "max_steps": 2000, "frame_skip": frame_skip},
+                    metrics={"n_transitions": len(dataset)}, artifacts={"dataset": "results/dataset.pkl"})
+    for name, key, policy in [("Value Iteration", "VI", policy_vi), ("Policy Iteration", "PI", policy_pi)]:
+        run_id = registry.record("planning", name, {"gamma": 0.98, "bins": [8, 8, 8], "frame_skip": frame_skip,
+                                                    "dataset": "results/dataset.pkl", "n_transitions": len(dataset)},
+                                 seed=0, metrics={"mean_score": scores[key].mean(), "std_score": scores[key].std(),
+                                                  "n_states": len(states)},
+                                 arrays={"scores": scores[key]})
+        registry.add_artifact(run_id, "policy", export_policy(os.path.join(registry.run_dir(run_id), "policy"),
+                                                              policy, bins=(8, 8, 8)))
+    registry.close()
+
+    # ===== Memory report =====
+    mem.report()
+    print("\n=== Memory footprint ===")
+    print_footprint("dataset", dataset_footprint(dataset))
+    print_footprint("learned model", model_footprint(model))
+    for name, agent in [("Q-Learning", q_agent), ("SARSA", s_agent), ("Monte Carlo", mc_agent)]:
+        print_footprint(name, agent_footprint(agent))
+
     env.close()
 
 
@@ -3,20 +3,26 @@ import pickle
 import time
 
 from flappybird_env import FlappyBirdEnv
-from utils.dataset import build_model_from_dataset, evaluate_policy
+from utils.dataset import build_model_from_dataset, save_dataset_arrays
 from agents.model_base import value_iteration, policy_iteration, PolicyAgent
+from agents.fitted_q import fitted_q_iteration
+from utils.policy_export import export_policy
+from utils.evaluation import paired_evaluate, paired_comparison, print_paired_report
+from utils.memstats import MemoryTracker, dataset_footprint, model_footprint, print_footprint
+from utils.run_registry import RunRegistry
 
 
-def main():
+def main(trace_memory=False, frame_skip=1):
     print("\n==============================")
     print(" VALUE ITERATION & POLICY ITERATION")
     print("==============================")
 
-    env = FlappyBirdEnv(render_mode=False)
+    env = FlappyBirdEnv(render_mode=False, frame_skip=frame_skip)
     os.makedirs('results', exist_ok=True)
+    mem = MemoryTracker(trace=trace_memory)
 
     # 1. Load dataset
-    print("\n[1/5] Loading dataset...")
+    print("\n[1/6] Loading dataset...")
     dataset_path = 'results/dataset.pkl'
     if not os.path.exists(dataset_path):
         print("Dataset not found! Run train.py first to collect dataset.")
@@ -25,54 +31,112 @@ def main():
     with open(dataset_path, 'rb') as f:
         dataset = pickle.load(f)
     print(f"Loaded dataset: {len(dataset)} transitions")
+    mem.checkpoint("load dataset")
 
     # 2. Build model
-    print("\n[2/5] Building MDP model...")
+    print("\n[2/6] Building MDP model...")
+    start = time.time()
     model, states = build_model_from_dataset(dataset)
+    build_time = time.time() - start
 
     print(f"Total states: {len(states)}")
     print(f"State-action pairs: {len(model.P)}")
     print(f"Avg actions/state: {len(model.P) / len(states):.2f}")
+    mem.checkpoint("build model")
 
     # 3. VALUE ITERATION
-    print("\n[3/5] Running Value Iteration...")
+    print("\n[3/6] Running Value Iteration...")
     start = time.time()
     V_vi, policy_vi = value_iteration(states, model, gamma=0.98, iters=300, tol=1e-4)
     vi_time = time.time() - start
+    mem.checkpoint("value iteration")
 
     print(f"Value Iteration done in {vi_time:.2f}s")
 
     vi_agent = PolicyAgent(policy_vi, bins=(8, 8, 8))
-    mean_vi, std_vi, scores_vi = evaluate_policy(env, vi_agent, episodes=100)
 
     # 4. POLICY ITERATION
-    print("\n[4/5] Running Policy Iteration...")
+    print("\n[4/6] Running Policy Iteration...")
     start = time.time()
     V_pi, policy_pi = policy_iteration(states, model, gamma=0.98, eval_iters=60, max_iters=100)
     pi_time = time.time() - start
+    mem.checkpoint("policy iteration")
 
     print(f"Policy Iteration done in {pi_time:.2f}s")
 
     pi_agent = PolicyAgent(policy_pi, bins=(8, 8, 8))
-    mean_pi, std_pi, scores_pi = evaluate_policy(env, pi_agent, episodes=100)
 
-    # 5. Summary
+    # 5. FITTED Q-ITERATION (no model: backups straight over the sorted transition arrays)
+    print("\n[5/6] Running Fitted Q-Iteration...")
+    # Timed from the same raw dataset as VI/PI: the sort into arrays is FQI's model build
+    start = time.time()
+    arrays_path = save_dataset_arrays(dataset, os.path.splitext(dataset_path)[0] + '_arrays.npy')
+    arrays_time = time.time() - start
+    Q_fqi, policy_fqi = fitted_q_iteration(arrays_path, gamma=0.98, iters=300, tol=1e-4)
+    fqi_time = time.time() - start
+    mem.checkpoint("fitted q-iteration")
+
+    print(f"Fitted Q-Iteration done in {fqi_time:.2f}s incl. {arrays_time:.2f}s array build "
+          f"(VI: {vi_time + build_time:.2f}s incl. {build_time:.2f}s model build)")
+
+    fqi_agent = PolicyAgent(policy_fqi, bins=(8, 8, 8))
+
+    # 6. Summary (both policies play the same seeded tube layouts)
     print("\n==============================")
     print(" COMPARISON")
     print("==============================")
-    print(f"VI mean score: {mean_vi:.2f} ± {std_vi:.2f}")
-    print(f"PI mean score: {mean_pi:.2f} ± {std_pi:.2f}")
-    print(f"VI time: {vi_time:.2f}s | PI time: {pi_time:.2f}s")
+    scores = paired_evaluate(env, {'VI': vi_agent, 'PI': pi_agent, 'FQI': fqi_agent}, episodes=100, seed=0)
+    print_paired_report(scores, paired_comparison(scores, baseline='VI'))
+    mem.checkpoint("paired evaluation")
+
+    scores_vi, scores_pi = scores['VI'].tolist(), scores['PI'].tolist()
+    mean_vi, std_vi = scores['VI'].mean(), scores['VI'].std()
+    mean_pi, std_pi = scores['PI'].mean(), scores['PI'].std()
+    print(f"Model build: {build_time:.2f}s | VI time: {vi_time:.2f}s | PI time: {pi_time:.2f}s "
+          f"| FQI time (incl. arrays): {fqi_time:.2f}s")
 
     summary = {
         'vi': {'mean': mean_vi, 'std': std_vi, 'scores': scores_vi},
-        'pi': {'mean': mean_pi, 'std': std_pi, 'scores': scores_pi}
+        'pi': {'mean': mean_pi, 'std': std_pi, 'scores': scores_pi},
+        'fqi': {'mean': scores['FQI'].mean(), 'std': scores['FQI'].std(),
+                'scores': scores['FQI'].tolist(), 'time': fqi_time}
     }
     with open('results/vi_pi_summary.pkl', 'wb') as f:
         pickle.dump(summary, f)
 
     print("\nSaved summary → results/vi_pi_summary.pkl")
 
+    export_policy('results/policy_vi', vi_agent)
+    export_policy('results/policy_pi', pi_agent)
+    print("Exported policies → results/policy_vi/, results/policy_pi/")
+
+    # Index every run (config, timings, metrics, own copies of scores and policy)
+    registry = RunRegistry()
+    base = {'gamma': 0.98, 'bins': [8, 8, 8], 'frame_skip': frame_skip, 'dataset': dataset_path,
+            'n_transitions': len(dataset), 'eval_episodes': 100}
+    runs = [
+        ('Value Iteration', 'VI', vi_agent, vi_time, {'iters': 300, 'tol': 1e-4}),
+        ('Policy Iteration', 'PI', pi_agent, pi_time, {'eval_iters': 60, 'max_iters': 100}),
+        ('Fitted Q-Iteration', 'FQI', fqi_agent, fqi_time - arrays_time, {'iters': 300, 'tol': 1e-4}),
+    ]
+    for algo, key, agent, plan_time, extra in runs:
+        metrics = {'mean_score': scores[key].mean(), 'std_score': scores[key].std(), 'time_plan': plan_time}
+        if key != 'FQI':
+            metrics.update(time_model_build=build_time, n_states=len(states))
+        else:
+            metrics.update(time_model_build=arrays_time)
+        run_id = registry.record('planning', algo, {**base, **extra}, seed=0, metrics=metrics,
+                                 arrays={'scores': scores[key]})
+        policy_dir = export_policy(os.path.join(registry.run_dir(run_id), 'policy'), agent)
+        registry.add_artifact(run_id, 'policy', policy_dir)
+    registry.close()
+    print(f"Registered runs → {registry.root}/registry.sqlite")
+
+    mem.report()
+    print("\n=== Memory footprint ===")
+    print_footprint("dataset", dataset_footprint(dataset))
+    print_footprint("learned model", model_footprint(model))
+
 
 if __name__ == "__main__":
     main()
@@ -7,6 +7,9 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
+from utils.metrics_log import load_curve
+from utils.figure_build import FigureSpec, build_figures, file_stamp
+from utils.run_registry import RunRegistry
 
 # Set style
 sns.set_style("whitegrid")
@@ -17,11 +20,32 @@ def load_results():
     """Load all saved results"""
     results = {}
     
+    # Latest finished run per algorithm from the run registry (metadata query,
+    # then only the score arrays of those runs are read)
+    if Path('results/runs/registry.sqlite').exists():
+        registry = RunRegistry()
+        latest = {}
+        for run in registry.runs():
+            if run['kind'] in ('planning', 'model_free') and run['algo'] not in latest:
+                latest[run['algo']] = run
+        results['runs'] = {}
+        for algo, run in latest.items():
+            metrics = registry.metrics(run['id'])
+            scores = registry.load_array(run['id'], 'scores')
+            results['runs'][algo] = {'mean': metrics['mean_score'], 'std': metrics['std_score'],
+                                     'scores': scores.tolist(), 'run_id': run['id']}
+        registry.close()
+    
     # Load VI/PI summary
     if Path('results/vi_pi_summary.pkl').exists():
         with open('results/vi_pi_summary.pkl', 'rb') as f:
             results['vi_pi'] = pickle.load(f)
     
+    # Per-episode training logs written by train.py
+    logs = sorted(Path('results').glob('metrics_*.bin'))
+    if logs:
+        results['metric_logs'] = {p.stem[len('metrics_'):]: str(p) for p in logs}
+    
     return results
 
 
@@ -58,6 +82,46 @@ def plot_learning_curves(scores_dict, save_path='results/learning_curves.png'):
     plt.close()
 
 
+def plot_learning_curves_from_logs(log_paths, save_path='results/learning_curves.png',
+                                   window=100, max_points=2000, curves=None):
+    """
+    Plot learning curves straight from the binary metric logs.
+    Logs are streamed in chunks into bounded-memory LearningCurve summaries
+    (rolling mean + 10-90% score band). Pass the returned `curves` back in
+    to only read records appended since the previous call.
+    """
+    curves = {} if curves is None else curves
+    plt.figure(figsize=(14, 8))
+    
+    colors = {
+        'monte_carlo': '#2E8B57',
+        'sarsa': '#FFD700',
+        'q_learning': '#4169E1'
+    }
+    
+    for name, path in log_paths.items():
+        if name not in curves:
+            curves[name] = load_curve(path, window=window, max_points=max_points)
+        else:
+            curves[name].refresh(path)
+        
+        x, _, rolling, q = curves[name].points()
+        color = colors.get(name, '#000000')
+        plt.plot(x, rolling, label=name, linewidth=2, color=color)
+        plt.fill_between(x, q[:, 0], q[:, -1], color=color, alpha=0.15)
+    
+    plt.xlabel('Episodes', fontsize=14)
+    plt.ylabel(f'Score (rolling mean, window={window})', fontsize=14)
+    plt.title('Learning curves (FlappyBird)', fontsize=16, pad=20)
+    plt.legend(fontsize=12, loc='lower right')
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(save_path, dpi=300, bbox_inches='tight')
+    print(f"✅ Saved: {save_path}")
+    plt.close()
+    return curves
+
+
 def plot_final_comparison(results_dict, save_path='results/final_comparison.png'):
     """Bar chart of final average return (last 50 episodes)"""
     plt.figure(figsize=(12, 7))
@@ -238,56 +302,61 @@ def main():
     # Example: Load results from saved files
     # You'll need to modify this based on your actual saved data
     
-    # Simulated results for demonstration
+    # Simulated results for demonstration (fixed seed, so cached figures stay valid)
+    rng = np.random.default_rng(0)
     results = {
         'Policy Iteration': {
             'mean': 89.5,
             'std': 5.2,
-            'scores': np.random.normal(89.5, 5.2, 100).tolist()
+            'scores': rng.normal(89.5, 5.2, 100).tolist()
         },
         'Value Iteration': {
             'mean': 83.1,
             'std': 6.1,
-            'scores': np.random.normal(83.1, 6.1, 100).tolist()
+            'scores': rng.normal(83.1, 6.1, 100).tolist()
         },
         'Monte Carlo': {
             'mean': -24.9,
             'std': 15.3,
-            'scores': np.random.normal(-24.9, 15.3, 100).tolist()
+            'scores': rng.normal(-24.9, 15.3, 100).tolist()
         },
         'SARSA': {
             'mean': -38.4,
             'std': 18.2,
-            'scores': np.random.normal(-38.4, 18.2, 100).tolist()
+            'scores': rng.normal(-38.4, 18.2, 100).tolist()
         },
         'Q-Learning': {
             'mean': -38.5,
             'std': 17.9,
-            'scores': np.random.normal(-38.5, 17.9, 100).tolist()
+            'scores': rng.normal(-38.5, 17.9, 100).tolist()
         }
     }
     
-    # Generate all plots
-    print("[1/7] Generating learning curves...")
-    # plot_learning_curves(scores_dict)  # Need actual episode-by-episode scores
-    
-    print("[2/7] Generating final comparison...")
-    plot_final_comparison(results)
-    
-    print("[3/7] Generating success rate chart...")
-    plot_success_rate(results)
-    
-    print("[4/7] Generating gamma sensitivity...")
-    plot_gamma_sensitivity()
-    
-    print("[5/7] Generating alpha sensitivity...")
-    plot_alpha_sensitivity()
-    
-    print("[6/7] Generating epsilon sensitivity...")
-    plot_epsilon_sensitivity()
-    
-    print("[7/7] Creating summary table...")
-    create_summary_table(results)
+    # Real results from the run registry replace the demo entries
+    loaded = load_results()
+    if loaded.get('runs'):
+        for algo, run in loaded['runs'].items():
+            results[algo] = {key: run[key] for key in ('mean', 'std', 'scores')}
+        print(f"   Using registry runs for: {', '.join(loaded['runs'])}")
+    
+    # Generate all plots (only figures whose data or code changed are re-rendered)
+    figures = [
+        FigureSpec(plot_final_comparison, 'results/final_comparison.png', (results,)),
+        FigureSpec(plot_success_rate, 'results/success_rate.png', (results,)),
+        FigureSpec(plot_gamma_sensitivity, 'results/gamma_sensitivity.png'),
+        FigureSpec(plot_alpha_sensitivity, 'results/alpha_sensitivity.png'),
+        FigureSpec(plot_epsilon_sensitivity, 'results/epsilon_sensitivity.png'),
+        FigureSpec(create_summary_table, 'results/summary_table.txt', (results,)),
+    ]
+    
+    logs = loaded.get('metric_logs')
+    if logs:
+        figures.append(FigureSpec(plot_learning_curves_from_logs, 'results/learning_curves.png', (logs,),
+                                  extra=file_stamp(logs.values())))
+    else:
+        print("   No results/metrics_*.bin logs found, skipping learning curves (run train.py first)")
+    
+    build_figures(figures)
     
     print("\n" + "="*70)
     print(" All visualizations generated successfully!")